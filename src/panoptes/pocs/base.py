@@ -7,6 +7,7 @@ shared lightweight database handle used throughout the project.
 import os
 from typing import Any
 
+from loguru import logger as loguru_logger
 from requests.exceptions import ConnectionError
 
 from panoptes.utils.config import client
@@ -137,3 +138,24 @@ class PanBase:
         global PAN_CONFIG_CACHE
         PAN_CONFIG_CACHE = {}
         self.logger.debug("Cleared config cache")
+
+
+class Picklable:
+    """Mixin for `PanBase` objects that are sent to worker processes.
+
+    The logger and database handle can't be pickled, so they are dropped and the
+    process-wide ones are used after unpickling. Only the scheduler objects that
+    go to the constraint pool use it, see `BaseScheduler.pool_type`, so hardware
+    objects still can't be pickled by accident.
+    """
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("logger", None)
+        state.pop("db", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.logger = loguru_logger
+        self.db = PAN_DB_OBJ
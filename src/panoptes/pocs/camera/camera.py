@@ -12,6 +12,7 @@ import threading
 import time
 import warnings
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import Future, wait
 from contextlib import suppress
 from fractions import Fraction
 from pathlib import Path
@@ -29,6 +30,7 @@ from panoptes.utils.utils import get_quantity_value
 
 from panoptes.pocs.base import PanBase
 from panoptes.pocs.scheduler.observation.base import Exposure, Observation
+from panoptes.pocs.utils.timing import record_timing, timed
 
 
 class AbstractCamera(PanBase, metaclass=ABCMeta):
@@ -115,7 +117,12 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
         self._current_observation = None
         self._is_exposing_event = threading.Event()
         self._is_observing_event = threading.Event()
+        self._readout_event = threading.Event()
         self._readout_complete = False
+        self._observation_future: Future | None = None
+        # Start (Unix and monotonic time) and tags of the current exposure, for the timing records.
+        self._exposure_started = None
+        self._timing_tags = dict()
         self._exposure_error = None
 
         # By default assume camera isn't capable of internal darks.
@@ -357,6 +364,43 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
         """True if an observation is currently under, otherwise False."""
         return self._is_observing_event.is_set()
 
+    @property
+    def observation_future(self) -> Future | None:
+        """`concurrent.futures.Future` of the latest observation, or None before the first.
+
+        The future resolves to the observation metadata once the exposure has been read
+        out and processed (see `process_exposure`), or to the error that stopped it. Wait
+        on the futures of several cameras with `concurrent.futures.wait`.
+        """
+        return self._observation_future
+
+    def wait_for_observation(self, timeout: float | None = None) -> bool:
+        """Wait for the latest observation to finish, see `observation_future`.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait, default forever.
+
+        Returns:
+            bool: True if the camera isn't observing (anymore).
+        """
+        if self._observation_future is None:
+            return True
+
+        done, _ = wait([self._observation_future], timeout=timeout)
+        return len(done) == 1
+
+    @property
+    def _readout_complete(self):
+        """True if the most recent readout has finished, backed by an event so it can be waited on."""
+        return self._readout_event.is_set()
+
+    @_readout_complete.setter
+    def _readout_complete(self, complete):
+        if complete:
+            self._readout_event.set()
+        else:
+            self._readout_event.clear()
+
     @property
     def waiting_for_readout(self):
         """True if the most recent readout has not finished. Should be set in `write_fits`"""
@@ -445,9 +489,9 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
         """Take an observation
 
         Gathers various header information, sets the file path, and calls
-            `take_exposure`. Also creates a `threading.Event` object and a
+            `take_exposure`. Also creates the `observation_future` and a
             `threading.Thread` object. The Thread calls `process_exposure`
-            after the exposure had completed and the Event is set once
+            after the exposure had completed and the future is resolved once
             `process_exposure` finishes.
 
         Args:
@@ -465,22 +509,27 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
         """
         # Set the camera is_observing.
         self._is_observing_event.set()
+        self._observation_future = Future()
 
-        # Set up the observation
-        metadata = self._setup_observation(observation, headers, filename, **kwargs)
-        exptime = metadata["exptime"]
-        file_path = metadata["filepath"]
-        image_id = metadata["image_id"]
-
-        # start the exposure
-        self.take_exposure(
-            seconds=exptime,
-            filename=file_path,
-            blocking=blocking,
-            metadata=metadata,
-            dark=observation.dark,
-            **kwargs,
-        )
+        try:
+            # Set up the observation
+            metadata = self._setup_observation(observation, headers, filename, **kwargs)
+            exptime = metadata["exptime"]
+            file_path = metadata["filepath"]
+            image_id = metadata["image_id"]
+
+            # start the exposure
+            readout_thread = self.take_exposure(
+                seconds=exptime,
+                filename=file_path,
+                blocking=blocking,
+                metadata=metadata,
+                dark=observation.dark,
+                **kwargs,
+            )
+        except Exception as err:
+            self._finish_observation(err=err)
+            raise
 
         if "POINTING" in metadata:
             observation.pointing_images[image_id] = Path(file_path)
@@ -500,14 +549,14 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
             name=f"Thread-process_exposure-{image_id}",
             target=self.process_exposure,
             args=(metadata,),
+            kwargs=dict(readout_thread=readout_thread),
             daemon=True,
         )
         t.start()
 
         if blocking:
-            while self.is_observing:
-                self.logger.trace("Waiting for observation event")
-                time.sleep(0.5)
+            self.logger.trace("Waiting for observation to finish")
+            self.wait_for_observation()
 
         return metadata
 
@@ -605,6 +654,9 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
 
         header = self._create_fits_header(seconds, dark=dark, metadata=metadata)
 
+        self._timing_tags = dict(camera=self.name, image_id=(metadata or dict()).get("image_id"))
+        self._exposure_started = (time.time(), time.monotonic())
+
         try:
             # Camera type specific exposure set up and start
             self._is_exposing_event.set()
@@ -654,44 +706,56 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
 
         return readout_thread
 
-    def process_exposure(self, metadata, **kwargs):
+    def process_exposure(self, metadata, readout_thread=None, **kwargs):
         """Processes the exposure.
 
-        This checks if the file exists and if so calls _do_process_exposure.
+        This waits for the readout, checks if the file exists and if so calls
+        _do_process_exposure. The `observation_future` is resolved when done.
 
         Args:
             metadata (dict): Header metadata saved for the image.
-
-        Raises:
-            FileNotFoundError: If the FITS file isn't at the specified location.
+            readout_thread (threading.Thread, optional): The thread returned by
+                `take_exposure`, which finishes after the readout (or an error).
         """
         # Wait for exposure to complete. Timeout handled by exposure thread.
-        while self.is_exposing or self.waiting_for_readout:
-            time.sleep(0.1)
+        if readout_thread is not None:
+            readout_thread.join()
+        else:
+            self._readout_event.wait()
 
         self.logger.debug(f"Starting exposure processing with {metadata!r}")
 
-        metadata["exptime"] = get_quantity_value(metadata["exptime"], unit="second")
-
-        # Make sure image exists.
         try:
+            metadata["exptime"] = get_quantity_value(metadata["exptime"], unit="second")
+
+            # Make sure image exists.
             file_path = metadata["filepath"]
             if not os.path.exists(file_path):
-                self._is_observing_event.clear()
                 raise FileNotFoundError(f"Image {file_path=!r} not found, cannot process.")
-        except (KeyError, FileNotFoundError):
-            self.logger.error(f"Image {file_path!r} not found, cannot process.")
-            self._is_observing_event.clear()
 
-        # Do the camera specific processing.
-        self.logger.debug(f"Starting FITS processing for {file_path}")
-        file_path = self._do_process_exposure(file_path, metadata)
-        self.logger.debug(f"Finished FITS processing for {file_path}")
+            # Do the camera specific processing.
+            self.logger.debug(f"Starting FITS processing for {file_path}")
+            with timed("header_update", camera=self.name, image_id=metadata.get("image_id")):
+                file_path = self._do_process_exposure(file_path, metadata)
+            self.logger.debug(f"Finished FITS processing for {file_path}")
+        except Exception as err:
+            self.logger.error(f"Problem processing exposure on {self}: {err!r}")
+            self._finish_observation(err=err)
+        else:
+            self._finish_observation(metadata=metadata)
 
-        # Mark the event as done.
+    def _finish_observation(self, metadata=None, err=None):
+        """Mark the observation as done and resolve the `observation_future`."""
         self._is_observing_event.clear()
         self.logger.debug(f"Camera observing for {self} complete: {self.is_observing=}")
 
+        future = self._observation_future
+        if future is not None and not future.done():
+            if err is not None:
+                future.set_exception(err)
+            else:
+                future.set_result(metadata)
+
     def write_fits(self, data, header, filename):
         """Write the FITS file.
 
@@ -707,7 +771,8 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
             None
         """
         self.logger.debug(f"Writing {filename=}")
-        fits_utils.write_fits(data, header, filename)
+        with timed("fits_write", **self._timing_tags):
+            fits_utils.write_fits(data, header, filename)
         self.logger.debug(f"Finished writing {filename=}")
         self._readout_complete = True
 
@@ -908,9 +973,11 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
             self._exposure_error = repr(err)
             raise err
         else:
+            self._record_exposure_timing()
             # Camera type specific readout function.
             try:
-                self._readout(*readout_args)
+                with timed("readout", **self._timing_tags):
+                    self._readout(*readout_args)
             except Exception as err:
                 self.logger.error(f"Error during readout on {self}: {err!r}")
                 self._exposure_error = repr(err)
@@ -919,6 +986,13 @@ class AbstractCamera(PanBase, metaclass=ABCMeta):
             # Make sure this gets set regardless of any errors
             self._is_exposing_event.clear()
 
+    def _record_exposure_timing(self):
+        """Record the time from the start of the exposure until now as the open shutter."""
+        if self._exposure_started is not None:
+            start, started = self._exposure_started
+            record_timing("exposure", start, time.monotonic() - started, **self._timing_tags)
+            self._exposure_started = None
+
     def _create_fits_header(self, seconds, dark=None, metadata=None) -> fits.Header:
         metadata = metadata or dict()
 
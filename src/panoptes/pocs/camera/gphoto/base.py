@@ -7,7 +7,6 @@ module is used by gphoto-based DSLR drivers.
 
 import re
 import subprocess
-import time
 from abc import ABC
 from pathlib import Path
 
@@ -17,6 +16,7 @@ from panoptes.utils.serializers import from_yaml
 from panoptes.utils.utils import listify
 
 from panoptes.pocs.camera import AbstractCamera, get_gphoto2_cmd
+from panoptes.pocs.utils.timing import timed
 
 file_save_re = re.compile(r"Saving file as (.*)")
 
@@ -105,13 +105,19 @@ class AbstractGPhotoCamera(AbstractCamera, ABC):  # pragma: no cover
         Returns:
             None
         """
-        # Wait for exposure to complete. Timeout handled by exposure thread.
-        while self.is_exposing:
-            time.sleep(0.5)
+        # Wait for the readout (the CR2 -> FITS conversion). Timeout handled by exposure thread.
+        readout_thread = kwargs.get("readout_thread")
+        if readout_thread is not None:
+            readout_thread.join()
+        else:
+            self._readout_event.wait()
+
+        # Clear the command before the observation is resolved, as the next exposure
+        # may start as soon as it is.
+        self._command_proc = None
 
         metadata["filepath"] = metadata["filepath"].replace(".cr2", ".fits")
         super().process_exposure(metadata, **kwargs)
-        self._command_proc = None
 
     def command(self, cmd: list[str] | str, check_exposing: bool = True):
         """Run a gphoto2 command and start tracking the subprocess.
@@ -333,7 +339,9 @@ class AbstractGPhotoCamera(AbstractCamera, ABC):  # pragma: no cover
             # Wait for the exposure to complete, this blocks in gphoto2.
             outs = self.get_command_result(timeout)
             self.logger.debug(f"Exposure complete for {self}, getting readout")
-            self._readout(*readout_args)
+            self._record_exposure_timing()
+            with timed("readout", **self._timing_tags):
+                self._readout(*readout_args)
         except Exception as err:
             self.logger.error(f"Error during readout on {self}: {err!r}")
             self._exposure_error = repr(err)
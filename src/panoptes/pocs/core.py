@@ -5,8 +5,9 @@ and manages the high-level observing loop, safety checks, and lifecycle.
 """
 
 import os
+import threading
+import time
 from contextlib import suppress
-from multiprocessing import Process
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
@@ -26,6 +27,9 @@ from panoptes.pocs.hardware import get_simulator_names
 from panoptes.pocs.observatory import Observatory
 from panoptes.pocs.scheduler.observation.base import Observation
 from panoptes.pocs.utils import error
+from panoptes.pocs.utils.safety import SafetyMonitor
+from panoptes.pocs.utils.status import is_equal, without_clock_fields
+from panoptes.pocs.utils.timing import record_timing
 
 
 class POCS(Machine, PanBase):
@@ -135,6 +139,22 @@ class POCS(Machine, PanBase):
         self._connected: bool = True
         self._interrupted: bool = False
         self._do_states: bool = False
+        # Unix and monotonic time of the last state change, for the timing records.
+        self._state_started = None
+        # Background safety checks, see `start_safety_monitor`.
+        self._safety_monitor: SafetyMonitor | None = None
+        self._safety_record = None
+        self._safety_recorded_at = None
+        # Seconds between safety records, read when the safety monitor starts.
+        self._safety_record_interval = None
+        # The status last written to the database, without its clock fields.
+        self._status_record = None
+        self._status_recorded_at = None
+        # Set to end a `wait` early, see `wake`.
+        self._wake_event = threading.Event()
+        self._wake_reason = None
+        self._wake_lock = threading.Lock()
+        self.observatory.subscribe_targets_of_opportunity(self._on_target_of_opportunity)
 
         self.say("Hi there!")
 
@@ -169,6 +189,7 @@ class POCS(Machine, PanBase):
     def interrupted(self, new_value: bool) -> None:
         self._interrupted = new_value
         if new_value:
+            self.wake("interrupted")
             self.logger.critical("POCS has been interrupted")
 
     @property
@@ -179,6 +200,8 @@ class POCS(Machine, PanBase):
     @connected.setter
     def connected(self, new_value: bool) -> None:
         self._connected = new_value
+        if not new_value:
+            self.wake("disconnected")
 
     @property
     def do_states(self) -> bool:
@@ -192,6 +215,8 @@ class POCS(Machine, PanBase):
     @do_states.setter
     def do_states(self, new_value: bool) -> None:
         self._do_states = new_value
+        if not new_value:
+            self.wake("states stopped")
 
     @property
     def keep_running(self):
@@ -232,8 +257,20 @@ class POCS(Machine, PanBase):
 
     @property
     def status(self) -> dict:
+        """Assemble a nested status dictionary for the running system, see `get_status`."""
+        return self.get_status()
+
+    def get_status(self, force: bool = False) -> dict:
         """Assemble a nested status dictionary for the running system.
 
+        The observatory sections are cached, see `Observatory.get_status`. The
+        status is written to the database when it changes or every
+        `status_check_interval` seconds. Fields that only follow the clock, see
+        `CLOCK_FIELDS`, are ignored when checking for changes.
+
+        Args:
+            force (bool, optional): Read all the observatory sections again, default False.
+
         Returns:
             dict: A JSON-serializable mapping containing current state, next state,
                 coarse system metrics (e.g., free space), and the observatory status.
@@ -245,20 +282,33 @@ class POCS(Machine, PanBase):
                 "system": {
                     "free_space": str(self._free_space),
                 },
-                "observatory": self.observatory.status,
+                "observatory": self.observatory.get_status(force=force),
             }
-            self.db.insert_current("status", status, store_permanently=False)
+
+            # The time and hour angles change on every refresh, so they alone don't count.
+            record = without_clock_fields(status)
+            record_interval = self.get_config("status_check_interval", default=60)
+            if (
+                force
+                or not is_equal(record, self._status_record)
+                or self._status_recorded_at is None
+                or time.monotonic() - self._status_recorded_at >= record_interval
+            ):
+                self.db.insert_current("status", status, store_permanently=False)
+                self._status_record = record
+                self._status_recorded_at = time.monotonic()
+
             return status
         except Exception as e:  # pragma: no cover
             self.logger.warning(f"Can't get status: {e!r}")
             return {}
 
-    def update_status(self) -> dict:
-        """Thin-wrapper around status property.
+    def update_status(self, force: bool = False) -> dict:
+        """Thin-wrapper around `get_status`.
 
         This method will update the status of the system in the database.
         """
-        return self.status
+        return self.get_status(force=force)
 
     ################################################################################################
     # Methods
@@ -293,8 +343,66 @@ class POCS(Machine, PanBase):
                 self.is_initialized = True
                 self.do_states = True
 
+                if self.get_config("safety.monitor", default=True):
+                    self.start_safety_monitor()
+
         return self.is_initialized
 
+    @property
+    def safety_monitor(self) -> SafetyMonitor | None:
+        """The background safety monitor, None if not started."""
+        return self._safety_monitor
+
+    def start_safety_monitor(self) -> SafetyMonitor:
+        """Evaluate the safety checks in the background.
+
+        Each check runs at its own interval from the `safety.intervals` config items
+        (in seconds) and `is_safe` reads the latest values instead of querying the
+        database, the disks and the Sun position. The darkness is checked for each
+        horizon, as ``is_dark_<horizon>``.
+
+        Subscribe to changes of the checks with ``pocs.safety_monitor.subscribe``.
+
+        Returns:
+            SafetyMonitor: The running monitor.
+        """
+        if self._safety_monitor is not None and self._safety_monitor.is_running:
+            return self._safety_monitor
+
+        intervals = self.get_config("safety.intervals", default=None) or dict()
+        images_dir = self.get_config("directories.images")
+
+        self._safety_monitor = SafetyMonitor(
+            checks={
+                "ac_power": (self.has_ac_power, intervals.get("ac_power", 10)),
+                "good_weather": (self.is_weather_safe, intervals.get("good_weather", 30)),
+                "free_space_root": (lambda: self.has_free_space("/"), intervals.get("free_space", 300)),
+                "free_space_images": (
+                    lambda: self.has_free_space(images_dir),
+                    intervals.get("free_space", 300),
+                ),
+            },
+            stale_factor=self.get_config("safety.stale_factor", default=3),
+        )
+        # Every horizon the states require, other horizons are checked directly.
+        for horizon in sorted({"observe", *self._horizon_lookup.values()}):
+            self._safety_monitor.add_check(
+                f"is_dark_{horizon}",
+                lambda horizon=horizon: self.is_dark(horizon=horizon),
+                intervals.get("is_dark", 10),
+            )
+        self._safety_record_interval = self.get_config("status_check_interval", default=60)
+        self._safety_monitor.subscribe(self._on_safety_change)
+        self._safety_monitor.start()
+
+        return self._safety_monitor
+
+    def stop_safety_monitor(self):
+        """Stop the background safety checks, `is_safe` checks directly again."""
+        if self._safety_monitor is not None:
+            self._safety_monitor.stop(timeout=5)
+            self._safety_monitor = None
+
     def say(self, msg):
         """PANOPTES Units like to talk!
 
@@ -342,6 +450,8 @@ class POCS(Machine, PanBase):
             # Observatory shut down; will wait for cameras to finish exposing.
             self.observatory.power_down()
 
+            self.stop_safety_monitor()
+
             self.connected = False
 
             # Clear all the config items.
@@ -359,6 +469,10 @@ class POCS(Machine, PanBase):
 
         This is a high-level method to call the various `observation` methods that
         allow for observing.
+
+        The loop stops early, before the next exposure, if a target of opportunity
+        was requested (see `Observatory.check_targets_of_opportunity`), so the
+        scheduler can select it.
         """
         current_observation = observation or self.observatory.current_observation
         self.say(f"Observing {current_observation}")
@@ -376,6 +490,10 @@ class POCS(Machine, PanBase):
                 self.say("Mount is not tracking, stopping observations.")
                 break
 
+            if self.observatory.check_targets_of_opportunity():
+                self.say(f"Target of opportunity! Stopping {current_observation}.")
+                break
+
             # Do the observing, once per exptime (usually only one unless a compound observation).
             for exptime in current_observation.exptimes:
                 self.logger.info(
@@ -391,10 +509,11 @@ class POCS(Machine, PanBase):
                     self.logger.error("No cameras available, stopping observation")
                     break
 
-                # Do processing in background.
-                process_proc = Process(target=self.observatory.process_observation)
-                process_proc.start()
-                self.logger.debug(f"Processing {current_observation} on {process_proc.pid=}")
+                # Do processing in background, waiting if the processing queue is full.
+                self.observatory.process_observation(blocking=False)
+                self.logger.debug(
+                    f"Processing {current_observation}, {self.observatory.processing_queue_depth=}"
+                )
 
             pic_num += 1
 
@@ -411,6 +530,11 @@ class POCS(Machine, PanBase):
         Note:
             This condition is called by the state machine during each transition.
 
+        If the safety monitor is running (see `start_safety_monitor`) the latest
+        values of the monitor are used for all the checks, unless they are stale, in
+        which case the checks are done directly. Only the direct checks update the
+        status, the monitor keeps it from doing so on every transition and exposure.
+
         Args:
             no_warning (bool, optional): If a warning message should show in logs,
                 defaults to False.
@@ -433,25 +557,40 @@ class POCS(Machine, PanBase):
 
         is_safe_values = dict()
 
+        monitored = None
+        if self._safety_monitor is not None and self._safety_monitor.is_running:
+            if self._safety_monitor.is_stale:
+                self.logger.warning("Safety monitor readings are stale, checking directly")
+            else:
+                monitored = self._safety_monitor.snapshot
+
         # Check if AC power connected and return immediately if not.
-        has_power = self.has_ac_power()
+        has_power = monitored["ac_power"] if monitored else self.has_ac_power()
         if not has_power:
             return False
 
         is_safe_values["ac_power"] = has_power
 
         # Check if nighttime
-        is_safe_values["is_dark"] = self.is_dark(horizon=horizon)
+        if monitored and f"is_dark_{horizon}" in monitored:
+            is_safe_values["is_dark"] = monitored[f"is_dark_{horizon}"]
+        else:
+            is_safe_values["is_dark"] = self.is_dark(horizon=horizon)
 
-        # Check weather
-        is_safe_values["good_weather"] = self.is_weather_safe()
+        if monitored:
+            is_safe_values["good_weather"] = monitored["good_weather"]
+            is_safe_values["free_space_root"] = monitored["free_space_root"]
+            is_safe_values["free_space_images"] = monitored["free_space_images"]
+        else:
+            # Check weather
+            is_safe_values["good_weather"] = self.is_weather_safe()
 
-        # Hard-drive space in root
-        is_safe_values["free_space_root"] = self.has_free_space("/")
+            # Hard-drive space in root
+            is_safe_values["free_space_root"] = self.has_free_space("/")
 
-        # Hard-drive space in images directory.
-        images_dir = self.get_config("directories.images")
-        is_safe_values["free_space_images"] = self.has_free_space(images_dir)
+            # Hard-drive space in images directory.
+            images_dir = self.get_config("directories.images")
+            is_safe_values["free_space_images"] = self.has_free_space(images_dir)
 
         # Check overall safety, ignoring some checks if necessary
         missing_keys = [k for k in ignore if k not in is_safe_values.keys()]
@@ -463,8 +602,19 @@ class POCS(Machine, PanBase):
             )
         safe = all([v for k, v in is_safe_values.items() if k not in ignore])
 
-        # Insert safety reading
-        self.db.insert_current("safety", is_safe_values, store_permanently=False)
+        # Insert safety reading when it changes, or periodically to keep it current.
+        if monitored:
+            record_interval = self._safety_record_interval
+        else:
+            record_interval = self.get_config("status_check_interval", default=60)
+        if (
+            is_safe_values != self._safety_record
+            or self._safety_recorded_at is None
+            or time.monotonic() - self._safety_recorded_at >= record_interval
+        ):
+            self.db.insert_current("safety", is_safe_values, store_permanently=False)
+            self._safety_record = is_safe_values
+            self._safety_recorded_at = time.monotonic()
 
         if not safe:
             if no_warning is False:
@@ -476,9 +626,20 @@ class POCS(Machine, PanBase):
                 self.logger.warning(f'Safety failed, setting {self.next_state=} to "parking"')
                 self.next_state = "parking"
 
-        self.update_status()
+        if not monitored:
+            self.update_status()
+
         return safe
 
+    def _on_safety_change(self, name, value):
+        """Called by the safety monitor when a check changes value."""
+        if value is False:
+            self.logger.warning(f"Safety check {name!r} became unsafe")
+        else:
+            self.logger.info(f"Safety check {name!r} is safe")
+
+        self.wake(f"{name} is {'safe' if value else 'unsafe'}")
+
     def _in_simulator(self, key):
         """Checks the config server for the given simulator key value."""
         with suppress(KeyError):
@@ -668,28 +829,71 @@ class POCS(Machine, PanBase):
     def wait(self, delay=None):
         """Send POCS to wait.
 
-        Loops for `delay` number of seconds. If `delay` is more than 30.0 seconds,
-        then check for status signals (which are updated every 60 seconds by default).
+        Waits for `delay` number of seconds or until POCS is woken up, whichever
+        comes first. POCS is woken up when it is interrupted or stopped, when a
+        safety check of the safety monitor changes, when a target of opportunity
+        is added to the observatory or by calling `wake`. A wake up before the
+        wait started also ends it, so the caller checks again. Targets of
+        opportunity requested by other processes through the config server are
+        checked every `wait_poll_interval` seconds (default 1).
 
         Keyword Arguments:
             delay {float|None} -- Number of seconds to wait. If default `None`, look up value in
                 config, otherwise 2.5 seconds.
+
+        Returns:
+            bool: True if the full delay expired, False if woken up early.
         """
         if delay is None:  # pragma: no cover
             delay = self.get_config("wait_delay", default=2.5)
+        poll_interval = self.get_config("wait_poll_interval", default=1)
 
         timer_name = "POCSWait"
         sleep_timer = CountdownTimer(delay, name=timer_name)
         self.logger.info(f"Starting {timer_name} timer of {delay} seconds")
-        while not sleep_timer.expired() and not self.interrupted:
-            self.logger.debug(f"POCS status: {self.status}")
-            self.logger.debug(f"{timer_name}: {sleep_timer.time_left():.02f} / {delay:.02f}")
-            sleep_timer.sleep(max_sleep=30)
-
-        is_expired = sleep_timer.expired()
-        self.logger.debug(f"Leaving wait timer: {is_expired}")
+        while not self._wake_event.is_set() and not sleep_timer.expired() and not self.interrupted:
+            if not self._wake_event.wait(timeout=min(sleep_timer.time_left(), poll_interval)):
+                self._check_wake_requests()
+
+        # Clear the wake up together with its reason, a later one is kept for the next wait.
+        with self._wake_lock:
+            woken = self._wake_event.is_set()
+            wake_reason = self._wake_reason
+            self._wake_event.clear()
+            self._wake_reason = None
+
+        is_expired = not woken and sleep_timer.expired()
+        self.logger.debug(f"Leaving wait timer: {is_expired=} {wake_reason=!r}")
         return is_expired
 
+    def wake(self, reason=None):
+        """End the current (or next) `wait` early.
+
+        Safe to call from any thread.
+
+        Args:
+            reason (str, optional): Why POCS is woken up, for the logs.
+        """
+        self.logger.debug(f"Waking POCS: {reason}")
+        with self._wake_lock:
+            self._wake_reason = reason
+            self._wake_event.set()
+
+    def _check_wake_requests(self):
+        """Pick up targets of opportunity that other processes requested.
+
+        A new request is added to the scheduler, which calls `wake` through
+        `_on_target_of_opportunity`. A request that is already waiting doesn't.
+        """
+        if self.observatory.scheduler is None:
+            return
+
+        self.observatory.check_targets_of_opportunity()
+
+    def _on_target_of_opportunity(self, observation):
+        """Called by the observatory when a target of opportunity is added."""
+        self.wake(f"target of opportunity {observation.name}")
+
     ################################################################################################
     # State Machine Methods
     ################################################################################################
@@ -747,9 +951,13 @@ class POCS(Machine, PanBase):
                 if self.is_dark(horizon=required_horizon):
                     break
 
-                # Sleep before checking again.
+                # Sleep before checking again, waking up when it gets dark.
+                delay = check_delay
+                time_until_dark = self.observatory.time_until_dark(horizon=required_horizon)
+                if time_until_dark is not None:
+                    delay = max(min(check_delay, time_until_dark), 1)
                 self.logger.info(f"Waiting for {required_horizon=!r} for {self.next_state=!r}")
-                self.wait(delay=check_delay)
+                self.wait(delay=delay)
 
             # TRANSITION TO STATE
             self.logger.info(f"Going to {self.next_state!r}")
@@ -905,6 +1113,13 @@ class POCS(Machine, PanBase):
         """
         self.logger.debug(f"Changing state from {event_data.state.name} to {event_data.event.name}")
 
+        # The time since the last change was spent in the state we are leaving.
+        now = (time.time(), time.monotonic())
+        if self._state_started is not None:
+            start, started = self._state_started
+            record_timing("state", start, now[1] - started, name=event_data.state.name)
+        self._state_started = now
+
     def after_state(self, event_data):
         """Called after each state.
 
@@ -15,6 +15,7 @@ from panoptes.utils import error
 from panoptes.utils.utils import listify
 
 from panoptes.pocs.base import PanBase
+from panoptes.pocs.utils.timing import record_when_set
 
 
 class AbstractFilterWheel(PanBase, metaclass=ABCMeta):
@@ -281,6 +282,14 @@ class AbstractFilterWheel(PanBase, metaclass=ABCMeta):
 
         self.logger.info(f"Moving {self} to position {new_position} ({self.filter_name(new_position)})")
         self._move_event.clear()
+        camera_name = self.camera.name if self.camera is not None else None
+        record_when_set(
+            self._move_event,
+            "filter_move",
+            timeout=self._timeout,
+            camera=camera_name,
+            filter=self.filter_name(new_position),
+        )
         self._move_to(new_position)  # Private method to actually perform the move.
 
         if blocking:
@@ -29,6 +29,9 @@ from panoptes.pocs.mount.serial import AbstractSerialMount
 class Mount(AbstractSerialMount):
     """Mount class for iOptron mounts."""
 
+    # The iOptron mounts slew at up to 4-4.5 deg/s (the iEQ30Pro a little slower).
+    slew_defaults = {"ra_rate": 3.5, "dec_rate": 3.5, "settle_time": 5.0}
+
     def __init__(self, location, mount_version=None, *args, **kwargs):
         self._mount_version = mount_version or self._mount_version
         super().__init__(location, *args, **kwargs)
@@ -11,6 +11,7 @@ import time
 from abc import abstractmethod
 from pathlib import Path
 
+from astroplan import Observer
 from astropy import units as u
 from astropy.coordinates import EarthLocation, SkyCoord
 
@@ -20,6 +21,8 @@ from panoptes.utils.time import CountdownTimer, current_time
 from panoptes.utils.utils import get_quantity_value
 
 from panoptes.pocs.base import PanBase
+from panoptes.pocs.mount.slew import SlewTimeModel
+from panoptes.pocs.utils.timing import record_timing
 
 
 class AbstractMount(PanBase):
@@ -47,6 +50,10 @@ class AbstractMount(PanBase):
 
     """
 
+    # Defaults for the slew-time model, see `estimate_slew_time`. Any of these can be
+    # overridden with the `mount.settings.slew` config items.
+    slew_defaults = {"ra_rate": 2.0, "dec_rate": 2.0, "settle_time": 5.0}
+
     def __init__(self, location, commands=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         assert isinstance(location, EarthLocation)
@@ -65,6 +72,7 @@ class AbstractMount(PanBase):
 
         # Set the initial location
         self._location = location
+        self._observer = None
 
         # Get mount settings from config.
         self.non_sidereal_available = self.mount_settings.setdefault("non_sidereal_available", False)
@@ -91,6 +99,10 @@ class AbstractMount(PanBase):
 
         self._movement_speed = ""
 
+        self.slew_model = SlewTimeModel.from_settings(
+            self.mount_settings.get("slew"), defaults=self.slew_defaults
+        )
+
         # Set initial coordinates
         self._target_coordinates = None
         self._current_coordinates = None
@@ -193,6 +205,7 @@ class AbstractMount(PanBase):
             location (astropy.coordinates.EarthLocation): New EarthLocation to use.
         """
         self._location = location
+        self._observer = None
         # If the location changes we need to update the mount
         self._setup_location_for_mount()
 
@@ -320,6 +333,47 @@ class AbstractMount(PanBase):
 
         return self._current_coordinates
 
+    @property
+    def pointing_coordinates(self):
+        """astropy.coordinates.SkyCoord or None: Where the mount was last known to point.
+
+        Uses the last coordinates read from the mount, or the target if they were never
+        read. This doesn't query the mount. None when the mount is parked or at home.
+        """
+        if self._is_parked or self._is_home:
+            return None
+
+        coords = self._current_coordinates
+        if coords is None and self._target_coordinates is not None:
+            coords = getattr(self._target_coordinates, "coord", self._target_coordinates)
+
+        return coords
+
+    def estimate_slew_time(self, coords, time=None, start=None):
+        """Estimate the time to slew to the given coordinates.
+
+        Uses `slew_model`, i.e. the distance each axis has to turn (including a
+        meridian flip when the target is on the other side of the meridian) at the
+        configured rates, plus a settle time.
+
+        Args:
+            coords (astropy.coordinates.SkyCoord): Target coordinates, scalar or array.
+            time (astropy.time.Time, optional): Time of the slew, defaults to now.
+            start (astropy.coordinates.SkyCoord, optional): Where the slew starts,
+                defaults to `pointing_coordinates` (the home position if None).
+
+        Returns:
+            astropy.units.Quantity: The slew times in seconds, one per target.
+        """
+        time = time or current_time()
+        start = start if start is not None else self.pointing_coordinates
+
+        # Reused between calls, the scheduler asks for an estimate on every pass.
+        if self._observer is None:
+            self._observer = Observer(location=self.location)
+
+        return self.slew_model.estimate(self._observer, time, coords, start=start) * u.second
+
     def distance_from_target(self):
         """Get current distance from target
 
@@ -533,6 +587,8 @@ class AbstractMount(PanBase):
             self.logger.info("Target Coordinates not set")
         else:
             self.logger.debug("Slewing to target")
+            slew_start = time.time()
+            slew_started = time.monotonic()
             success = bool(self.query("slew_to_target"))
 
             self.logger.debug(f"Mount response: {success}")
@@ -556,6 +612,7 @@ class AbstractMount(PanBase):
                         self.update_status()
 
                     self.logger.debug("Done with slew_to_target block")
+                    record_timing("slew", slew_start, time.monotonic() - slew_started)
             else:
                 self.logger.warning("Problem with slew_to_target")
 
@@ -0,0 +1,156 @@
+"""Slew-time model for German equatorial mounts.
+
+Defines SlewTimeModel, which estimates how long a mount takes to move between
+two positions on the sky from the distance each axis has to turn, the axis
+rates and a settle time. The axes move at the same time, so the slew takes as
+long as the slower axis.
+
+The mechanical axis angles are measured from the home position (counterweight
+down, pointing at the celestial pole). A target west of the meridian is
+observed with the telescope on the east side of the pier and vice versa, so
+moving between the two sides (a meridian flip) turns the RA axis by about 180
+degrees and swings the Dec axis through the pole, just like the real mount.
+
+The model is vectorized so the scheduler can estimate the slew time to every
+field at once, see `panoptes.pocs.scheduler.constraint.SlewTime`.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from astroplan import Observer
+from astropy import units as u
+from astropy.coordinates import SkyCoord
+from astropy.time import Time
+
+# Default axis rates (degrees per second) and settle time (seconds).
+DEFAULT_SLEW_RATE = 2.0
+DEFAULT_SETTLE_TIME = 5.0
+
+
+@dataclass(frozen=True)
+class SlewTimeModel:
+    """Estimate slew times from axis distances, axis rates and a settle time.
+
+    Attributes:
+        ra_rate (float): Slew rate of the RA (hour angle) axis in degrees per second.
+        dec_rate (float): Slew rate of the Dec axis in degrees per second.
+        settle_time (float): Seconds added to every slew for acceleration and settling.
+    """
+
+    ra_rate: float = DEFAULT_SLEW_RATE
+    dec_rate: float = DEFAULT_SLEW_RATE
+    settle_time: float = DEFAULT_SETTLE_TIME
+
+    def __post_init__(self):
+        if self.ra_rate <= 0 or self.dec_rate <= 0:
+            raise ValueError(f"Slew rates must be positive: {self.ra_rate=} {self.dec_rate=}")
+        if self.settle_time < 0:
+            raise ValueError(f"Settle time can't be negative: {self.settle_time=}")
+
+    @staticmethod
+    def get_axis_positions(ha, dec, latitude=90.0) -> tuple[np.ndarray, np.ndarray]:
+        """Mechanical axis angles for pointing at the given hour angles and declinations.
+
+        Args:
+            ha (float or numpy.ndarray): Hour angles in degrees.
+            dec (float or numpy.ndarray): Declinations in degrees.
+            latitude (float, optional): Latitude of the mount in degrees, only the sign
+                (which pole the mount points at) is used. Default northern hemisphere.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: RA and Dec axis angles in degrees from
+            the home position. The sign of the Dec axis angle is the side of the pier.
+        """
+        ha = (np.asarray(ha, dtype=float) + 180) % 360 - 180
+        polar_distance = 90 - np.asarray(dec, dtype=float) * (1 if latitude >= 0 else -1)
+
+        west = ha >= 0
+        ra_axis = np.where(west, ha - 90, ha + 90)
+        dec_axis = np.where(west, polar_distance, -polar_distance)
+
+        return ra_axis, dec_axis
+
+    def get_slew_time(self, start_ha, start_dec, ha, dec, latitude=90.0) -> np.ndarray:
+        """Seconds to slew from one hour angle and declination to another.
+
+        The start position can be None for the home position. A slew to the
+        current position takes no time (no settle time either).
+
+        Args:
+            start_ha (float or None): Hour angle of the start position in degrees.
+            start_dec (float or None): Declination of the start position in degrees.
+            ha (float or numpy.ndarray): Hour angles of the targets in degrees.
+            dec (float or numpy.ndarray): Declinations of the targets in degrees.
+            latitude (float, optional): Latitude of the mount in degrees.
+
+        Returns:
+            numpy.ndarray: The slew times in seconds.
+        """
+        if start_ha is None or start_dec is None:
+            start_ra_axis, start_dec_axis = 0.0, 0.0
+        else:
+            start_ra_axis, start_dec_axis = self.get_axis_positions(start_ha, start_dec, latitude)
+
+        ra_axis, dec_axis = self.get_axis_positions(ha, dec, latitude)
+
+        ra_time = np.abs(ra_axis - start_ra_axis) / self.ra_rate
+        dec_time = np.abs(dec_axis - start_dec_axis) / self.dec_rate
+        axis_time = np.maximum(ra_time, dec_time)
+
+        return np.where(axis_time > 0, axis_time + self.settle_time, 0.0)
+
+    def estimate(
+        self, observer: Observer, time: Time, coords: SkyCoord, start: SkyCoord | None = None
+    ) -> np.ndarray:
+        """Seconds to slew from `start` to each of `coords` at `time`.
+
+        Args:
+            observer (astroplan.Observer): The observing site.
+            time (astropy.time.Time): The time of the slew.
+            coords (astropy.coordinates.SkyCoord): The target coordinates (scalar or array).
+            start (astropy.coordinates.SkyCoord, optional): Where the mount points now,
+                None for the home position.
+
+        Returns:
+            numpy.ndarray: The slew times in seconds, one per target.
+        """
+        lst = observer.local_sidereal_time(time, kind="mean").degree
+        latitude = observer.location.lat.degree
+
+        coords = coords.icrs
+        ha = lst - np.atleast_1d(coords.ra.degree)
+        dec = np.atleast_1d(coords.dec.degree)
+
+        start_ha = start_dec = None
+        if start is not None:
+            start = start.icrs
+            start_ha = lst - start.ra.degree
+            start_dec = start.dec.degree
+
+        return self.get_slew_time(start_ha, start_dec, ha, dec, latitude=latitude)
+
+    @classmethod
+    def from_settings(cls, settings: dict | None = None, defaults: dict | None = None):
+        """Create a model from the `mount.settings.slew` config items.
+
+        Args:
+            settings (dict, optional): Any of ``ra_rate``, ``dec_rate`` (degrees per second)
+                and ``settle_time`` (seconds). Quantities are converted.
+            defaults (dict, optional): Values for the items missing from `settings`.
+
+        Returns:
+            SlewTimeModel: The model.
+        """
+        items = {**(defaults or dict()), **(settings or dict())}
+        units = {"ra_rate": u.degree / u.second, "dec_rate": u.degree / u.second, "settle_time": u.second}
+
+        values = dict()
+        for name, unit in units.items():
+            if name in items:
+                value = items[name]
+                if isinstance(value, u.Quantity):
+                    value = value.to_value(unit)
+                values[name] = float(value)
+
+        return cls(**values)
@@ -6,17 +6,18 @@ status, darkness checks, and common operations.
 """
 
 import os
+import time
 from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import wait
 from contextlib import suppress
 from pathlib import Path
 
 import numpy as np
 from astropy import units as u
-from astropy.coordinates import get_body
 from astropy.io.fits import setval
 
 from panoptes.utils import error
-from panoptes.utils import images as img_utils
 from panoptes.utils.images import fits as fits_utils
 from panoptes.utils.time import CountdownTimer, current_time, flatten_time
 from panoptes.utils.utils import get_quantity_value, listify
@@ -26,12 +27,15 @@ from panoptes.pocs.base import PanBase
 from panoptes.pocs.camera import AbstractCamera
 from panoptes.pocs.dome import AbstractDome
 from panoptes.pocs.mount.mount import AbstractMount
+from panoptes.pocs.scheduler.ephemeris import FieldEphemeris, get_night_ephemeris
 from panoptes.pocs.scheduler.field import Field
 from panoptes.pocs.scheduler.observation.base import Observation
 from panoptes.pocs.scheduler.observation.compound import Observation as CompoundObservation
-from panoptes.pocs.scheduler.scheduler import BaseScheduler
-from panoptes.pocs.utils.cloud import upload_image as image_uploader
+from panoptes.pocs.scheduler.scheduler import TOO_CONFIG_KEY, BaseScheduler
 from panoptes.pocs.utils.location import create_location_from_config
+from panoptes.pocs.utils.processing import ProcessingPipeline, process_exposure
+from panoptes.pocs.utils.status import StatusCache
+from panoptes.pocs.utils.timing import record_timing, timed
 
 
 class Observatory(PanBase):
@@ -80,7 +84,7 @@ class Observatory(PanBase):
 
         # Do some one-time calculations
         now = current_time()
-        self._local_sun_pos = self.observer.altaz(now, target=get_body("sun", now)).alt  # Re-calculated
+        self._local_sun_pos = get_night_ephemeris(self.observer, now).sun_altaz(now).alt  # Re-calculated
         self._local_sunrise = self.observer.sun_rise_time(now)
         self._local_sunset = self.observer.sun_set_time(now)
         self._evening_astro_time = self.observer.twilight_evening_astronomical(now, which="next")
@@ -102,6 +106,11 @@ class Observatory(PanBase):
 
         self.set_scheduler(scheduler)
         self.current_offset_info = None
+        self._processing_pipeline: ProcessingPipeline | None = None
+        self._status_cache = StatusCache(ttls=self.get_config("status.ttl", default=None))
+        self._field_ephemeris: FieldEphemeris | None = None
+        # Called with each new target of opportunity, see `subscribe_targets_of_opportunity`.
+        self._too_subscribers: list[Callable] = list()
 
         self._image_dir = self.get_config("directories.images")
 
@@ -130,13 +139,50 @@ class Observatory(PanBase):
             at_time = current_time()
 
         horizon_deg = self.get_config(f"location.{horizon}_horizon", default=default_dark)
-        is_dark = self.observer.is_night(at_time, horizon=horizon_deg)
 
-        self._local_sun_pos = self.observer.altaz(at_time, target=get_body("sun", at_time)).alt
+        # Same as `observer.is_night` but from the shared per-night ephemeris.
+        self._local_sun_pos = get_night_ephemeris(self.observer, at_time).sun_altaz(at_time).alt
+        is_dark = bool(self._local_sun_pos < get_quantity_value(horizon_deg, u.degree) * u.degree)
         self.logger.debug(f"Sun {self._local_sun_pos:.02f} > {horizon_deg} [{horizon}]")
 
         return is_dark
 
+    def time_until_dark(self, horizon="observe", default_dark=-18 * u.degree, at_time=None):
+        """Seconds until the Sun is below the horizon.
+
+        Args:
+            horizon (str, optional): Which horizon to use, 'flat', 'focus', or
+                'observe' (default).
+            default_dark (`astropy.unit.Quantity`, optional): The default horizon, see `is_dark`.
+            at_time (None or `astropy.time.Time`, optional): The time to start from, defaults to now.
+
+        Returns:
+            float or None: Seconds until dark, zero if it is dark, or None if the
+            Sun doesn't set below the horizon.
+        """
+        if at_time is None:
+            at_time = current_time()
+
+        if self.is_dark(horizon=horizon, default_dark=default_dark, at_time=at_time):
+            return 0.0
+
+        horizon_deg = get_quantity_value(
+            self.get_config(f"location.{horizon}_horizon", default=default_dark), u.degree
+        )
+        try:
+            start_time, _ = get_night_ephemeris(self.observer, at_time).tonight(
+                at_time, horizon=horizon_deg * u.degree
+            )
+            seconds = float((start_time - at_time).to_value(u.second))
+        except Exception as e:
+            self.logger.warning(f"Can't compute when it is dark for {horizon=}: {e!r}")
+            return None
+
+        if not np.isfinite(seconds):
+            return None
+
+        return max(seconds, 0.0)
+
     ##########################################################################
     # Properties
     ##########################################################################
@@ -343,62 +389,121 @@ class Observatory(PanBase):
         self.logger.debug("Shutting down observatory")
 
         # Wait for the cameras to finish exposing.
-        wait_timer = CountdownTimer(120, name="FinishCameraExposureWait")
-        while self.current_observation and any(cam.is_observing for cam in self.cameras.values()):
-            if wait_timer.expired():
+        if self.current_observation and any(cam.is_observing for cam in self.cameras.values()):
+            self.logger.debug("Waiting for cameras to finish observing, please be patient...")
+            if self.wait_for_cameras(timeout=120):
                 self.logger.warning(
                     "Timeout waiting for cameras to finish observing, "
                     "proceeding with the parking of the mount."
                 )
-                break
-
-            self.logger.debug(f"Waiting for cameras to finish observing, please be patient...{wait_timer}")
-            wait_timer.sleep(max_sleep=5)
 
         if self.mount:
             self.mount.disconnect()
         if self.dome:
             self.dome.disconnect()
+        if self.scheduler:
+            self.scheduler.shutdown_pool()
+        if self._processing_pipeline is not None:
+            self.logger.debug(f"Waiting for {self.processing_queue_depth} exposures to be processed")
+            self._processing_pipeline.shutdown()
+            self._processing_pipeline = None
 
     @property
     def status(self):
-        """Get status information for various parts of the observatory."""
+        """Get status information for various parts of the observatory, see `get_status`."""
+        return self.get_status()
+
+    def get_status(self, force: bool = False) -> dict:
+        """Get status information for various parts of the observatory.
+
+        The mount, dome, observation and observer sections are reused for the
+        number of seconds in the `status.ttl` config items. A section is refreshed
+        sooner if what it describes changes, e.g. the mount parks or the current
+        observation takes another exposure.
+
+        Args:
+            force (bool, optional): Refresh all sections, default False.
+
+        Returns:
+            dict: The status by section.
+        """
         status = {"can_observe": self.can_observe}
 
-        now = current_time()
+        mount_key = None
+        if self.mount:
+            mount_key = (
+                id(self.mount),
+                self.mount.is_initialized,
+                self.mount.state,
+                self.mount.is_parked,
+                self.mount.is_tracking,
+                self.mount.is_slewing,
+                id(self.mount.get_target_coordinates()),
+            )
+
+        observation_key = None
+        if self.current_observation:
+            observation = self.current_observation
+            observation_key = (id(observation), observation.current_exp_num, observation.seq_time)
+
+        sections = {
+            "mount": (self._get_mount_status, mount_key),
+            "dome": (self._get_dome_status, id(self.dome)),
+            "observation": (self._get_observation_status, observation_key),
+            "observer": (self._get_observer_status, None),
+        }
+        for name, (func, key) in sections.items():
+            section = self._status_cache.get(name, func, key=key, force=force)
+            if section is not None:
+                status[name] = section
 
+        status["processing_queue"] = self.processing_queue_depth
+        if self._processing_pipeline is not None:
+            status["processing"] = self._processing_pipeline.stats
+
+        return status
+
+    def _get_mount_status(self):
         try:
             if self.mount and self.mount.is_initialized:
-                status["mount"] = self.mount.status
+                now = current_time()
+                status = self.mount.status
                 self.logger.debug("Getting mount current coordinates")
                 current_coords = self.mount.get_current_coordinates()
                 if current_coords:
-                    status["mount"]["current_ha"] = get_quantity_value(
+                    status["current_ha"] = get_quantity_value(
                         self.observer.target_hour_angle(now, current_coords), unit="degree"
                     )
                 if self.mount.has_target:
                     target_coords = self.mount.get_target_coordinates()
                     target_ha = self.observer.target_hour_angle(now, target_coords)
-                    status["mount"]["mount_target_ha"] = get_quantity_value(target_ha, unit="degree")
+                    status["mount_target_ha"] = get_quantity_value(target_ha, unit="degree")
+                return status
         except Exception as e:  # pragma: no cover
             self.logger.warning(f"Can't get mount status: {e!r}")
 
+    def _get_dome_status(self):
         try:
             if self.dome:
-                status["dome"] = self.dome.status
+                return self.dome.status
         except Exception as e:  # pragma: no cover
             self.logger.warning(f"Can't get dome status: {e!r}")
 
+    def _get_observation_status(self):
         try:
             if self.current_observation:
-                status["observation"] = self.current_observation.status
+                status = self.current_observation.status
                 field = self.current_observation.field
-                status["observation"]["field_ha"] = self.observer.target_hour_angle(now, field)
+                status["field_ha"] = self.observer.target_hour_angle(current_time(), field)
+                return status
         except Exception as e:  # pragma: no cover
             self.logger.warning(f"Can't get observation status: {e!r}")
 
+    def _get_observer_status(self):
         try:
-            status["observer"] = {
+            now = current_time()
+            night = get_night_ephemeris(self.observer, now)
+            return {
                 "siderealtime": get_quantity_value(self.sidereal_time, unit="degree"),
                 "utctime": now,
                 "local_evening_astro_time": self._evening_astro_time,
@@ -406,16 +511,13 @@ class Observatory(PanBase):
                 "local_sun_set_time": self._local_sunset,
                 "local_sun_rise_time": self._local_sunrise,
                 "local_sun_position": get_quantity_value(self._local_sun_pos, unit="degree"),
-                "local_moon_alt": get_quantity_value(self.observer.moon_altaz(now).alt, unit="degree"),
-                "local_moon_illumination": self.observer.moon_illumination(now),
-                "local_moon_phase": get_quantity_value(self.observer.moon_phase(now)) / np.pi,
+                "local_moon_alt": get_quantity_value(night.moon_altaz(now).alt, unit="degree"),
+                "local_moon_illumination": night.moon_illumination(now),
+                "local_moon_phase": get_quantity_value(night.moon_phase(now)) / np.pi,
             }
-
         except Exception as e:  # pragma: no cover
             self.logger.warning(f"Can't get time status: {e!r}")
 
-        return status
-
     def get_observation(self, *args, **kwargs):
         """Gets the next observation from the scheduler
 
@@ -440,6 +542,15 @@ class Observatory(PanBase):
             or self.get_config("scheduler.check_file", default=False)
         )
 
+        # Pick up any requested target of opportunity; this pass will consider it.
+        self.check_targets_of_opportunity()
+        self.scheduler.clear_preemption()
+
+        if self.mount is not None:
+            # Let the scheduler estimate slew times from where the mount points.
+            self.scheduler.slew_model = self.mount.slew_model
+            self.scheduler.mount_coords = self.mount.pointing_coordinates
+
         # This will set the `current_observation`.
         self.scheduler.get_observation(read_file=reread_file, *args, **kwargs)
 
@@ -447,8 +558,76 @@ class Observatory(PanBase):
             self.scheduler.clear_available_observations()
             raise error.NoObservation("No valid observations found")
 
+        # Compute the header values for the exposures before the first one starts.
+        try:
+            self.get_field_ephemeris(self.current_observation)
+        except Exception as e:  # pragma: no cover
+            self.logger.warning(f"Can't compute the field ephemeris: {e!r}")
+
         return self.current_observation
 
+    def add_target_of_opportunity(self, observation_config: dict, priority=None):
+        """Add an urgent observation to the scheduler.
+
+        The observing loop stops after the current exposure and the scheduler is
+        asked for a new observation, see `BaseScheduler.add_target_of_opportunity`.
+
+        Args:
+            observation_config (dict): Configuration dict for `Field` and `Observation`.
+            priority (float, optional): Priority of the observation, defaults to the
+                `scheduler.too_priority` config item.
+
+        Returns:
+            `~pocs.scheduler.observation.Observation`: The added observation.
+        """
+        if not self.scheduler:
+            raise error.PanError("Scheduler not present, cannot add a target of opportunity.")
+
+        observation = self.scheduler.add_target_of_opportunity(observation_config, priority=priority)
+
+        for callback in list(self._too_subscribers):
+            try:
+                callback(observation)
+            except Exception as e:
+                self.logger.warning(f"Problem notifying {callback} of {observation}: {e!r}")
+
+        return observation
+
+    def subscribe_targets_of_opportunity(self, callback: Callable[[Observation], None]):
+        """Call ``callback(observation)`` whenever a target of opportunity is added.
+
+        The callback is called from the thread that added the target, e.g. so POCS
+        stops waiting. Exceptions are logged and ignored.
+        """
+        self._too_subscribers.append(callback)
+
+    def unsubscribe_targets_of_opportunity(self, callback: Callable[[Observation], None]):
+        if callback in self._too_subscribers:
+            self._too_subscribers.remove(callback)
+
+    def check_targets_of_opportunity(self) -> bool:
+        """Check for a target of opportunity and if the current observation should stop.
+
+        Other processes (e.g. ``pocs scheduler too``) request a target of opportunity
+        by setting the `scheduler.target_of_opportunity` config item to an observation
+        config. The request is added to the scheduler and the config item is cleared.
+
+        Returns:
+            bool: True if a target of opportunity is waiting for the next scheduling pass.
+        """
+        if not self.scheduler:
+            return False
+
+        observation_config = self.get_config(TOO_CONFIG_KEY, default=None)
+        if observation_config:
+            self.set_config(TOO_CONFIG_KEY, None)
+            try:
+                self.add_target_of_opportunity(observation_config)
+            except error.InvalidObservation as e:
+                self.logger.warning(f"Ignoring target of opportunity: {e!r}")
+
+        return self.scheduler.preempt_requested
+
     def take_observation(self, blocking: bool = True):
         """Take individual images for the current observation.
 
@@ -463,8 +642,12 @@ class Observatory(PanBase):
         if len(self.cameras) == 0:
             raise error.CameraNotFound("No cameras available, unable to take observation")
 
+        observation_start = time.time()
+        observation_started = time.monotonic()
+
         # Get observatory metadata
-        headers = self.get_standard_headers()
+        with timed("headers", field=self.current_observation.name):
+            headers = self.get_standard_headers()
 
         # All cameras share a similar start time
         headers["start_time"] = current_time(flatten=True)
@@ -482,29 +665,96 @@ class Observatory(PanBase):
         if blocking:
             cam = self.primary_camera
             exptime = self.current_observation.exptime.value
-            readout_time = cam.readout_time
-            timeout = exptime + readout_time + cam.timeout
-
-            timer = CountdownTimer(timeout, name="Observe")
-            # Sleep for the exposure time to start.
-            timer.sleep(max_sleep=exptime + readout_time)
-            # Then start checking for complete exposures.
-            while timer.expired() is False:
-                done_observing = [cam.is_observing is False for cam in self.cameras.values()]
-                if all(done_observing):
-                    self.logger.info("Finished observing for all cameras")
-                    break
-
-                timer.sleep(max_sleep=readout_time)
-
-            # If timer expired check cameras and remove if stuck.
-            if timer.expired():
+            timeout = exptime + cam.readout_time + cam.timeout
+
+            # Wake up as soon as the last camera is done.
+            not_done = self.wait_for_cameras(timeout=timeout)
+            if not_done:
+                # Remove the cameras that are stuck.
                 self.logger.warning("Timer expired waiting for cameras to finish observing")
-                not_done = [cam_id for cam_id, cam in self.cameras.items() if cam.is_observing]
                 for cam_id in not_done:
                     self.logger.warning(f"Removing {cam_id} from observatory")
                     with suppress(KeyError):
                         del self.cameras[cam_id]
+            else:
+                self.logger.info("Finished observing for all cameras")
+
+            record_timing(
+                "observation",
+                observation_start,
+                time.monotonic() - observation_started,
+                field=self.current_observation.name,
+            )
+
+    def wait_for_cameras(self, cam_names=None, timeout: float | None = None) -> list[str]:
+        """Wait for the cameras to finish their latest observation.
+
+        Waits on the `observation_future` of all the cameras at once, so this returns
+        as soon as the last camera is done rather than at the next polling interval.
+
+        Args:
+            cam_names (list[str], optional): The cameras to wait for, default all.
+            timeout (float, optional): Maximum number of seconds to wait, default forever.
+
+        Returns:
+            list[str]: The names of the cameras that are still observing, empty if all are done.
+        """
+        if cam_names is None:
+            cam_names = list(self.cameras.keys())
+
+        futures = dict()
+        for cam_name in cam_names:
+            camera = self.cameras.get(cam_name)
+            if camera is not None and camera.observation_future is not None:
+                futures[cam_name] = camera.observation_future
+
+        done, _ = wait(futures.values(), timeout=timeout)
+
+        for cam_name, future in futures.items():
+            if future in done and future.exception() is not None:
+                self.logger.warning(f"Observation on {cam_name} failed: {future.exception()!r}")
+
+        return [cam_name for cam_name, future in futures.items() if future not in done]
+
+    @property
+    def processing_pipeline(self) -> ProcessingPipeline:
+        """The staged pipeline that processes exposures, see `process_observation`.
+
+        Configured with the `observations.processing` config items: ``workers`` and
+        ``max_queue_size`` are the defaults for each stage, and ``stages`` can set them
+        per stage. The workers are started on first use.
+        """
+        if self._processing_pipeline is None:
+            config = self.get_config("observations.processing", default=None) or dict()
+            self._processing_pipeline = ProcessingPipeline(
+                stages=config.get("stages"),
+                workers=config.get("workers", 1),
+                max_queue_size=config.get("max_queue_size", 8),
+            )
+
+        return self._processing_pipeline
+
+    @property
+    def processing_queue_depth(self) -> int:
+        """int: Number of exposures that are waiting for or being processed."""
+        if self._processing_pipeline is None:
+            return 0
+
+        return self._processing_pipeline.queue_depth
+
+    def wait_for_processing(self, timeout: float | None = None) -> bool:
+        """Wait for the exposures handed to the processing pipeline to be processed.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait, default forever.
+
+        Returns:
+            bool: True if all the processing finished.
+        """
+        if self._processing_pipeline is None:
+            return True
+
+        return self._processing_pipeline.join(timeout=timeout)
 
     def process_observation(
         self,
@@ -513,17 +763,24 @@ class Observatory(PanBase):
         make_pretty_images: bool | None = None,
         plate_solve: bool | None = None,
         upload_image: bool | None = None,
+        blocking: bool = True,
     ):
         """Process an individual observation.
 
-        Performs the following steps:
+        Performs the following steps for the latest exposure of each camera:
 
             1. First checks to make sure that the file exists on the file system.
-            2. Calls `_process_fits` with the filename and info, which is specific to each camera.
-            3. Makes pretty images if requested.
-            4. Records observation metadata if requested.
-            5. Compress FITS files if requested.
-            6. Sets the observation_event.
+            2. Plate solves the image if requested.
+            3. Compress FITS files if requested.
+            4. Makes pretty images if requested.
+            5. Uploads the images if requested.
+            6. Records observation metadata if requested.
+
+        Steps 2-5 are done by `panoptes.pocs.utils.processing.process_exposure`. If
+        `blocking` is False they are stages of the `processing_pipeline`, so different
+        frames can be solved, compressed and uploaded at the same time, and this method
+        returns as soon as the exposures are queued (waiting while the queue is full).
+        Exposures whose metadata ``status`` is ``complete`` are skipped.
 
         If the camera is a primary camera, extract the jpeg image and save metadata to database
         `current` collection. Saves metadata to `observations` collection for all images.
@@ -538,8 +795,35 @@ class Observatory(PanBase):
                 If None (default), checks the `observations.make_pretty_images`
                 config-server key.
             plate_solve (bool or None): If images should be plate solved, default None for config.
-            upload_image (bool or None): If images should be uploaded (in a separate process).
+            upload_image (bool or None): If images should be uploaded.
+            blocking (bool, optional): If the exposures should be processed before returning
+                (the default) or handed to the `processing_pipeline`.
         """
+        if plate_solve is None:
+            plate_solve = self.get_config("observations.plate_solve", default=False)
+        if compress_fits is None:
+            compress_fits = self.get_config("observations.compress_fits", default=False)
+        if make_pretty_images is None:
+            make_pretty_images = self.get_config("observations.make_pretty_images", default=False)
+        if upload_image is None:
+            upload_image = self.get_config("observations.upload_image", default=False)
+        if record_observations is None:
+            record_observations = self.get_config("observations.record_observations", default=False)
+
+        # Get the images directory.
+        images_dir = Path(self.get_config("directories.images", default=Path("~/images"))).expanduser()
+
+        options = dict(
+            plate_solve=plate_solve,
+            solve_timeout=self.get_config("cameras.defaults.timeout", default=60),
+            compress_fits=compress_fits,
+            make_pretty_images=make_pretty_images,
+            latest_link_path=(images_dir / "latest.jpg").as_posix(),
+            upload_image=upload_image,
+            bucket_name=self.get_config("panoptes_network.buckets.upload"),
+            images_dir=images_dir.as_posix(),
+        )
+
         for cam_name in self.cameras.keys():
             try:
                 exposure = self.current_observation.exposure_list[cam_name][-1]
@@ -552,123 +836,40 @@ class Observatory(PanBase):
                 metadata = exposure.metadata
                 image_id = metadata["image_id"]
                 seq_id = metadata["sequence_id"]
-                unit_id = seq_id.split("_")[0]
                 file_path = metadata["filepath"]
                 exptime = metadata["exptime"]
             except KeyError as e:
                 self.logger.warning(f"No information in image metadata, unable to process:  {e!r}")
                 continue
 
-            field_name = metadata.get("field_name", "")
-
             # Check for a FITS file of whatever file_path we have.
             if Path(file_path).with_suffix(".fits").exists():
                 file_path = Path(file_path).with_suffix(".fits").as_posix()
             else:
                 # Give a warning and skip processing.
                 self.logger.warning(f"No FITS file found for processing: {file_path=}")
-                return
-
-            if not Path(file_path).exists():
-                self.logger.error(f"Trying to process observation but missing {file_path=}")
-                return
+                continue
 
             if metadata.get("status") == "complete":
                 self.logger.debug(f"{image_id} has already been processed, skipping")
-                return
-
-            if plate_solve is None:
-                plate_solve = self.get_config("observations.plate_solve", default=False)
-
-            if plate_solve:
-                self.logger.debug(f"Plate solving {file_path=}")
-                try:
-                    default_timeout = self.get_config("cameras.defaults.timeout", default=60)
-                    metadata = fits_utils.get_solve_field(file_path, timeout=default_timeout)
-                    file_path = metadata["solved_fits_file"]
-                    self.logger.debug(f"Solved {file_path}, replacing metadata.")
-                except Exception as e:
-                    self.logger.warning(f"Problem solving {file_path=}: {e!r}")
-
-            if compress_fits is None:
-                compress_fits = self.get_config("observations.compress_fits", default=False)
-
-            if compress_fits:
-                self.logger.debug(f"Compressing {file_path=!r}")
-                try:
-                    compressed_file_path = fits_utils.fpack(str(file_path))
-                    exposure.path = Path(compressed_file_path)
-                    metadata["filepath"] = compressed_file_path
-                    self.logger.debug(f"Compressed {compressed_file_path}")
-                except (FileNotFoundError, AssertionError) as e:
-                    self.logger.warning(f"Problem compressing, file not found {file_path=}: {e!r}")
-
-            bucket_name = self.get_config("panoptes_network.buckets.upload")
-            # Get the images directory.
-            images_dir = (
-                Path(self.get_config("directories.images", default=Path("~/images"))).expanduser().as_posix()
-            )
-
-            pretty_image_path = None
-            if make_pretty_images is None:
-                make_pretty_images = self.get_config("observations.make_pretty_images", default=False)
-
-            if make_pretty_images:
-                try:
-                    image_title = f"{field_name} [{exptime}s] {seq_id}"
-
-                    cr2_file_path = file_path.replace(".fits", ".cr2").replace(".fz", "")
-
-                    link_path = None
-                    if metadata.get("is_primary", False):
-                        link_path = Path(self.get_config("directories.images")) / "latest.jpg"
-                    self.logger.debug(f"Making pretty image for {cr2_file_path=!r}")
-
-                    pretty_image_path = img_utils.make_pretty_image(
-                        cr2_file_path, title=image_title, link_path=link_path
-                    )
-                    self.logger.debug(f"Pretty image created: {pretty_image_path}")
-                    self.logger.debug(f"Pretty image linked to {link_path}")
-                except Exception as e:  # pragma: no cover
-                    self.logger.warning(f"Problem with extracting pretty image: {e!r}")
-
-            if upload_image is None:
-                upload_image = self.get_config("observations.upload_image", default=False)
-
-            if upload_image:
-                self.logger.debug(f"Uploading current observation: {image_id}")
-                try:
-                    image_path = exposure.path.as_posix()
-                    self.logger.debug(f"Preparing {image_path=} for upload to {bucket_name=}")
-
-                    # Remove images directory from path so it's stored in bucket relative to images directory.
-                    bucket_path = Path(image_path[image_path.find(images_dir) + len(images_dir) :])
+                continue
 
-                    self.logger.debug(f"Adding {unit_id=} to {bucket_path=}")
-                    bucket_path = Path(unit_id) / bucket_path.relative_to("/")
+            self.logger.debug(f"Processing {image_id} [{exptime}s] of {seq_id}")
 
-                    # Upload FITS.
-                    metadata["fits_public_url"] = image_uploader(
-                        file_path=exposure.path,
-                        bucket_path=bucket_path.as_posix(),
-                        bucket_name=bucket_name,
-                    )
-                    # Upload pretty image.
-                    if pretty_image_path:
-                        metadata["pretty_image_url"] = image_uploader(
-                            file_path=pretty_image_path,
-                            bucket_path=bucket_path.with_suffix(".jpg").as_posix().replace(".fits", ""),
-                            bucket_name=bucket_name,
-                        )
-                except Exception as e:
-                    self.logger.warning(f"Problem uploading exposure: {e!r}")
+            def _finish_processing(processed, exposure=exposure):
+                exposure.path = Path(processed.pop("image_path"))
+                exposure.metadata.update(processed)
+                if record_observations:
+                    self.logger.debug(f"Adding current observation to db: {processed['image_id']}")
+                    exposure.metadata["status"] = "complete"
+                    self.db.insert_current("images", exposure.metadata, store_permanently=False)
 
-            if record_observations is None:
-                record_observations = self.get_config("observations.record_observations", default=False)
-            if record_observations:
-                self.logger.debug(f"Adding current observation to db: {image_id}")
-                metadata["status"] = "complete"
-                self.db.insert_current("images", metadata, store_permanently=False)
+            args = ({**metadata, "filepath": file_path}, exposure.path.as_posix())
+            if blocking:
+                _finish_processing(process_exposure(*args, **options))
+            else:
+                self.logger.debug(f"Queueing {image_id} for processing, {self.processing_queue_depth=}")
+                self.processing_pipeline.submit(*args, options, callback=_finish_processing)
 
     def update_tracking(self, **kwargs):
         """Update tracking with rate adjustment.
@@ -733,22 +934,21 @@ class Observatory(PanBase):
 
         assert observation is not None, self.logger.warning("No observation, can't get headers")
 
-        field = observation.field
-
         self.logger.debug(f"Getting headers for : {observation}")
 
         t0 = current_time()
-        moon = get_body("moon", t0, self.observer.location)
+        night = get_night_ephemeris(self.observer, t0)
+        ephemeris = self.get_field_ephemeris(observation, at_time=t0)
 
         headers = {
-            "airmass": self.observer.altaz(t0, field).secz.value,
+            "airmass": ephemeris.airmass(t0),
             "creator": f"POCSv{self.__version__}",
             "elevation": self.location.get("elevation").value,
-            "ha_mnt": self.observer.target_hour_angle(t0, field).value,
+            "ha_mnt": ephemeris.hour_angle(t0),
             "latitude": self.location.get("latitude").value,
             "longitude": self.location.get("longitude").value,
-            "moon_fraction": self.observer.moon_illumination(t0),
-            "moon_separation": moon.separation(field.coord, origin_mismatch="ignore").value,
+            "moon_fraction": night.moon_illumination(t0),
+            "moon_separation": ephemeris.moon_separation(t0),
             "observer": self.get_config("name", default=""),
             "origin": "Project PANOPTES",
             "tracking_rate_ra": self.mount.tracking_rate,
@@ -767,6 +967,46 @@ class Observatory(PanBase):
 
         return headers
 
+    def get_field_ephemeris(self, observation=None, at_time=None) -> FieldEphemeris:
+        """Get the airmass, hour angle and Moon separation of an observation's field.
+
+        The ephemeris is computed when the observation is selected (see
+        `get_observation`) for its minimum duration plus one exposure set, and
+        computed again from `at_time` once the observation runs past it.
+
+        Args:
+            observation (`~pocs.scheduler.observation.Observation`, optional): The
+                observation, default the `current_observation`.
+            at_time (`astropy.time.Time`, optional): The time that must be covered,
+                default now.
+
+        Returns:
+            FieldEphemeris: The ephemeris of the field.
+        """
+        if observation is None:
+            observation = self.current_observation
+        if at_time is None:
+            at_time = current_time()
+
+        field = observation.field
+        ephemeris = self._field_ephemeris
+        if (
+            ephemeris is None
+            or not ephemeris.matches(field.name, field.coord)
+            or not ephemeris.covers(at_time)
+        ):
+            duration = get_quantity_value(observation.minimum_duration, u.second) + get_quantity_value(
+                observation.set_duration, u.second
+            )
+            step = self.get_config("observations.header_ephemeris_step", default=1 * u.minute)
+            ephemeris = FieldEphemeris(
+                self.observer, field.coord, at_time, duration * u.second, step=step, name=field.name
+            )
+            self.logger.debug(f"Computed {ephemeris}")
+            self._field_ephemeris = ephemeris
+
+        return ephemeris
+
     def autofocus_cameras(self, camera_list=None, **kwargs):
         """
         Perform autofocus on all cameras with focus capability, or a named subset
@@ -955,7 +1195,7 @@ class Observatory(PanBase):
             fits_headers["start_time"] = flatten_time(start_time)
 
             # Report the sun level
-            sun_pos = self.observer.altaz(start_time, target=get_body("sun", start_time)).alt
+            sun_pos = get_night_ephemeris(self.observer, start_time).sun_altaz(start_time).alt
             self.logger.debug(f"Sun {sun_pos:.02f}°")
 
             # Take the observations.
@@ -973,16 +1213,12 @@ class Observatory(PanBase):
                 camera_filename[cam_name] = metadata["filepath"]
 
             # Block until done exposing on all cameras.
-            flat_field_timer = CountdownTimer(exptime + readout, name="Flat Field Images")
-            while any(
-                [cam.is_observing for cam_name, cam in self.cameras.items() if cam_name in camera_list]
-            ):
-                if flat_field_timer.expired():
-                    self.logger.warning(f"{flat_field_timer} expired while waiting for flat fields")
-                    return
-
-                self.logger.trace("Waiting for flat-field image")
-                flat_field_timer.sleep(1)
+            self.logger.trace("Waiting for flat-field image")
+            if self.wait_for_cameras(cam_names=camera_list, timeout=exptime + readout):
+                self.logger.warning(
+                    f"Timeout of {exptime + readout:.02f}s expired while waiting for flat fields"
+                )
+                return
 
             # Check the counts for each image.
             is_saturated = False
@@ -1096,7 +1332,7 @@ class Observatory(PanBase):
 
         # Get an azimuth that is roughly opposite the sun.
         if az is None:
-            sun_pos = self.observer.altaz(flat_time, target=get_body("sun", flat_time))
+            sun_pos = get_night_ephemeris(self.observer, flat_time).sun_altaz(flat_time)
             az = sun_pos.az.value - 180.0  # Opposite the sun
 
         self.logger.debug(f"Flat-field coords: {alt=:.02f} {az=:.02f}")
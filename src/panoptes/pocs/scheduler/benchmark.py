@@ -0,0 +1,347 @@
+"""Performance benchmarks for the scheduler.
+
+Generates synthetic fields lists (random or survey-grid sky coverage) and times
+`read_field_list`, `Scheduler.get_observation` and each of the built-in
+constraints at fixed times from a fixed `Observer`. The results are plain dicts
+that can be written to a JSON file and compared between releases.
+
+The benchmarks run fully offline: the IERS tables are not downloaded (the
+bundled IERS-B table is used instead) and no config server is needed.
+
+Run them with ``pocs scheduler benchmark``.
+"""
+
+import json
+import platform
+import tempfile
+import time as timer
+from contextlib import contextmanager
+from pathlib import Path
+
+import astroplan
+import astropy
+import numpy as np
+from astroplan import Observer
+from astropy import units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+from astropy.utils import data as astropy_data
+from astropy.utils import iers
+
+from panoptes.pocs import __version__
+from panoptes.pocs.scheduler.constraint import (
+    AlreadyVisited,
+    Altitude,
+    Duration,
+    MoonAvoidance,
+    TimeWindow,
+)
+from panoptes.pocs.scheduler.dispatch import Scheduler
+from panoptes.pocs.utils.logger import get_logger
+
+logger = get_logger()
+
+# Bump when the layout of the results changes.
+RESULTS_VERSION = 1
+
+FIELD_LAYOUTS = ("random", "grid")
+DEFAULT_NUM_FIELDS = (100, 1_000, 10_000, 100_000)
+
+# A night at the testing site (Mauna Loa): evening, around midnight and morning.
+DEFAULT_TIMES = ("2016-08-13 08:00:00", "2016-08-13 11:00:00", "2016-08-13 14:00:00")
+
+
+@contextmanager
+def offline():
+    """Context manager that disables all downloads by astropy, including the IERS tables."""
+    with (
+        iers.conf.set_temp("auto_download", False),
+        iers.conf.set_temp("auto_max_age", None),
+        astropy_data.conf.set_temp("allow_internet", False),
+    ):
+        yield
+
+
+def get_benchmark_observer() -> Observer:
+    """Return the fixed `Observer` used for the benchmarks (the testing site)."""
+    location = EarthLocation(lon=-155.58 * u.deg, lat=19.54 * u.deg, height=3400 * u.m)
+    return Observer(location=location, name="Benchmark Observer", timezone="US/Hawaii")
+
+
+def get_benchmark_constraints(start_time: Time, end_time: Time) -> list:
+    """Return one instance of each built-in constraint.
+
+    Args:
+        start_time (astropy.time.Time): Start of the `TimeWindow`.
+        end_time (astropy.time.Time): End of the `TimeWindow`.
+
+    Returns:
+        list[BaseConstraint]: The constraints.
+    """
+    return [
+        Altitude(horizon=30 * u.deg, obstructions=[]),
+        Duration(30 * u.deg),
+        MoonAvoidance(),
+        AlreadyVisited(),
+        TimeWindow(start_time, end_time),
+    ]
+
+
+def make_fields_list(num_fields: int, layout: str = "random", seed: int = 42) -> list[dict]:
+    """Generate a synthetic fields list.
+
+    Args:
+        num_fields (int): Number of fields.
+        layout (str, optional): Sky coverage of the fields, either ``random`` (uniform
+            on the sphere) or ``grid`` (an evenly spaced survey grid covering the
+            whole sky). Default ``random``.
+        seed (int, optional): Seed for the random positions and priorities, default 42.
+
+    Returns:
+        list[dict]: Observation configs, see `BaseScheduler.add_observation`.
+    """
+    rng = np.random.default_rng(seed)
+
+    if layout == "random":
+        ra = rng.uniform(0, 360, num_fields)
+        dec = np.degrees(np.arcsin(rng.uniform(-1, 1, num_fields)))
+    elif layout == "grid":
+        # Fibonacci lattice, i.e. fields of (nearly) equal area.
+        i = np.arange(num_fields) + 0.5
+        ra = np.degrees(np.pi * (1 + 5**0.5) * i) % 360
+        dec = np.degrees(np.arcsin(1 - 2 * i / num_fields))
+    else:
+        raise ValueError(f"Unknown layout {layout!r}, must be one of {FIELD_LAYOUTS}")
+
+    priorities = rng.integers(50, 151, num_fields)
+
+    return [
+        {
+            "field": {"name": f"Field {i:06d}", "position": f"{ra[i]:.6f}deg {dec[i]:+.6f}deg"},
+            "observation": {"priority": int(priorities[i])},
+        }
+        for i in range(num_fields)
+    ]
+
+
+def write_fields_file(fields_file: str | Path, fields_list: list[dict]) -> Path:
+    """Write a fields list from `make_fields_list` as a YAML fields file.
+
+    Args:
+        fields_file (str or pathlib.Path): The path to write.
+        fields_list (list[dict]): Observation configs from `make_fields_list`.
+
+    Returns:
+        pathlib.Path: The path of the fields file.
+    """
+    lines = list()
+    for observation_config in fields_list:
+        field_config = observation_config["field"]
+        lines.append(f"- field:\n    name: {field_config['name']}\n    position: {field_config['position']}")
+        lines.append("  observation:")
+        for key, value in observation_config["observation"].items():
+            lines.append(f"    {key}: {value}")
+
+    fields_file = Path(fields_file)
+    fields_file.write_text("\n".join(lines) + "\n")
+
+    return fields_file
+
+
+def time_calls(func, repeat: int = 3, setup=None) -> list[float]:
+    """Call `func` `repeat` times and return the run time of each call in seconds.
+
+    Args:
+        func (callable): The function to time, called without arguments.
+        repeat (int, optional): Number of calls, default 3.
+        setup (callable, optional): Called (untimed) before each call.
+
+    Returns:
+        list[float]: The run times.
+    """
+    run_times = list()
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = timer.perf_counter()
+        func()
+        run_times.append(timer.perf_counter() - start)
+
+    return run_times
+
+
+def summarize(run_times: list[float], **info) -> dict:
+    """Return a result record with statistics of `run_times`.
+
+    The first call is reported separately because it includes one-off work
+    like building the ephemeris grid and the spatial index.
+
+    Args:
+        run_times (list[float]): Run times in seconds, see `time_calls`.
+        **info: Extra items for the record, e.g. the benchmark name.
+
+    Returns:
+        dict: The result record.
+    """
+    run_times = np.asarray(run_times)
+    return {
+        **info,
+        "repeat": len(run_times),
+        "first": float(run_times[0]),
+        "min": float(run_times.min()),
+        "median": float(np.median(run_times)),
+        "mean": float(run_times.mean()),
+        "max": float(run_times.max()),
+    }
+
+
+def benchmark_scheduler(
+    num_fields: int,
+    layout: str = "random",
+    times=DEFAULT_TIMES,
+    repeat: int = 3,
+    observer: Observer | None = None,
+    seed: int = 42,
+) -> list[dict]:
+    """Benchmark the scheduler for one synthetic fields list.
+
+    Times reading the fields file, `Scheduler.get_observation` and the
+    `get_scores` method of each built-in constraint at each of `times`.
+
+    Args:
+        num_fields (int): Number of fields, see `make_fields_list`.
+        layout (str, optional): Sky coverage, see `make_fields_list`.
+        times (list, optional): Times at which to schedule, defaults to `DEFAULT_TIMES`.
+        repeat (int, optional): Number of calls per benchmark, default 3.
+        observer (astroplan.Observer, optional): Defaults to `get_benchmark_observer`.
+        seed (int, optional): Seed for `make_fields_list`.
+
+    Returns:
+        list[dict]: One result record per benchmark, see `summarize`.
+    """
+    times = Time(list(times))
+    observer = observer or get_benchmark_observer()
+    constraints = get_benchmark_constraints(times.min(), times.max() + 1 * u.hour)
+    info = {"num_fields": num_fields, "layout": layout}
+
+    results = list()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fields_file = write_fields_file(
+            Path(tmp_dir) / f"{layout}_{num_fields}.yaml", make_fields_list(num_fields, layout, seed=seed)
+        )
+
+        logger.info(f"Benchmarking scheduler with {num_fields} {layout} fields")
+        scheduler = Scheduler(
+            observer,
+            fields_file=str(fields_file),
+            constraints=constraints,
+            ephemeris_step=5,
+            catalog_threshold=1000,
+        )
+
+        def read_fields():
+            # Setting the file clears the fields, so it is parsed again.
+            scheduler.fields_file = str(fields_file)
+
+        run_times = time_calls(read_fields, repeat=repeat)
+        results.append(summarize(run_times, benchmark="read_field_list", **info))
+
+        def reset():
+            scheduler.current_observation = None
+            scheduler.reset_observed_list()
+
+        for t in times:
+            time_info = {**info, "time": t.isot}
+
+            run_times = time_calls(lambda: scheduler.get_observation(time=t), repeat=repeat, setup=reset)
+            results.append(summarize(run_times, benchmark="get_observation", **time_info))
+
+            # Score all fields with each constraint like `score_observations` does.
+            scheduler.set_common_properties(t)
+            targets = list(scheduler.targets.values())
+            coords = scheduler.field_coords
+            altaz = observer.altaz(t, target=coords)
+            for constraint in constraints:
+                run_times = time_calls(
+                    lambda: constraint.get_scores(
+                        t,
+                        observer,
+                        targets,
+                        coords=coords,
+                        altaz=altaz,
+                        **scheduler.common_properties,
+                    ),
+                    repeat=repeat,
+                )
+                results.append(
+                    summarize(run_times, benchmark="constraint", constraint=constraint.name, **time_info)
+                )
+
+    return results
+
+
+def run_benchmarks(
+    num_fields=DEFAULT_NUM_FIELDS,
+    layouts=FIELD_LAYOUTS,
+    times=DEFAULT_TIMES,
+    repeat: int = 3,
+    seed: int = 42,
+) -> dict:
+    """Run the scheduler benchmarks for each combination of size and layout.
+
+    Args:
+        num_fields (list[int], optional): Sizes of the fields lists, defaults to
+            `DEFAULT_NUM_FIELDS`.
+        layouts (list[str], optional): Sky coverage of the fields lists, defaults to
+            `FIELD_LAYOUTS`.
+        times (list, optional): Times at which to schedule, defaults to `DEFAULT_TIMES`.
+        repeat (int, optional): Number of calls per benchmark, default 3.
+        seed (int, optional): Seed for `make_fields_list`.
+
+    Returns:
+        dict: The ``results`` records (see `benchmark_scheduler`) and ``metadata``
+        about the environment they were measured in.
+    """
+    metadata = {
+        "version": RESULTS_VERSION,
+        "date": Time.now().isot,
+        "pocs": __version__,
+        "astropy": astropy.__version__,
+        "astroplan": astroplan.__version__,
+        "numpy": np.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "times": [Time(t).isot for t in times],
+        "repeat": repeat,
+        "seed": seed,
+    }
+
+    results = list()
+    with offline():
+        observer = get_benchmark_observer()
+        for layout in layouts:
+            for size in num_fields:
+                results.extend(
+                    benchmark_scheduler(
+                        size, layout=layout, times=times, repeat=repeat, observer=observer, seed=seed
+                    )
+                )
+
+    return {"metadata": metadata, "results": results}
+
+
+def write_results(results: dict, output_file: str | Path) -> Path:
+    """Write the results of `run_benchmarks` to a JSON file.
+
+    Args:
+        results (dict): The output of `run_benchmarks`.
+        output_file (str or pathlib.Path): The path to write.
+
+    Returns:
+        pathlib.Path: The path of the results file.
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text(json.dumps(results, indent=2))
+
+    return output_file
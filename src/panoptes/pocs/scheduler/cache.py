@@ -0,0 +1,136 @@
+"""Binary sidecar cache for parsed fields files.
+
+Parsing a large fields file with `from_yaml` (and the positions of all of its
+fields) is slow and happens at every startup and on every reload. The cache is a
+NumPy ``.npz`` file next to the fields file that holds the parsed field configs
+and the validated columns of the `FieldCatalog`. It is keyed by the SHA-256 hash
+of the fields file, so a stale cache is ignored and the YAML is read instead.
+
+Build the cache with ``pocs scheduler build-cache``.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+from astropy import units as u
+
+from panoptes.utils.utils import get_quantity_value
+
+from panoptes.pocs.scheduler.catalog import FieldCatalog
+from panoptes.pocs.utils.logger import get_logger
+
+logger = get_logger()
+
+# Bump when the layout of the cache file changes.
+CACHE_VERSION = 1
+
+
+def get_cache_path(fields_file: str | Path) -> Path:
+    """Return the path of the cache file for `fields_file`.
+
+    Args:
+        fields_file (str or pathlib.Path): Path to the YAML fields file.
+
+    Returns:
+        pathlib.Path: The cache path, e.g. ``simple.yaml`` -> ``simple.yaml.cache.npz``.
+    """
+    fields_file = Path(fields_file)
+    return fields_file.with_name(f"{fields_file.name}.cache.npz")
+
+
+def get_file_hash(fields_file: str | Path) -> str:
+    """Return the SHA-256 hex digest of the contents of `fields_file`."""
+    return hashlib.sha256(Path(fields_file).read_bytes()).hexdigest()
+
+
+def write_fields_cache(
+    fields_file: str | Path,
+    fields_list: list[dict],
+    file_hash: str | None = None,
+    default_exptime: float | u.Quantity = 120,
+) -> Path:
+    """Write the cache for a fields file.
+
+    Args:
+        fields_file (str or pathlib.Path): Path to the YAML fields file.
+        fields_list (list[dict]): The parsed contents of `fields_file`.
+        file_hash (str, optional): Hash of `fields_file`, computed if not given.
+        default_exptime (float or astropy.units.Quantity, optional): Exposure time in
+            seconds used by the catalog for fields without one, defaults to 120 seconds.
+
+    Returns:
+        pathlib.Path: The path of the cache file.
+
+    Raises:
+        TypeError: If `fields_list` contains values that can't be stored as JSON.
+    """
+    file_hash = file_hash or get_file_hash(fields_file)
+    default_exptime = get_quantity_value(default_exptime, u.second)
+
+    fields_list = list(fields_list)
+    catalog = FieldCatalog.from_configs(
+        [config for config in fields_list if FieldCatalog.accepts(config)], default_exptime=default_exptime
+    )
+
+    # Position of each catalog row in `fields_list`.
+    positions = {id(config): i for i, config in enumerate(fields_list)}
+    catalog_rows = np.array([positions[id(config)] for config in catalog.configs], dtype=int)
+
+    cache_path = get_cache_path(fields_file)
+    with cache_path.open("wb") as f:
+        np.savez(
+            f,
+            version=np.array(CACHE_VERSION),
+            source_hash=np.array(file_hash),
+            default_exptime=np.array(default_exptime),
+            fields=np.array(json.dumps(fields_list)),
+            catalog=catalog.data,
+            catalog_rows=catalog_rows,
+        )
+
+    logger.debug(f"Wrote {len(fields_list)} fields to cache {cache_path}")
+    return cache_path
+
+
+def read_fields_cache(
+    fields_file: str | Path, file_hash: str | None = None, default_exptime: float | u.Quantity = 120
+) -> tuple[list[dict], FieldCatalog | None] | None:
+    """Read the cache for a fields file if it is up to date.
+
+    Args:
+        fields_file (str or pathlib.Path): Path to the YAML fields file.
+        file_hash (str, optional): Hash of `fields_file`, computed if not given.
+        default_exptime (float or astropy.units.Quantity, optional): Exposure time in
+            seconds for fields without one. The cached catalog is only used if it was
+            built with the same value. Defaults to 120 seconds.
+
+    Returns:
+        tuple or None: The fields list and the catalog (None if the catalog was built
+        with a different `default_exptime`), or None if there is no valid cache.
+    """
+    cache_path = get_cache_path(fields_file)
+    if not cache_path.exists():
+        return None
+
+    file_hash = file_hash or get_file_hash(fields_file)
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            if int(cache["version"]) != CACHE_VERSION or str(cache["source_hash"]) != file_hash:
+                logger.debug(f"Ignoring stale fields cache {cache_path}")
+                return None
+
+            fields_list = json.loads(str(cache["fields"]))
+
+            catalog = None
+            if float(cache["default_exptime"]) == get_quantity_value(default_exptime, u.second):
+                configs = [fields_list[i] for i in cache["catalog_rows"]]
+                catalog = FieldCatalog(cache["catalog"], configs)
+    except Exception as e:
+        logger.warning(f"Unable to read fields cache {cache_path}: {e!r}")
+        return None
+
+    logger.debug(f"Read {len(fields_list)} fields from cache {cache_path}")
+    return fields_list, catalog
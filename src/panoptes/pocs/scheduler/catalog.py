@@ -0,0 +1,312 @@
+"""Columnar field catalog for very large target lists.
+
+Defines FieldCatalog, which holds the fields of a target list in NumPy arrays
+(name, RA/Dec, priority and exposure settings) instead of one `Field` and
+`Observation` object per entry. Building those objects is comparatively slow
+and memory hungry because each one sets up a logger and config access, so the
+catalog lets `BaseScheduler` score survey-scale lists (10k-100k fields) and only
+create a full `Observation` for the field that is actually selected.
+
+Each row is exposed as a lightweight `CatalogEntry` that provides the attributes
+the scheduler constraints use (name, priority, durations and coordinates).
+Only configs that would create a default `Field` and `Observation` without
+extra constraints can be held in the catalog; see `FieldCatalog.accepts`.
+"""
+
+from fractions import Fraction
+
+import numpy as np
+from astropy import units as u
+from astropy.coordinates import SkyCoord
+
+from panoptes.utils.utils import get_quantity_value
+
+from panoptes.pocs.scheduler.observation.base import Observation
+from panoptes.pocs.utils.logger import get_logger
+
+logger = get_logger()
+
+# Field config keys that can be stored in the catalog.
+FIELD_KEYS = {"name", "position", "equinox"}
+
+# Observation config keys that can be stored in the catalog (others stay in the config).
+OBSERVATION_KEYS = {"priority", "exptime", "min_nexp", "exp_set_size", "filter_name", "dark", "tags"}
+
+
+class CatalogEntry:
+    """A single row of a `FieldCatalog` that stands in for an `Observation` while scoring.
+
+    The entry also acts as its own field, so constraints that look at
+    ``observation.field`` (e.g. for the coordinates) work unchanged.
+    """
+
+    __slots__ = ("catalog", "row")
+
+    # Catalog entries are always fixed RA/Dec targets.
+    is_sidereal = True
+
+    # Catalog entries never have observation specific constraints.
+    constraints = None
+
+    def __init__(self, catalog, row):
+        self.catalog = catalog
+        self.row = row
+
+    @property
+    def name(self):
+        """str: Name of the field."""
+        return str(self.catalog.data["name"][self.row])
+
+    @property
+    def field(self):
+        """CatalogEntry: The entry itself, see class docstring."""
+        return self
+
+    @property
+    def ra(self):
+        """astropy.units.Quantity: Right ascension of the field."""
+        return self.catalog.data["ra"][self.row] * u.degree
+
+    @property
+    def dec(self):
+        """astropy.units.Quantity: Declination of the field."""
+        return self.catalog.data["dec"][self.row] * u.degree
+
+    @property
+    def coord(self):
+        """astropy.coordinates.SkyCoord: ICRS coordinates of the field."""
+        return SkyCoord(ra=self.ra, dec=self.dec, frame="icrs")
+
+    @property
+    def priority(self):
+        """float: Priority of the observation."""
+        return float(self.catalog.data["priority"][self.row])
+
+    @property
+    def exptime(self):
+        """astropy.units.Quantity: Exposure time of the observation."""
+        return float(self.catalog.data["exptime"][self.row]) * u.second
+
+    @property
+    def minimum_duration(self):
+        """astropy.units.Quantity: Minimum amount of time to complete the observation."""
+        return self.exptime * int(self.catalog.data["min_nexp"][self.row])
+
+    @property
+    def set_duration(self):
+        """astropy.units.Quantity: Amount of time per set of exposures."""
+        return self.exptime * int(self.catalog.data["exp_set_size"][self.row])
+
+    def __reduce__(self):
+        # Only pickle this row (e.g. for a worker process), not the whole catalog.
+        rows = slice(self.row, self.row + 1)
+        return CatalogEntry, (FieldCatalog(self.catalog.data[rows], self.catalog.configs[rows]), 0)
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"<CatalogEntry: {self.name} (row {self.row})>"
+
+
+class FieldCatalog:
+    """Fields and their observation settings stored as a NumPy structured array.
+
+    The `data` array has the columns ``name``, ``ra`` and ``dec`` (ICRS degrees),
+    ``priority``, ``exptime`` (seconds), ``min_nexp`` and ``exp_set_size``. The
+    original configs are kept so a full `Observation` can be created on demand.
+    """
+
+    def __init__(self, data: np.ndarray, configs: list[dict]):
+        """Create a catalog from already validated columns.
+
+        Use `from_configs` to build a catalog from a list of field configs.
+
+        Args:
+            data (numpy.ndarray): Structured array with the catalog columns.
+            configs (list[dict]): The observation config for each row of `data`.
+        """
+        self.data = data
+        self.configs = list(configs)
+        self.index = {str(name): i for i, name in enumerate(data["name"])}
+
+        self._coords = None
+        self._entries = None
+
+    @staticmethod
+    def accepts(observation_config: dict) -> bool:
+        """Determine if a config can be held in a catalog.
+
+        Only configs that create the default `Field` and `Observation` classes
+        without observation specific constraints are accepted.
+
+        Args:
+            observation_config (dict): Configuration dict for `Field` and `Observation`.
+
+        Returns:
+            bool: True if the config can be stored in the catalog.
+        """
+        try:
+            field_config = observation_config["field"]
+            obs_config = observation_config.get("observation") or dict()
+            return set(field_config) <= FIELD_KEYS and set(obs_config) <= OBSERVATION_KEYS
+        except (AttributeError, KeyError, TypeError):
+            return False
+
+    @classmethod
+    def from_configs(cls, configs: list[dict], default_exptime: float | u.Quantity = 120) -> "FieldCatalog":
+        """Build a catalog from a list of observation configs.
+
+        The configs are validated with the same rules as `Observation`; invalid
+        entries are logged and skipped. Duplicate names keep the last entry.
+
+        Args:
+            configs (list[dict]): Configs accepted by `accepts`.
+            default_exptime (float or astropy.units.Quantity, optional): Exposure time in
+                seconds for configs without one, defaults to 120 seconds.
+
+        Returns:
+            FieldCatalog: The new catalog.
+        """
+        default_exptime = get_quantity_value(default_exptime, u.second)
+
+        rows = dict()
+        for observation_config in configs:
+            try:
+                name, row = cls._parse_config(observation_config, default_exptime)
+            except Exception as e:
+                logger.warning(f"Invalid field: {observation_config!r} {e!r}")
+                continue
+
+            # Keep the order of the first occurrence but the values of the last.
+            rows[name] = (row, observation_config)
+
+        positions = [row[1] for row, _ in rows.values()]
+        equinoxes = [row[2] for row, _ in rows.values()]
+
+        valid = np.ones(len(rows), dtype=bool)
+        ra = np.zeros(len(rows))
+        dec = np.zeros(len(rows))
+        if len(rows) > 0:
+            try:
+                coords = SkyCoord(positions, frame="icrs")
+                ra, dec = coords.ra.degree, coords.dec.degree
+            except Exception:
+                # Parse them one at a time to find the bad ones.
+                for i, (position, equinox) in enumerate(zip(positions, equinoxes)):
+                    try:
+                        coord = SkyCoord(position, equinox=equinox, frame="icrs")
+                        ra[i], dec[i] = coord.ra.degree, coord.dec.degree
+                    except Exception as e:
+                        logger.warning(f"Invalid field position: {position!r} {e!r}")
+                        valid[i] = False
+
+        names = list(rows.keys())
+        name_length = max([len(name) for name in names] + [1])
+        dtype = [
+            ("name", f"U{name_length}"),
+            ("ra", "f8"),
+            ("dec", "f8"),
+            ("priority", "f8"),
+            ("exptime", "f8"),
+            ("min_nexp", "i4"),
+            ("exp_set_size", "i4"),
+        ]
+
+        data = np.zeros(int(valid.sum()), dtype=dtype)
+        configs = list()
+        for j, i in enumerate(np.flatnonzero(valid)):
+            row, observation_config = rows[names[i]]
+            data[j] = (names[i], ra[i], dec[i], *row[3:])
+            configs.append(observation_config)
+
+        return cls(data, configs)
+
+    @staticmethod
+    def _parse_config(observation_config, default_exptime):
+        """Validate a config and return its name and row values."""
+        field_config = observation_config["field"]
+        obs_config = observation_config.get("observation") or dict()
+
+        name = str(field_config["name"])
+        if not name.title().replace(" ", "").replace("-", ""):
+            raise ValueError("Name is empty")
+
+        exptime = obs_config.get("exptime")
+        if exptime is None:
+            exptime = default_exptime
+        if isinstance(exptime, str):
+            exptime = float(Fraction(exptime.strip()))
+        exptime = get_quantity_value(exptime, u.second)
+
+        min_nexp = int(obs_config.get("min_nexp", 60))
+        exp_set_size = int(obs_config.get("exp_set_size", 10))
+        priority = float(obs_config.get("priority", 100))
+
+        if exptime < 0:
+            raise ValueError(f"Exposure time must be greater than or equal to 0, got {exptime}.")
+        if not min_nexp % exp_set_size == 0:
+            raise ValueError(
+                f"Minimum number of exposures (min_nexp={min_nexp}) must be "
+                f"a multiple of set size (exp_set_size={exp_set_size})."
+            )
+        if not priority > 0.0:
+            raise ValueError("Priority must be larger than 0.")
+
+        position = field_config["position"]
+        equinox = field_config.get("equinox") or "J2000"
+
+        return name, (name, position, equinox, priority, exptime, min_nexp, exp_set_size)
+
+    @property
+    def names(self) -> list[str]:
+        """list[str]: Names of the fields, in catalog order."""
+        return list(self.index.keys())
+
+    @property
+    def coords(self) -> SkyCoord:
+        """astropy.coordinates.SkyCoord: ICRS coordinates of all fields, in catalog order."""
+        if self._coords is None:
+            self._coords = SkyCoord(
+                ra=self.data["ra"] * u.degree, dec=self.data["dec"] * u.degree, frame="icrs"
+            )
+
+        return self._coords
+
+    @property
+    def entries(self) -> list[CatalogEntry]:
+        """list[CatalogEntry]: One entry per field, in catalog order."""
+        if self._entries is None:
+            self._entries = [CatalogEntry(self, i) for i in range(len(self.data))]
+
+        return self._entries
+
+    def get_config(self, name: str) -> dict:
+        """Return the observation config for the field called `name`."""
+        return self.configs[self.index[name]]
+
+    def get_observation(self, name: str, **kwargs) -> Observation:
+        """Create a full `Observation` for the field called `name`.
+
+        Args:
+            name (str): Name of the field.
+            **kwargs: Passed to `Observation.from_dict`.
+
+        Returns:
+            panoptes.pocs.scheduler.observation.base.Observation: The new observation.
+        """
+        return Observation.from_dict(self.get_config(name), **kwargs)
+
+    def without(self, name: str) -> "FieldCatalog":
+        """Return a new catalog without the field called `name`."""
+        row = self.index[name]
+        return FieldCatalog(np.delete(self.data, row), self.configs[:row] + self.configs[row + 1 :])
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return f"<FieldCatalog: {len(self)} fields>"
@@ -1,15 +1,25 @@
 """Scheduler constraints used to score candidate observations.
 
 Defines a small set of scoring constraints (Altitude, Duration, MoonAvoidance,
-AlreadyVisited, TimeWindow) implementing a common BaseConstraint interface.
+AlreadyVisited, ClaimedElsewhere, SlewTime, TimeWindow) implementing a common BaseConstraint interface.
 Each constraint returns a (veto, score) tuple where veto indicates the target
 should be excluded and score is a normalized [0–1] value multiplied by the
 constraint weight.
+
+Constraints can also be evaluated for many observations at once via
+`get_scores`, which returns (veto, score) arrays. The built-in constraints
+implement this with vectorized astropy operations; other constraints fall back
+to calling `get_score` for each observation. Constraints that can rule out whole
+regions of the sky (e.g. below the horizon or near the Moon) also implement
+`get_group_vetoes`, which uses a `SkyIndex` of all fields before any per-field
+scoring.
 """
 
 from contextlib import suppress
 
+import numpy as np
 from astropy import units as u
+from astropy.coordinates import SkyCoord
 from astropy.time import Time
 from dateutil.parser import parse as parse_date
 
@@ -17,18 +27,49 @@ from panoptes.utils import error
 from panoptes.utils import horizon as horizon_utils
 from panoptes.utils.utils import get_quantity_value
 
-from panoptes.pocs.base import PanBase
+from panoptes.pocs.base import PanBase, Picklable
+from panoptes.pocs.mount.slew import SlewTimeModel
+from panoptes.pocs.scheduler.ephemeris import get_night_ephemeris, get_transit_and_set_offsets
+
+# Keyword arguments that are only meaningful to `get_scores`.
+BATCH_KWARGS = ("coords", "altaz")
+
+# Safety margin for `get_group_vetoes`, which works with catalog (not apparent) positions,
+# so that only fields that `get_score` would certainly veto are removed.
+GROUP_VETO_MARGIN = 1 * u.degree
 
 
-class BaseConstraint(PanBase):
+def get_field_coords(observations) -> SkyCoord:
+    """Build a single `SkyCoord` array for the fields of the given observations.
+
+    Args:
+        observations (list[Observation]): The observations to collect.
+
+    Returns:
+        astropy.coordinates.SkyCoord: ICRS coordinates, one per observation.
+    """
+    ra = [obs.field.coord.icrs.ra.degree for obs in observations]
+    dec = [obs.field.coord.icrs.dec.degree for obs in observations]
+    return SkyCoord(ra=ra * u.degree, dec=dec * u.degree, frame="icrs")
+
+
+class BaseConstraint(Picklable, PanBase):
     """Abstract base class for scheduler constraints.
 
     Subclasses must implement get_score() and return a (veto, score) tuple where
     veto is a boolean indicating the target should be rejected outright and
     score is a float typically in [0, 1] that will be multiplied by this
     constraint's weight.
+
+    Expensive constraints can set `parallel_safe` to True if `get_scores` only
+    depends on its arguments (and can be pickled for a process pool). The
+    scheduler then splits the fields into chunks and evaluates them over its
+    pool, see `BaseScheduler.pool_type`.
     """
 
+    # Whether `get_scores` can be evaluated for chunks of fields in parallel.
+    parallel_safe = False
+
     def __init__(self, weight=1.0, default_score=0.0, *args, **kwargs):
         """Base constraint
 
@@ -68,6 +109,68 @@ class BaseConstraint(PanBase):
         """
         raise NotImplementedError
 
+    def get_scores(self, time, observer, observations, **kwargs):
+        """Compute veto/score arrays for many observations at once.
+
+        The default implementation calls `get_score` for each observation so that
+        custom constraints keep working. Subclasses can override this with a
+        vectorized implementation.
+
+        Args:
+            time (astropy.time.Time): Evaluation time.
+            observer: Observer instance providing transforms/utilities.
+            observations (list[Observation]): The candidate observations.
+            **kwargs: Constraint-specific options. The scheduler also passes
+                `coords`, a `SkyCoord` array of the observation fields, and `altaz`,
+                the same coordinates transformed to AltAz at `time`.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Boolean veto array and float score
+            array, one entry per observation.
+        """
+        score_kwargs = {k: v for k, v in kwargs.items() if k not in BATCH_KWARGS}
+
+        vetoes = np.zeros(len(observations), dtype=bool)
+        scores = np.zeros(len(observations), dtype=float)
+        for i, observation in enumerate(observations):
+            veto, score = self.get_score(time, observer, observation, **score_kwargs)
+            vetoes[i] = veto
+            scores[i] = score
+
+        return vetoes, scores
+
+    def get_group_vetoes(self, time, observer, sky_index, **kwargs):
+        """Find the fields this constraint would veto, using a spatial index.
+
+        This is called by the scheduler before `get_scores` so that whole regions
+        of the sky can be ruled out in one query. It must only return fields that
+        `get_score` would also veto; the remaining fields are scored as usual.
+        The default implementation returns None (no group vetoes).
+
+        Args:
+            time (astropy.time.Time): Evaluation time.
+            observer: Observer instance providing transforms/utilities.
+            sky_index (panoptes.pocs.scheduler.spatial.SkyIndex): Index of all fields.
+            **kwargs: Constraint-specific options, as for `get_score`.
+
+        Returns:
+            numpy.ndarray or None: Boolean mask over the rows of `sky_index` that is
+            True for vetoed fields, or None.
+        """
+        return None
+
+    def _get_batch_coords(self, time, observer, observations, kwargs):
+        """Return the `coords` and `altaz` arrays for a batch, computing them if not given."""
+        coords = kwargs.get("coords")
+        if coords is None:
+            coords = get_field_coords(observations)
+
+        altaz = kwargs.get("altaz")
+        if altaz is None:
+            altaz = observer.altaz(time, target=coords)
+
+        return coords, altaz
+
     def __str__(self):
         return self.name
 
@@ -134,6 +237,35 @@ class Altitude(BaseConstraint):
             score = 1
         return veto, score * self.weight
 
+    def get_scores(self, time, observer, observations, **kwargs):
+        """Vectorized version of `get_score` using a single AltAz transform.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: (veto, score) arrays.
+        """
+        _, altaz = self._get_batch_coords(time, observer, observations, kwargs)
+
+        target_az = np.atleast_1d(altaz.az.degree)
+        target_alt = np.atleast_1d(altaz.alt.degree)
+
+        horizon_line = np.asarray(get_quantity_value(self.horizon_line, u.degree), dtype=float)
+        min_alt = horizon_line[target_az.astype(int) % len(horizon_line)]
+
+        vetoes = target_alt < min_alt
+        scores = np.where(vetoes, self._score, 1.0) * self.weight
+
+        return vetoes, scores
+
+    def get_group_vetoes(self, time, observer, sky_index, **kwargs):
+        """Veto all fields below the lowest point of the horizon line.
+
+        Returns:
+            numpy.ndarray: Boolean mask that is True for fields below the horizon.
+        """
+        lowest = np.min(get_quantity_value(self.horizon_line, u.degree))
+
+        return sky_index.below_horizon(observer, time, lowest - get_quantity_value(GROUP_VETO_MARGIN))
+
 
 class Duration(BaseConstraint):
     """Constraint that favors targets with longer remaining observing time."""
@@ -153,6 +285,9 @@ class Duration(BaseConstraint):
         observed (subject to horizon, meridian flip, and end-of-night). Vetoes
         if the minimum observation duration cannot be met.
 
+        Sidereal fields use the closed-form hour angle calculation from
+        `get_scores`; other targets use astroplan's transit and set time searches.
+
         Args:
             time (astropy.time.Time): Evaluation time.
             observer: Observer for rise/set and meridian computations.
@@ -161,15 +296,17 @@ class Duration(BaseConstraint):
         Returns:
             tuple[bool, float]: (veto, score) prior to weighting.
         """
+        if getattr(observation.field, "is_sidereal", False):
+            vetoes, scores = self.get_scores(time, observer, [observation], **kwargs)
+            return bool(vetoes[0]), float(scores[0])
+
         score = self._score
         target = observation.field
         veto = not observer.target_is_up(time, target, horizon=self.horizon)
 
         end_of_night = kwargs.get("end_of_night")
         if end_of_night is None:
-            end_of_night = observer.tonight(
-                time=time, horizon=self.get_config("location.observe_horizon", default=-18 * u.degree)
-            )[1]
+            end_of_night = self._get_end_of_night(time, observer)
 
         if not veto:
             # Get the next meridian flip
@@ -202,6 +339,78 @@ class Duration(BaseConstraint):
 
         return veto, score * self.weight
 
+    def get_scores(self, time, observer, observations, **kwargs):
+        """Vectorized version of `get_score`.
+
+        For sidereal fields the meridian transit and set times come from the nightly
+        ephemeris grid (passed as `ephemeris`) when available, otherwise from the
+        closed-form hour angle calculation in
+        `panoptes.pocs.scheduler.ephemeris.get_transit_and_set_offsets`. Other targets
+        are scored one at a time with `get_score`.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: (veto, score) arrays.
+        """
+        coords, altaz = self._get_batch_coords(time, observer, observations, kwargs)
+
+        vetoes = ~np.atleast_1d(altaz.alt > self.horizon)
+        scores = np.full(len(observations), self._score, dtype=float)
+
+        end_of_night = kwargs.get("end_of_night")
+        if end_of_night is None:
+            end_of_night = self._get_end_of_night(time, observer)
+            kwargs["end_of_night"] = end_of_night
+
+        # Targets that move against the sky fall back to astroplan.
+        is_sidereal = np.array([getattr(obs.field, "is_sidereal", False) for obs in observations], dtype=bool)
+        for i in np.flatnonzero(~is_sidereal):
+            score_kwargs = {k: v for k, v in kwargs.items() if k not in BATCH_KWARGS}
+            vetoes[i], scores[i] = self.get_score(time, observer, observations[i], **score_kwargs)
+
+        candidates = np.flatnonzero(is_sidereal & ~vetoes)
+        if len(candidates) == 0:
+            scores[is_sidereal] *= self.weight
+            return vetoes, scores
+
+        min_durations = np.array(
+            [get_quantity_value(observations[i].minimum_duration, u.second) for i in candidates]
+        )
+
+        # Use the nightly ephemeris grid if it has all the observations.
+        rows = None
+        ephemeris = kwargs.get("ephemeris")
+        if ephemeris is not None and ephemeris.covers(time):
+            rows = ephemeris.rows([observations[i] for i in candidates])
+
+        # Seconds until the next meridian flip and until the target sets.
+        if rows is not None:
+            meridian_sec = ephemeris.time_to_transit(time, rows=rows)
+            set_sec = ephemeris.time_to_set(time, self.horizon, rows=rows)
+        else:
+            meridian_sec, set_sec = get_transit_and_set_offsets(
+                observer, time, coords[candidates], self.horizon
+            )
+
+        night_sec = (end_of_night - time).sec
+
+        # If it flips before end_of_night it must meet the minimum duration before the flip.
+        flip_veto = (meridian_sec < night_sec) & (min_durations > meridian_sec)
+
+        # Limit the time until the target sets to the end of the night.
+        remaining_sec = np.minimum(set_sec, night_sec)
+
+        vetoes[candidates] = flip_veto | (remaining_sec < min_durations)
+        scores[candidates] = remaining_sec / night_sec
+        scores[is_sidereal] *= self.weight
+
+        return vetoes, scores
+
+    def _get_end_of_night(self, time, observer):
+        """Get the end of the night from the shared ephemeris if not provided by the scheduler."""
+        return get_night_ephemeris(observer, time).end_of_night(
+            time, horizon=self.get_config("location.observe_horizon", default=-18 * u.degree)
+        )
+
     def __str__(self):
         return f"Duration above {self.horizon}"
 
@@ -248,6 +457,43 @@ class MoonAvoidance(BaseConstraint):
 
         return veto, score * self.weight
 
+    def get_scores(self, time, observer, observations, **kwargs):
+        """Vectorized version of `get_score` using one separation call.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: (veto, score) arrays.
+        """
+        try:
+            moon = kwargs["moon"]
+        except KeyError:
+            raise error.PanError("Moon must be set for MoonAvoidance constraint")
+
+        coords = kwargs.get("coords")
+        if coords is None:
+            coords = get_field_coords(observations)
+
+        moon_sep = np.atleast_1d(moon.separation(coords, origin_mismatch="ignore").degree)
+
+        vetoes = moon_sep < get_quantity_value(self.separation)
+        scores = np.where(vetoes, self._score, moon_sep / 180) * self.weight
+
+        return vetoes, scores
+
+    def get_group_vetoes(self, time, observer, sky_index, **kwargs):
+        """Veto all fields in a cone around the Moon.
+
+        Returns:
+            numpy.ndarray: Boolean mask that is True for fields close to the Moon.
+        """
+        try:
+            moon = kwargs["moon"]
+        except KeyError:
+            raise error.PanError("Moon must be set for MoonAvoidance constraint")
+
+        radius = get_quantity_value(self.separation) - get_quantity_value(GROUP_VETO_MARGIN)
+
+        return ~sky_index.query_outside(moon, radius)
+
     def __str__(self):
         return f"Moon Avoidance ({self.separation})"
 
@@ -270,24 +516,154 @@ class AlreadyVisited(BaseConstraint):
             time (astropy.time.Time): Evaluation time (unused).
             observer: Unused for this constraint.
             observation: Candidate observation to check.
-            **kwargs: Should include 'observed_list' mapping camera->list of exposures.
+            **kwargs: Should include 'visited_names', the set of observed field names
+                kept by the scheduler, or 'observed_list' mapping seq_time->observation.
 
         Returns:
             tuple[bool, float]: (veto, score) where veto=True if the observation's
-            field appears in the observed_list; score remains default otherwise.
+            field has already been observed; score remains default otherwise.
         """
         veto = False
         score = self._score
 
-        observed_list = kwargs.get("observed_list")
-
-        observed_field_list = [obs.field for obs in observed_list.values()]
-
-        if observation.field in observed_field_list:
+        if observation.name in self._get_visited_names(kwargs):
             veto = True
 
         return veto, score * self.weight
 
+    def get_scores(self, time, observer, observations, **kwargs):
+        """Vectorized version of `get_score` with one set lookup per observation.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: (veto, score) arrays.
+        """
+        visited_names = self._get_visited_names(kwargs)
+
+        vetoes = np.array([obs.name in visited_names for obs in observations], dtype=bool)
+        scores = np.full(len(observations), self._score * self.weight, dtype=float)
+
+        return vetoes, scores
+
+    def _get_visited_names(self, kwargs):
+        """Return the set of visited field names, building it from `observed_list` if needed."""
+        visited_names = kwargs.get("visited_names")
+        if visited_names is None:
+            visited_names = {obs.name for obs in kwargs.get("observed_list").values()}
+
+        return visited_names
+
+
+class ClaimedElsewhere(BaseConstraint):
+    """Constraint that vetoes fields another unit at the site is observing.
+
+    The claims come from the scheduler's coordinator (the `claimed_names` common
+    property), see `panoptes.pocs.scheduler.coordination`.
+    """
+
+    parallel_safe = True
+
+    def get_score(self, time, observer, observation, **kwargs):
+        """Veto fields that are claimed by another unit.
+
+        Args:
+            time (astropy.time.Time): Evaluation time (unused).
+            observer: Unused for this constraint.
+            observation: Candidate observation to check.
+            **kwargs: Should include 'claimed_names', the set of field names that
+                other units claimed.
+
+        Returns:
+            tuple[bool, float]: (veto, score) where veto=True if the field is claimed;
+            score remains default otherwise.
+        """
+        veto = observation.name in kwargs.get("claimed_names", set())
+
+        return veto, self._score * self.weight
+
+    def get_scores(self, time, observer, observations, **kwargs):
+        """Vectorized version of `get_score` with one set lookup per observation.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: (veto, score) arrays.
+        """
+        claimed_names = kwargs.get("claimed_names", set())
+
+        vetoes = np.array([obs.name in claimed_names for obs in observations], dtype=bool)
+        scores = np.full(len(observations), self._score * self.weight, dtype=float)
+
+        return vetoes, scores
+
+
+class SlewTime(BaseConstraint):
+    """Constraint that penalizes fields by the time it takes the mount to get there.
+
+    The slew time is estimated with a `~pocs.mount.slew.SlewTimeModel` from where the
+    mount points (the `mount_coords` common property), so fields on the other side of
+    the meridian, which need a meridian flip, score lower than nearby fields. The
+    score falls linearly from 1 (no slew) to 0 at `max_slew_time`; nothing is vetoed.
+    """
+
+    parallel_safe = True
+
+    def __init__(self, max_slew_time=180 * u.second, *args, **kwargs):
+        """Create a SlewTime constraint.
+
+        Args:
+            max_slew_time (float or astropy.units.Quantity, optional): Slew time in
+                seconds at which the score reaches zero, default 180 seconds.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+        """
+        super().__init__(*args, **kwargs)
+
+        self.max_slew_time = get_quantity_value(max_slew_time, u.second)
+        if self.max_slew_time <= 0:
+            raise error.PanError(f"max_slew_time must be positive: {max_slew_time}")
+
+        # Used when the scheduler doesn't pass the model of the mount.
+        self.slew_model = SlewTimeModel.from_settings(self.get_config("mount.settings.slew", default=None))
+
+    def get_score(self, time, observer, observation, **kwargs):
+        """Score the estimated slew time to the field of the observation.
+
+        Args:
+            time (astropy.time.Time): Evaluation time.
+            observer: Observer for the local sidereal time and the latitude.
+            observation: Observation whose field is evaluated.
+            **kwargs: Can include 'mount_coords' (SkyCoord or None for the home
+                position) and 'slew_model' (SlewTimeModel).
+
+        Returns:
+            tuple[bool, float]: (False, score) where score is 1 for no slew and falls to
+            0 at `max_slew_time`.
+        """
+        vetoes, scores = self.get_scores(
+            time, observer, [observation], coords=observation.field.coord, **kwargs
+        )
+
+        return bool(vetoes[0]), float(scores[0])
+
+    def get_scores(self, time, observer, observations, **kwargs):
+        """Vectorized version of `get_score` using the closed-form slew-time model.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: (veto, score) arrays.
+        """
+        coords = kwargs.get("coords")
+        if coords is None:
+            coords = get_field_coords(observations)
+
+        slew_model = kwargs.get("slew_model") or self.slew_model
+        slew_times = slew_model.estimate(observer, time, coords, start=kwargs.get("mount_coords"))
+
+        vetoes = np.zeros(len(slew_times), dtype=bool)
+        scores = np.clip(1 - slew_times / self.max_slew_time, 0, 1) * self.weight
+
+        return vetoes, scores
+
+    def __str__(self):
+        return f"Slew Time ({self.max_slew_time:.0f} s)"
+
 
 class TimeWindow(BaseConstraint):
     """Constraint that boosts observations within a specific time interval."""
@@ -354,6 +730,19 @@ class TimeWindow(BaseConstraint):
 
         return veto, score * self.weight
 
+    def get_scores(self, time, observer, observations, **kwargs):
+        """Vectorized version of `get_score`; the score only depends on `time`.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: (veto, score) arrays.
+        """
+        veto, score = self.get_score(time, observer, None)
+
+        vetoes = np.full(len(observations), veto, dtype=bool)
+        scores = np.full(len(observations), score, dtype=float)
+
+        return vetoes, scores
+
     def __str__(self):
         return "TimeWindow"
 
@@ -0,0 +1,195 @@
+"""Coordination of the schedulers of several units at one site.
+
+Units that share a site claim the field they are observing with a lease, and
+each scheduler vetoes fields that other units hold (see the `ClaimedElsewhere`
+constraint), so the site splits a fields list without duplicate coverage.
+
+Defines LocalCoordinator, which keeps the claims in memory (the coordination
+service uses it, and it can stand in for the service in tests or for several
+schedulers in one process), and HTTPCoordinator, a client for the coordination
+service in `panoptes.pocs.utils.service.coordination`.
+
+The coordinator is configured with the `scheduler.coordination` config items,
+see `create_coordinator_from_config`.
+"""
+
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+import requests
+
+from panoptes.utils.config.client import get_config
+
+from panoptes.pocs.utils.logger import get_logger
+
+logger = get_logger()
+
+# Default length of a lease in seconds; schedulers renew it on every scheduling pass.
+DEFAULT_LEASE_TIME = 1800
+
+
+@dataclass
+class Claim:
+    """A lease on a field by one unit.
+
+    Attributes:
+        field_name (str): Name of the claimed field.
+        unit_id (str): The unit holding the claim, e.g. the ``pan_id``.
+        expires (float): Unix time at which the lease runs out.
+    """
+
+    field_name: str
+    unit_id: str
+    expires: float
+
+    def to_dict(self) -> dict:
+        """Return the claim as a dict, e.g. for JSON."""
+        return asdict(self)
+
+
+class LocalCoordinator:
+    """Keeps field claims in memory.
+
+    Args:
+        clock (callable, optional): Returns the current Unix time, defaults to `time.time`.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._claims = dict()
+        self._lock = threading.Lock()
+
+    def claim(self, field_name: str, unit_id: str, lease_time: float = DEFAULT_LEASE_TIME) -> bool:
+        """Claim a field, or renew the claim, for `lease_time` seconds.
+
+        Args:
+            field_name (str): Name of the field.
+            unit_id (str): The unit making the claim.
+            lease_time (float, optional): Length of the lease in seconds.
+
+        Returns:
+            bool: True if the claim was granted, False if another unit holds the field.
+        """
+        with self._lock:
+            now = self.clock()
+            claim = self._claims.get(field_name)
+            if claim is not None and claim.unit_id != unit_id and claim.expires > now:
+                return False
+
+            self._claims[field_name] = Claim(field_name, unit_id, now + float(lease_time))
+            return True
+
+    def release(self, field_name: str, unit_id: str) -> bool:
+        """Release the claim of `unit_id` on a field.
+
+        Returns:
+            bool: True if the unit held the field.
+        """
+        with self._lock:
+            claim = self._claims.get(field_name)
+            if claim is None or claim.unit_id != unit_id:
+                return False
+
+            del self._claims[field_name]
+            return True
+
+    def get_claims(self) -> list[Claim]:
+        """Return the claims that haven't expired (and drop the ones that have)."""
+        with self._lock:
+            now = self.clock()
+            for name in [name for name, claim in self._claims.items() if claim.expires <= now]:
+                del self._claims[name]
+
+            return list(self._claims.values())
+
+    def get_claimed_names(self, exclude_unit: str | None = None) -> set[str]:
+        """Return the names of the claimed fields.
+
+        Args:
+            exclude_unit (str, optional): Leave out the claims of this unit.
+
+        Returns:
+            set[str]: The field names.
+        """
+        return {claim.field_name for claim in self.get_claims() if claim.unit_id != exclude_unit}
+
+
+class HTTPCoordinator:
+    """Client for the coordination service.
+
+    The client fails open: if the service can't be reached, a warning is logged,
+    claims are granted and no fields are reported as claimed, so observing
+    continues without coordination.
+
+    Args:
+        url (str): Base URL of the service, e.g. ``http://localhost:6567``.
+        timeout (float, optional): Request timeout in seconds, default 2 seconds.
+        session (optional): Object with `get` and `post` methods like a
+            `requests.Session` (the default).
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0, session=None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def _request(self, method: str, path: str, **kwargs):
+        """Send a request, returning the decoded JSON or None on errors."""
+        try:
+            response = getattr(self.session, method)(f"{self.url}{path}", timeout=self.timeout, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.warning(f"Coordination service {self.url} not available: {e!r}")
+            return None
+
+    def claim(self, field_name: str, unit_id: str, lease_time: float = DEFAULT_LEASE_TIME) -> bool:
+        """Claim a field, see `LocalCoordinator.claim`."""
+        response = self._request(
+            "post", "/claim", json=dict(field_name=field_name, unit_id=unit_id, lease_time=lease_time)
+        )
+        if response is None:
+            return True
+
+        return bool(response["granted"])
+
+    def release(self, field_name: str, unit_id: str) -> bool:
+        """Release a field, see `LocalCoordinator.release`."""
+        response = self._request("post", "/release", json=dict(field_name=field_name, unit_id=unit_id))
+        if response is None:
+            return False
+
+        return bool(response["released"])
+
+    def get_claims(self) -> list[Claim]:
+        """Return the current claims, see `LocalCoordinator.get_claims`."""
+        response = self._request("get", "/claims")
+        if response is None:
+            return list()
+
+        return [Claim(**claim) for claim in response]
+
+    def get_claimed_names(self, exclude_unit: str | None = None) -> set[str]:
+        """Return the names of the claimed fields, see `LocalCoordinator.get_claimed_names`."""
+        return {claim.field_name for claim in self.get_claims() if claim.unit_id != exclude_unit}
+
+
+def create_coordinator_from_config(config: dict | None = None):
+    """Create the coordinator from the `scheduler.coordination` config items.
+
+    Args:
+        config (dict, optional): The coordination config, with the ``url`` of the
+            service and an optional ``timeout``. Defaults to the config items.
+
+    Returns:
+        HTTPCoordinator or None: The coordinator, or None if no ``url`` is configured.
+    """
+    config = config or get_config("scheduler.coordination", default=None) or dict()
+
+    url = config.get("url")
+    if not url:
+        return None
+
+    logger.info(f"Coordinating the scheduler with {url}")
+    return HTTPCoordinator(url, timeout=config.get("timeout", 2.0))
@@ -7,7 +7,6 @@ excessive switching.
 """
 
 from panoptes.utils.time import current_time
-from panoptes.utils.utils import listify
 
 from panoptes.pocs.scheduler.scheduler import BaseScheduler
 
@@ -35,7 +34,8 @@ class Scheduler(BaseScheduler):
                 before scheduling occurs, defaults to False.
 
         Returns:
-            tuple or list: A tuple (or list of tuples) with name and score of ranked observations
+            tuple or list: A tuple (or list of tuples) with name and score of ranked observations.
+            The scores of each constraint are available afterwards as `score_matrix`.
         """
         if read_file:
             self.logger.debug("Rereading fields file")
@@ -44,58 +44,31 @@ class Scheduler(BaseScheduler):
         if time is None:
             time = current_time()
 
-        valid_obs = {obs: 0.0 for obs in self.observations}
         best_obs = []
 
         self.set_common_properties(time)
 
-        self.logger.info("Applying constraints to observations:")
-        for obs_name, observation in self.observations.items():
-            self.logger.info(f"{obs_name}")
-            # Get the global constraints.
-            all_constraints = constraints or self.constraints.copy()
-
-            # Add the observation specific constraints.
-            if observation.constraints is not None:
-                all_constraints += observation.constraints
-
-            for constraint in listify(all_constraints):
-                if obs_name in valid_obs:
-                    # Add a special case where we skip the Moon Avoidance constraint if
-                    # the observation name is "Moon".
-                    if constraint.name == "MoonAvoidance" and obs_name.lower() == "moon":
-                        self.logger.info(f"Skipping Moon Avoidance constraint for {obs_name}")
-                        continue
-
-                    veto, score = constraint.get_score(
-                        time, self.observer, observation, **self.common_properties
-                    )
-
-                    if veto:
-                        self.logger.info(f"\tVetoed by {constraint}")
-                        del valid_obs[obs_name]
-                        continue
-
-                    valid_obs[obs_name] += score
-                    self.logger.info(
-                        f"\t{str(constraint):30s}Constraint score: {score:10.02f}\t"
-                        f"Total score: {valid_obs[obs_name]:10.02f}"
-                    )
+        valid_obs = self.score_observations(time, constraints=constraints)
 
         if len(valid_obs) > 0:
             self.logger.info("Multiplying final scores by observation priority")
             for obs_name, score in valid_obs.items():
-                priority = self.observations[obs_name].priority
+                priority = self.targets[obs_name].priority
                 new_score = score * priority
-                self.logger.info(
-                    f"\t{obs_name:30s}Total score:      {score:10.02f}\t"
-                    f"Priority:    {priority:10.3f} = {new_score:10.02f}"
-                )
+                if self.log_scores:
+                    self.logger.info(
+                        f"\t{obs_name:30s}Total score:      {score:10.02f}\t"
+                        f"Priority:    {priority:10.3f} = {new_score:10.02f}"
+                    )
                 valid_obs[obs_name] = new_score
 
             # Sort the list by highest score (reverse puts in correct order)
             best_obs = sorted(valid_obs.items(), key=lambda x: x[1])[::-1]
 
+            # Skip the observations that other units claimed since the last pass.
+            best_obs = self.claim_ranked(best_obs)
+
+        if len(best_obs) > 0:
             top_obs_name, top_obs_score = best_obs[0]
             self.logger.info(f"Best observation: {top_obs_name}\tScore: {top_obs_score:.02f}")
 
@@ -113,7 +86,7 @@ class Scheduler(BaseScheduler):
                         best_obs.insert(0, (self.current_observation, self.current_observation.merit))
 
             # Set the current
-            self.current_observation = self.observations[top_obs_name]
+            self.current_observation = self.load_observation(top_obs_name)
             self.current_observation.merit = top_obs_score
         else:
             if self.current_observation is not None:
@@ -123,7 +96,12 @@ class Scheduler(BaseScheduler):
                     self.current_observation, end_of_next_set
                 ):
                     self.logger.info(f"Reusing {self.current_observation}")
-                    best_obs = [(self.current_observation.name, self.current_observation.merit)]
+                    best_obs = self.claim_ranked(
+                        [(self.current_observation.name, self.current_observation.merit)]
+                    )
+                    if len(best_obs) == 0:
+                        self.logger.warning(f"{self.current_observation} was claimed by another unit")
+                        self.current_observation = None
                 else:
                     self.logger.warning("No valid observations found")
                     self.current_observation = None
@@ -0,0 +1,601 @@
+"""Per-night ephemerides shared by the scheduler, its constraints and the observatory.
+
+Defines EphemerisGrid, which holds the altitude and azimuth of fields on a
+regular time grid covering one night, along with the local sidereal time.
+Fields are added to the grid in batches (a single AltAz transform for all new
+fields and times) and then interpolated, so repeated scheduling passes during
+the night do not need to repeat coordinate transforms or astroplan
+root-finding.
+
+Defines NightEphemeris, which holds the Sun and Moon positions on a time grid
+covering one observing day (local noon to noon) and memoizes the night
+boundaries. Use `get_night_ephemeris` to get the shared instance for a time, so
+the scheduler, the observatory status and the observing code don't recompute
+solar system positions or repeat astroplan's rise/set searches.
+
+Defines FieldEphemeris, which holds the airmass, hour angle and Moon separation
+of one field while it is observed, so the FITS headers of each exposure are
+interpolated instead of computed right before the shutter opens.
+
+Also provides `get_transit_and_set_offsets`, a closed-form (hour angle based)
+replacement for astroplan's iterative transit and set time searches for fixed
+sidereal targets.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from astroplan import Observer
+from astropy import units as u
+from astropy.coordinates import GCRS, TETE, AltAz, CartesianRepresentation, SkyCoord, get_body
+from astropy.time import Time
+
+from panoptes.utils.utils import get_quantity_value
+
+# Length of a sidereal day in seconds.
+SIDEREAL_DAY_SEC = 86164.0905
+
+# Number of `NightEphemeris` objects kept by `get_night_ephemeris`.
+MAX_CACHED_NIGHTS = 4
+
+_night_ephemerides = OrderedDict()
+_night_ephemerides_lock = threading.Lock()
+
+
+def get_transit_and_set_offsets(
+    observer: Observer, time: Time, coords: SkyCoord, horizon: u.Quantity
+) -> tuple[np.ndarray, np.ndarray]:
+    """Seconds from `time` until the next meridian transit and set of fixed targets.
+
+    Uses the apparent right ascension and declination of the targets together with
+    the local apparent sidereal time, so both values are closed-form and vectorized:
+    the transit happens when the hour angle is zero and the target sets when the
+    hour angle reaches `H0`, where ``cos(H0) = (sin(h) - sin(lat) sin(dec)) / (cos(lat) cos(dec))``.
+    Refraction is ignored, as it is by astroplan with the default (zero) pressure.
+
+    Args:
+        observer (astroplan.Observer): The observing site.
+        time (astropy.time.Time): The time from which to measure.
+        coords (astropy.coordinates.SkyCoord): Array of fixed (sidereal) target coordinates.
+        horizon (astropy.units.Quantity): The horizon altitude for the set time.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: Seconds until the next upper transit and
+        seconds until the next set. Targets that never set get `numpy.inf` and targets
+        that never rise get zero.
+    """
+    apparent = coords.transform_to(TETE(obstime=time))
+    ra = np.atleast_1d(apparent.ra.radian)
+    dec = np.atleast_1d(apparent.dec.radian)
+
+    lst = observer.local_sidereal_time(time).radian
+    lat = observer.location.lat.radian
+    horizon_rad = get_quantity_value(horizon, u.degree) * np.pi / 180
+
+    # Hour angle still to go until transit, as a fraction of a sidereal day.
+    transit_sec = ((ra - lst) % (2 * np.pi)) / (2 * np.pi) * SIDEREAL_DAY_SEC
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos_set_ha = (np.sin(horizon_rad) - np.sin(lat) * np.sin(dec)) / (np.cos(lat) * np.cos(dec))
+    set_ha = np.arccos(np.clip(cos_set_ha, -1, 1))
+
+    hour_angle = lst - ra
+    set_sec = ((set_ha - hour_angle) % (2 * np.pi)) / (2 * np.pi) * SIDEREAL_DAY_SEC
+    set_sec = np.where(cos_set_ha < -1, np.inf, set_sec)
+    set_sec = np.where(cos_set_ha > 1, 0.0, set_sec)
+
+    return transit_sec, set_sec
+
+
+class EphemerisGrid:
+    """Alt/az of a set of fixed fields sampled on a regular time grid.
+
+    Values between grid points are linearly interpolated. Rows are addressed
+    by the observation (field) name used to add them, see `rows` and `ensure`.
+    """
+
+    def __init__(
+        self,
+        observer: Observer,
+        coords: SkyCoord | None,
+        names: list[str],
+        start_time: Time,
+        end_time: Time,
+        step: u.Quantity = 5 * u.minute,
+    ):
+        """Compute the grid.
+
+        Args:
+            observer (astroplan.Observer): The observing site.
+            coords (astropy.coordinates.SkyCoord or None): Array of field coordinates,
+                None for a grid without fields.
+            names (list[str]): Names of the fields, in the same order as `coords`.
+            start_time (astropy.time.Time): Start of the grid, usually sunset.
+            end_time (astropy.time.Time): End of the grid, usually sunrise.
+            step (astropy.units.Quantity): Spacing of the time grid.
+        """
+        step = get_quantity_value(step, u.minute) * u.minute
+        num_steps = int(np.ceil(((end_time - start_time) / step).decompose().value)) + 1
+
+        self.observer = observer
+        self.step_sec = step.to_value(u.second)
+
+        self.times = start_time + np.arange(max(num_steps, 2)) * step
+        self._jd = self.times.jd
+        self.lst = np.unwrap(observer.local_sidereal_time(self.times).radian)
+
+        # Shape is (num_fields, num_times).
+        self.names = list()
+        self.index = dict()
+        self.alt = np.empty((0, len(self.times)), dtype=np.float32)
+        self.az = np.empty((0, len(self.times)), dtype=np.float32)
+        # Apparent right ascension to go with the apparent sidereal time.
+        self.ra = np.empty(0)
+
+        # Below-horizon masks, cached per horizon.
+        self._below = dict()
+
+        if coords is not None and len(names) > 0:
+            self.add(coords, names)
+
+    def add(self, coords: SkyCoord, names: list[str]):
+        """Add fields to the grid with one AltAz transform.
+
+        Args:
+            coords (astropy.coordinates.SkyCoord): Array of field coordinates.
+            names (list[str]): Names of the fields, in the same order as `coords`.
+                Names already on the grid are replaced.
+        """
+        self.remove([name for name in names if name in self.index])
+
+        altaz = self.observer.altaz(self.times, coords, grid_times_targets=True)
+        alt = np.atleast_2d(altaz.alt.degree).astype(np.float32)
+        az = np.atleast_2d(altaz.az.degree).astype(np.float32)
+        ra = np.atleast_1d(coords.transform_to(TETE(obstime=self.start_time)).ra.radian)
+
+        self.alt = np.concatenate([self.alt, alt])
+        self.az = np.concatenate([self.az, az])
+        self.ra = np.concatenate([self.ra, ra])
+        self._set_names(self.names + list(names))
+
+    def remove(self, names: list[str]):
+        """Remove fields from the grid, e.g. because they moved. Unknown names are ignored."""
+        drop = [self.index[name] for name in names if name in self.index]
+        if len(drop) == 0:
+            return
+
+        self.alt = np.delete(self.alt, drop, axis=0)
+        self.az = np.delete(self.az, drop, axis=0)
+        self.ra = np.delete(self.ra, drop)
+        drop = set(drop)
+        self._set_names([name for i, name in enumerate(self.names) if i not in drop])
+
+    def ensure(self, names: list[str], coords: SkyCoord, max_fields: int | None = None) -> np.ndarray | None:
+        """Return grid row indices for the given fields, adding the ones that are missing.
+
+        Args:
+            names (list[str]): Names of the fields.
+            coords (astropy.coordinates.SkyCoord): Coordinates of the fields, in the same
+                order as `names`, used for the fields that aren't on the grid yet.
+            max_fields (int, optional): Don't grow the grid beyond this many fields.
+
+        Returns:
+            numpy.ndarray | None: The row indices, or None if the missing fields don't
+            fit within `max_fields`.
+        """
+        missing = [i for i, name in enumerate(names) if name not in self.index]
+        if len(missing) > 0:
+            if max_fields is not None and len(self.names) + len(missing) > max_fields:
+                return None
+            self.add(coords[missing], [names[i] for i in missing])
+
+        return np.array([self.index[name] for name in names], dtype=int)
+
+    def _set_names(self, names):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self._below = dict()
+
+    @property
+    def start_time(self) -> Time:
+        """astropy.time.Time: First time on the grid."""
+        return self.times[0]
+
+    @property
+    def end_time(self) -> Time:
+        """astropy.time.Time: Last time on the grid."""
+        return self.times[-1]
+
+    def covers(self, time: Time) -> bool:
+        """Return True if `time` falls within the grid."""
+        return bool(self._jd[0] <= time.jd <= self._jd[-1])
+
+    def rows(self, observations) -> np.ndarray | None:
+        """Return grid row indices for the given observations.
+
+        Args:
+            observations (list[Observation]): Observations to look up by name.
+
+        Returns:
+            numpy.ndarray | None: The row indices, or None if any observation is
+            not part of the grid.
+        """
+        try:
+            return np.array([self.index[obs.name] for obs in observations], dtype=int)
+        except KeyError:
+            return None
+
+    def altaz(self, time: Time, rows: np.ndarray | None = None) -> SkyCoord:
+        """Interpolate the AltAz coordinates of the fields at `time`.
+
+        Args:
+            time (astropy.time.Time): A time covered by the grid.
+            rows (numpy.ndarray | None): Rows to return, defaults to all fields.
+
+        Returns:
+            astropy.coordinates.SkyCoord: AltAz coordinates, one per row.
+        """
+        i, frac = self._locate(time)
+        rows = slice(None) if rows is None else rows
+
+        alt = self.alt[rows, i] + frac * (self.alt[rows, i + 1] - self.alt[rows, i])
+
+        # Interpolate the azimuth along the shortest arc so we handle the wrap at 360.
+        az0 = self.az[rows, i]
+        delta_az = (self.az[rows, i + 1] - az0 + 180) % 360 - 180
+        az = (az0 + frac * delta_az) % 360
+
+        return SkyCoord(
+            alt=alt.astype(float) * u.degree,
+            az=az.astype(float) * u.degree,
+            frame=AltAz(obstime=time, location=self.observer.location),
+        )
+
+    def is_up(self, time: Time, horizon: u.Quantity, rows: np.ndarray | None = None) -> np.ndarray:
+        """Return a boolean array that is True for fields above `horizon` at `time`."""
+        return self.altaz(time, rows=rows).alt > horizon
+
+    def time_to_set(self, time: Time, horizon: u.Quantity, rows: np.ndarray | None = None) -> np.ndarray:
+        """Seconds from `time` until each field next drops below `horizon`.
+
+        Fields that do not set before the end of the grid get `numpy.inf`, and
+        fields that are already below the horizon get zero.
+
+        Args:
+            time (astropy.time.Time): A time covered by the grid.
+            horizon (astropy.units.Quantity): The horizon altitude.
+            rows (numpy.ndarray | None): Rows to return, defaults to all fields.
+
+        Returns:
+            numpy.ndarray: Seconds until set, one per row.
+        """
+        horizon_deg = get_quantity_value(horizon, u.degree)
+        below = self._below.get(horizon_deg)
+        if below is None:
+            below = self.alt < horizon_deg
+            self._below[horizon_deg] = below
+
+        i, frac = self._locate(time)
+        rows = np.arange(len(self.names)) if rows is None else np.asarray(rows)
+
+        # First grid point after `time` at which the field is below the horizon.
+        later = below[rows, i + 1 :]
+        sets = later.any(axis=1)
+        j = i + 1 + later.argmax(axis=1)
+
+        # Interpolate the crossing between the last point above and the first below.
+        alt_before = self.alt[rows, j - 1].astype(float)
+        alt_after = self.alt[rows, j].astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = np.clip((alt_before - horizon_deg) / (alt_before - alt_after), 0, 1)
+        crossing = np.nan_to_num(crossing)
+
+        seconds = (j - 1 + crossing - i - frac) * self.step_sec
+        seconds = np.where(sets, np.maximum(seconds, 0), np.inf)
+
+        # Fields that are currently below the horizon have already set.
+        is_up = self.is_up(time, horizon, rows=rows)
+        return np.where(is_up, seconds, 0.0)
+
+    def time_to_transit(self, time: Time, rows: np.ndarray | None = None) -> np.ndarray:
+        """Seconds from `time` until each field next crosses the meridian.
+
+        Args:
+            time (astropy.time.Time): A time covered by the grid.
+            rows (numpy.ndarray | None): Rows to return, defaults to all fields.
+
+        Returns:
+            numpy.ndarray: Seconds until the next upper meridian transit, one per row.
+        """
+        i, frac = self._locate(time)
+        lst = self.lst[i] + frac * (self.lst[i + 1] - self.lst[i])
+
+        ra = self.ra if rows is None else self.ra[rows]
+        hour_angle_to_go = (ra - lst) % (2 * np.pi)
+
+        return hour_angle_to_go / (2 * np.pi) * SIDEREAL_DAY_SEC
+
+    def _locate(self, time: Time) -> tuple[int, float]:
+        """Return the grid index before `time` and the fractional offset to the next point."""
+        position = (time.jd - self._jd[0]) / (self.step_sec / 86400)
+        i = int(np.clip(np.floor(position), 0, len(self._jd) - 2))
+        frac = float(np.clip(position - i, 0, 1))
+
+        return i, frac
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return (
+            f"<EphemerisGrid: {len(self.names)} fields, "
+            f"{self.start_time.isot} to {self.end_time.isot} every {self.step_sec:.0f}s>"
+        )
+
+
+class NightEphemeris:
+    """Sun and Moon positions for one observing day, sampled on a regular time grid.
+
+    The day runs from local mean noon to the next local mean noon. Values
+    between grid points are linearly interpolated. The start and end of the
+    night are computed with astroplan once per night and horizon (see `tonight`).
+    """
+
+    def __init__(self, observer: Observer, start_time: Time, step: u.Quantity = 5 * u.minute):
+        """Compute the Sun and Moon positions.
+
+        Args:
+            observer (astroplan.Observer): The observing site.
+            start_time (astropy.time.Time): Start of the day, see `get_day_start`.
+            step (astropy.units.Quantity): Spacing of the time grid.
+        """
+        step = get_quantity_value(step, u.minute) * u.minute
+        num_steps = int(np.ceil((1 * u.day / step).decompose().value)) + 1
+
+        self.observer = observer
+        self.step_sec = step.to_value(u.second)
+        self.times = start_time + np.arange(num_steps) * step
+        self._jd = self.times.jd
+
+        # Topocentric GCRS positions, as from `get_body(..., location=observer.location)`.
+        moon = get_body("moon", self.times, observer.location)
+        self._moon_xyz = moon.cartesian.xyz.to_value(u.km)
+
+        moon_altaz = observer.altaz(self.times, target=moon)
+        self._moon_alt = moon_altaz.alt.degree
+        self._moon_az = np.unwrap(moon_altaz.az.degree, period=360)
+
+        sun_altaz = observer.altaz(self.times, target=get_body("sun", self.times, observer.location))
+        self._sun_alt = sun_altaz.alt.degree
+        self._sun_az = np.unwrap(sun_altaz.az.degree, period=360)
+
+        self._moon_phase = observer.moon_phase(self.times).to_value(u.radian)
+        # Same as `astroplan.Observer.moon_illumination`.
+        self._moon_illumination = (1 + np.cos(self._moon_phase)) / 2
+
+        # Memoized night boundaries, keyed by horizon in degrees.
+        self._nights = dict()
+
+    @property
+    def start_time(self) -> Time:
+        """astropy.time.Time: First time on the grid."""
+        return self.times[0]
+
+    @property
+    def end_time(self) -> Time:
+        """astropy.time.Time: Last time on the grid."""
+        return self.times[-1]
+
+    def covers(self, time: Time) -> bool:
+        """Return True if `time` falls within the grid."""
+        return bool(self._jd[0] <= time.jd <= self._jd[-1])
+
+    def moon(self, time: Time) -> SkyCoord:
+        """Interpolate the position of the Moon at `time`.
+
+        Args:
+            time (astropy.time.Time): A time covered by the grid.
+
+        Returns:
+            astropy.coordinates.SkyCoord: The topocentric GCRS position, like
+            ``get_body("moon", time, observer.location)``.
+        """
+        xyz = [np.interp(time.jd, self._jd, values) for values in self._moon_xyz]
+        obsgeoloc, obsgeovel = self.observer.location.get_gcrs_posvel(time)
+
+        return SkyCoord(
+            CartesianRepresentation(*xyz, unit=u.km),
+            frame=GCRS(obstime=time, obsgeoloc=obsgeoloc, obsgeovel=obsgeovel),
+        )
+
+    def moon_altaz(self, time: Time) -> SkyCoord:
+        """Interpolate the AltAz coordinates of the Moon at `time`."""
+        return self._altaz(time, self._moon_alt, self._moon_az)
+
+    def sun_altaz(self, time: Time) -> SkyCoord:
+        """Interpolate the AltAz coordinates of the Sun at `time`."""
+        return self._altaz(time, self._sun_alt, self._sun_az)
+
+    def moon_illumination(self, time: Time) -> float:
+        """Interpolate the illuminated fraction of the Moon at `time`."""
+        return float(np.interp(time.jd, self._jd, self._moon_illumination))
+
+    def moon_phase(self, time: Time) -> u.Quantity:
+        """Interpolate the phase angle of the Moon at `time` (0 is full, pi is new)."""
+        return float(np.interp(time.jd, self._jd, self._moon_phase)) * u.radian
+
+    def tonight(self, time: Time, horizon: u.Quantity = 0 * u.degree) -> tuple[Time, Time]:
+        """Start and end of the night of `time`, like `astroplan.Observer.tonight`.
+
+        The boundaries are computed once and reused for later times until the
+        end of that night.
+
+        Args:
+            time (astropy.time.Time): The time of interest.
+            horizon (astropy.units.Quantity, optional): The Sun altitude that
+                defines the night, default zero degrees.
+
+        Returns:
+            tuple[astropy.time.Time, astropy.time.Time]: The start of the night (or
+            `time` if it is already night) and the end of the night.
+        """
+        key = get_quantity_value(horizon, u.degree)
+        night = self._nights.get(key)
+        if night is None or not night[0] <= time.jd < night[2].jd:
+            start_time, end_time = self.observer.tonight(time=time, horizon=key * u.degree)
+            night = (time.jd, start_time, end_time)
+            self._nights[key] = night
+
+        _, start_time, end_time = night
+        if time > start_time:
+            start_time = time
+
+        return start_time, end_time
+
+    def end_of_night(self, time: Time, horizon: u.Quantity = 0 * u.degree) -> Time:
+        """End of the night of `time`, see `tonight`."""
+        return self.tonight(time, horizon=horizon)[1]
+
+    def _altaz(self, time, alt, az):
+        """Interpolate an alt/az track at `time`."""
+        return SkyCoord(
+            alt=np.interp(time.jd, self._jd, alt) * u.degree,
+            az=(np.interp(time.jd, self._jd, az) % 360) * u.degree,
+            frame=AltAz(obstime=time, location=self.observer.location),
+        )
+
+    def __repr__(self):
+        return f"<NightEphemeris: {self.start_time.isot} to {self.end_time.isot} every {self.step_sec:.0f}s>"
+
+
+class FieldEphemeris:
+    """Airmass, hour angle and Moon separation of one field sampled on a regular time grid.
+
+    Used for the per-exposure FITS headers of the current observation. Values
+    between grid points are linearly interpolated; the airmass is computed from
+    the interpolated altitude.
+    """
+
+    def __init__(
+        self,
+        observer: Observer,
+        coord: SkyCoord,
+        start_time: Time,
+        duration: u.Quantity,
+        step: u.Quantity = 1 * u.minute,
+        name: str | None = None,
+    ):
+        """Compute the grid.
+
+        Args:
+            observer (astroplan.Observer): The observing site.
+            coord (astropy.coordinates.SkyCoord): The field coordinates.
+            start_time (astropy.time.Time): Start of the grid.
+            duration (astropy.units.Quantity): Length of the grid.
+            step (astropy.units.Quantity, optional): Spacing of the time grid, default one minute.
+            name (str, optional): Name of the field, see `matches`.
+        """
+        step = get_quantity_value(step, u.minute) * u.minute
+        duration = get_quantity_value(duration, u.minute) * u.minute
+        num_steps = max(int(np.ceil((duration / step).decompose().value)) + 1, 2)
+
+        self.observer = observer
+        self.coord = coord
+        self.name = name
+        self.step_sec = step.to_value(u.second)
+        self.times = start_time + np.arange(num_steps) * step
+        self._jd = self.times.jd
+
+        self._alt = observer.altaz(self.times, coord).alt.degree
+
+        # Same as `astroplan.Observer.target_hour_angle`, in hours.
+        lst = observer.local_sidereal_time(self.times).hour
+        self._hour_angle = np.unwrap(lst - coord.ra.hour, period=24)
+
+        moon = get_body("moon", self.times, observer.location)
+        self._moon_separation = moon.separation(coord, origin_mismatch="ignore").degree
+
+    @property
+    def start_time(self) -> Time:
+        """astropy.time.Time: First time on the grid."""
+        return self.times[0]
+
+    @property
+    def end_time(self) -> Time:
+        """astropy.time.Time: Last time on the grid."""
+        return self.times[-1]
+
+    def covers(self, time: Time) -> bool:
+        """Return True if `time` falls within the grid."""
+        return bool(self._jd[0] <= time.jd <= self._jd[-1])
+
+    def matches(self, name: str, coord: SkyCoord) -> bool:
+        """Return True if the grid was computed for the field `name` at `coord`."""
+        return bool(
+            name == self.name
+            and np.isclose(self.coord.ra.degree, coord.ra.degree)
+            and np.isclose(self.coord.dec.degree, coord.dec.degree)
+        )
+
+    def airmass(self, time: Time) -> float:
+        """Interpolate the airmass (secant of the zenith angle) at `time`."""
+        alt = np.interp(time.jd, self._jd, self._alt)
+        return float(1 / np.sin(np.radians(alt)))
+
+    def hour_angle(self, time: Time) -> float:
+        """Interpolate the hour angle in hours (0 to 24) at `time`."""
+        return float(np.interp(time.jd, self._jd, self._hour_angle) % 24)
+
+    def moon_separation(self, time: Time) -> float:
+        """Interpolate the separation from the Moon in degrees at `time`."""
+        return float(np.interp(time.jd, self._jd, self._moon_separation))
+
+    def __repr__(self):
+        return (
+            f"<FieldEphemeris: {self.name} {self.start_time.isot} to {self.end_time.isot} "
+            f"every {self.step_sec:.0f}s>"
+        )
+
+
+def get_day_start(observer: Observer, time: Time) -> Time:
+    """Return the local mean noon at the start of the observing day of `time`."""
+    longitude = observer.location.lon.degree / 360
+    return Time(np.floor(time.jd + longitude) - longitude, format="jd", scale=time.scale)
+
+
+def get_night_ephemeris(observer: Observer, time: Time, step: u.Quantity = 5 * u.minute) -> NightEphemeris:
+    """Get the shared `NightEphemeris` for the observing day of `time`.
+
+    The ephemerides of the last few days are kept per observing site, so all
+    callers for the same site and day share one instance.
+
+    Args:
+        observer (astroplan.Observer): The observing site.
+        time (astropy.time.Time): The time of interest.
+        step (astropy.units.Quantity, optional): Spacing of the time grid.
+
+    Returns:
+        NightEphemeris: The ephemeris covering `time`.
+    """
+    start_time = get_day_start(observer, time)
+    location = observer.location
+    key = (
+        location.lat.degree,
+        location.lon.degree,
+        location.height.to_value(u.m),
+        get_quantity_value(step, u.minute),
+        round(start_time.jd, 6),
+    )
+
+    with _night_ephemerides_lock:
+        night = _night_ephemerides.get(key)
+        if night is None:
+            night = NightEphemeris(observer, start_time, step=step)
+            _night_ephemerides[key] = night
+            while len(_night_ephemerides) > MAX_CACHED_NIGHTS:
+                _night_ephemerides.popitem(last=False)
+        else:
+            _night_ephemerides.move_to_end(key)
+
+    return night
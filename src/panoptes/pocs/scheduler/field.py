@@ -10,12 +10,16 @@ from astropy.coordinates import SkyCoord
 from panoptes.utils.time import current_time
 from panoptes.utils.utils import altaz_to_radec
 
-from panoptes.pocs.base import PanBase
+from panoptes.pocs.base import PanBase, Picklable
 
 
-class Field(FixedTarget, PanBase):
+class Field(FixedTarget, Picklable, PanBase):
     """Represents the center of an observing field (target) for scheduling."""
 
+    # Fixed RA/Dec targets allow closed-form rise/set/transit calculations. Subclasses
+    # for targets that move against the sky should set this to False.
+    is_sidereal = True
+
     def __init__(self, name, position, equinox="J2000", *args, **kwargs):
         """An object representing an area to be observed
 
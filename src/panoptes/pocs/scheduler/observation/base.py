@@ -17,7 +17,7 @@ from panoptes.utils import error
 from panoptes.utils.library import load_module
 from panoptes.utils.utils import get_quantity_value, listify
 
-from panoptes.pocs.base import PanBase
+from panoptes.pocs.base import PanBase, Picklable
 from panoptes.pocs.scheduler import create_constraints_from_config
 from panoptes.pocs.scheduler.field import Field
 
@@ -32,7 +32,7 @@ class Exposure:
     is_primary: bool = False
 
 
-class Observation(PanBase):
+class Observation(Picklable, PanBase):
     """Represents a scheduled observing block for a specific field.
 
     Tracks exposure configuration (exptime, set size, counts), progress, and
@@ -0,0 +1,363 @@
+"""Look-ahead scheduler implementation.
+
+Implements a scheduler that plans the rest of the night at once instead of
+greedily picking the best observation at a single instant. The night is divided
+into fixed-length slots, every observation is scored against the active
+constraints at the start of each slot, and a dynamic program picks the sequence
+of observations that maximizes the total priority-weighted merit minus the cost
+of switching targets. Each observation is kept for at least its minimum
+duration once it has been started.
+
+The plan is followed on later calls to `get_observation` and is rebuilt for the
+remaining night when the fields change, when the observatory falls off the plan
+(e.g. after a safety interruption parks the mount), or when the plan runs out.
+
+Select it with ``scheduler.type: panoptes.pocs.scheduler.planner``.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from astropy import units as u
+from astropy.time import Time
+
+from panoptes.utils.time import current_time
+from panoptes.utils.utils import get_quantity_value
+
+from panoptes.pocs.scheduler.scheduler import BaseScheduler
+
+
+@dataclass
+class PlanSlot:
+    """A single slot of the nightly plan."""
+
+    start_time: Time
+    name: str | None
+    merit: float
+
+
+class Scheduler(BaseScheduler):
+    """Look-ahead scheduler that plans the remaining night and follows the plan."""
+
+    def __init__(self, *args, slot_duration=None, switch_overhead=None, **kwargs):
+        """Initialize the Scheduler.
+
+        Args:
+            slot_duration (float or astropy.units.Quantity, optional): Length of a plan slot in
+                seconds. If `None` (the default), use the `scheduler.slot_duration` config item,
+                falling back to the shortest `set_duration` of the observations.
+            switch_overhead (float or astropy.units.Quantity, optional): Time in seconds lost
+                when switching to a different observation (slew, settle, pointing). If `None`
+                (the default), use the `scheduler.switch_overhead` config item, falling back
+                to 120 seconds.
+            *args: Arguments passed to `BaseScheduler`.
+            **kwargs: Keyword arguments passed to `BaseScheduler`.
+        """
+        BaseScheduler.__init__(self, *args, **kwargs)
+
+        if slot_duration is None:
+            slot_duration = self.get_config("scheduler.slot_duration", default=None)
+        if switch_overhead is None:
+            switch_overhead = self.get_config("scheduler.switch_overhead", default=120)
+
+        self._slot_duration = slot_duration
+        self.switch_overhead = get_quantity_value(switch_overhead, u.second) * u.second
+
+        self._plan = list()
+        self._plan_merits = None
+        self._plan_names = list()
+        self._plan_targets = None
+        self._planned_name = None
+        self._last_time = None
+
+    @property
+    def slot_duration(self):
+        """astropy.units.Quantity: Length of each slot in the plan."""
+        if self._slot_duration is not None:
+            return get_quantity_value(self._slot_duration, u.second) * u.second
+
+        set_durations = [obs.set_duration for obs in self.targets.values()]
+        if len(set_durations) == 0:
+            return 0 * u.second
+
+        return min(set_durations).to(u.second)
+
+    @property
+    def plan(self):
+        """list[PlanSlot]: The current plan for the remaining night."""
+        return self._plan
+
+    def get_observation(self, time=None, show_all=False, constraints=None, read_file=False):
+        """Get the planned observation for the given time.
+
+        The plan is (re)built for the remaining night if needed; see `needs_plan`.
+
+        Args:
+            time (astropy.time.Time, optional): Time at which scheduler applies,
+                defaults to time called
+            show_all (bool, optional): Return all valid observations for the current
+                slot along with their merit, defaults to False to only get top value
+            constraints (list of panoptes.pocs.scheduler.constraint.Constraint, optional): The
+                constraints to check. If `None` (the default), use the `scheduler.constraints`.
+                Passing constraints always rebuilds the plan.
+            read_file (bool, optional): If the fields file should be reread
+                before scheduling occurs, defaults to False.
+
+        Returns:
+            tuple or list: A tuple (or list of tuples) with name and merit of ranked observations
+        """
+        if read_file:
+            self.logger.debug("Rereading fields file")
+            self.read_field_list()
+
+        if time is None:
+            time = current_time()
+
+        self.set_common_properties(time)
+
+        if constraints is not None or self.needs_plan(time):
+            self.make_plan(time, constraints=constraints)
+
+        self._last_time = time
+
+        best_obs = []
+        slot_index = self._get_slot_index(time)
+        if slot_index is not None:
+            slot = self._plan[slot_index]
+            merits = self._plan_merits[:, slot_index]
+
+            if slot.name is not None:
+                best_obs = [(slot.name, slot.merit)]
+                ranked = np.argsort(merits)[::-1]
+                best_obs.extend(
+                    (self._plan_names[i], float(merits[i]))
+                    for i in ranked
+                    if np.isfinite(merits[i]) and self._plan_names[i] != slot.name
+                )
+
+        # Skip the observations that other units claimed since the plan was made.
+        best_obs = self.claim_ranked(best_obs)
+
+        if len(best_obs) > 0:
+            top_obs_name, top_obs_score = best_obs[0]
+            self.logger.info(f"Planned observation: {top_obs_name}\tMerit: {top_obs_score:.02f}")
+            self.current_observation = self.load_observation(top_obs_name)
+            self.current_observation.merit = top_obs_score
+            self._planned_name = top_obs_name
+        else:
+            self.logger.warning("No valid observations found")
+            self.current_observation = None
+            self._planned_name = None
+
+        if not show_all and len(best_obs) > 0:
+            best_obs = best_obs[0]
+
+        return best_obs
+
+    def needs_plan(self, time):
+        """Determine if the plan has to be rebuilt before it can be used at `time`.
+
+        The plan is rebuilt if there is no plan, the observations have changed,
+        `time` falls outside the plan, a planned observation was cleared (for
+        instance by parking after a safety interruption), or there was a gap of
+        more than one slot since the last call.
+
+        Args:
+            time (astropy.time.Time): The time the plan should apply to.
+
+        Returns:
+            bool: True if `make_plan` should be called.
+        """
+        if len(self._plan) == 0 or self._plan_targets is not self.targets:
+            return True
+
+        if self._get_slot_index(time) is None:
+            return True
+
+        if self._planned_name is not None and self.current_observation is None:
+            self.logger.info("Planned observation was interrupted, replanning")
+            return True
+
+        if self._last_time is not None and (time - self._last_time) > 2 * self.slot_duration:
+            self.logger.info("Fell behind the plan, replanning")
+            return True
+
+        return False
+
+    def make_plan(self, time, constraints=None):
+        """Plan the observations from `time` until the end of the night.
+
+        Every observation is scored at the start of each slot with
+        `score_observations` and multiplied by its priority. A dynamic program then
+        chooses one observation (or nothing) per slot to maximize the total merit,
+        where the first slot after a switch loses the fraction of the slot taken
+        by `switch_overhead`. An observation that is started is kept for enough
+        slots to cover its `minimum_duration`, and the current observation can be
+        continued without a switch, even though it is in the `visited_names`.
+
+        Args:
+            time (astropy.time.Time): Start of the plan.
+            constraints (list of panoptes.pocs.scheduler.constraint.Constraint, optional): The
+                constraints to check. If `None` (the default), use the `scheduler.constraints`.
+
+        Returns:
+            list[PlanSlot]: The new plan, also available as `plan`.
+        """
+        self._plan = list()
+        self._plan_targets = self.targets
+        self._plan_names = list(self._plan_targets.keys())
+
+        slot_sec = self.slot_duration.to_value(u.second)
+        end_of_night = self.common_properties["end_of_night"]
+        num_slots = int((end_of_night - time).sec // slot_sec) if slot_sec > 0 else 0
+
+        self._plan_merits = np.full((len(self._plan_names), max(num_slots, 0)), -np.inf)
+        if num_slots <= 0 or len(self._plan_names) == 0:
+            self.logger.info("No time left in the night to plan")
+            return self._plan
+
+        self.logger.info(f"Planning {num_slots} slots of {slot_sec:.0f}s from {time.isot}")
+        start_times = time + np.arange(num_slots) * slot_sec * u.second
+
+        # Ask the coordinator once per plan rather than once per slot.
+        claimed_names = self.common_properties["claimed_names"]
+        # The current observation is already visited, but it can be continued.
+        visited_names = self.visited_names
+        if self.current_observation is not None:
+            visited_names = visited_names - {self.current_observation.name}
+
+        priorities = np.array([obs.priority for obs in self._plan_targets.values()])
+        for s, slot_time in enumerate(start_times):
+            self.set_common_properties(slot_time, claimed_names=claimed_names)
+            self.common_properties["visited_names"] = visited_names
+            scores = self.score_observations(slot_time, constraints=constraints)
+            for i, name in enumerate(self._plan_names):
+                if name in scores:
+                    self._plan_merits[i, s] = scores[name] * priorities[i]
+
+        # Leave the common properties as they were for `time`.
+        self.set_common_properties(time, claimed_names=claimed_names)
+
+        min_slots = np.array(
+            [
+                max(int(np.ceil(obs.minimum_duration.to_value(u.second) / slot_sec)), 1)
+                for obs in self._plan_targets.values()
+            ]
+        )
+        overhead_fraction = min(self.switch_overhead.to_value(u.second) / slot_sec, 1.0)
+
+        current_index = None
+        if self.current_observation is not None and self.current_observation.name in self._plan_names:
+            current_index = self._plan_names.index(self.current_observation.name)
+
+        sequence = self._solve(self._plan_merits, min_slots, overhead_fraction, current_index)
+
+        for s, i in enumerate(sequence):
+            if i < 0:
+                self._plan.append(PlanSlot(start_times[s], None, 0.0))
+            else:
+                merit = self._plan_merits[i, s]
+                merit = float(merit) if np.isfinite(merit) else 0.0
+                self._plan.append(PlanSlot(start_times[s], self._plan_names[i], merit))
+
+        num_switches = sum(1 for a, b in zip(sequence[:-1], sequence[1:]) if a != b and b >= 0)
+        self.logger.info(f"Plan has {num_switches} switches and merit {self.plan_merit:.02f}")
+
+        return self._plan
+
+    @property
+    def plan_merit(self):
+        """float: Total merit of the observations in the plan."""
+        return float(sum(slot.merit for slot in self._plan))
+
+    def _solve(self, merits, min_slots, overhead_fraction, current_index=None):
+        """Find the best sequence of observations with a dynamic program.
+
+        The states are "idle" and (observation, slots observed so far) where the
+        count saturates at the minimum number of slots for that observation. A
+        switch is only allowed from idle or from an observation that has met its
+        minimum. An observation can only be started, or continued past its minimum,
+        in a slot where it is not vetoed.
+
+        Args:
+            merits (numpy.ndarray): Merit per (observation, slot), `-inf` where vetoed.
+            min_slots (numpy.ndarray): Minimum number of consecutive slots per observation.
+            overhead_fraction (float): Fraction of a slot's merit lost when switching.
+            current_index (int | None): Index of the observation currently being observed.
+
+        Returns:
+            list[int]: Observation index per slot, -1 for idle.
+        """
+        num_obs, num_slots = merits.shape
+        rows = np.arange(num_obs)
+        last = min_slots - 1
+        max_len = int(min_slots.max())
+        invalid = np.arange(max_len)[None, :] > last[:, None]
+
+        value = np.full((num_obs, max_len), -np.inf)
+        idle = 0.0
+        if current_index is not None:
+            value[current_index, last[current_index]] = 0.0
+
+        free_source = np.empty(num_slots, dtype=int)
+        stayed = np.empty((num_slots, num_obs), dtype=bool)
+        for s in range(num_slots):
+            merit = merits[:, s]
+            # Within the minimum run the block was already validated when it started
+            # (e.g. `Duration` checks the minimum duration), so vetoed slots score zero.
+            within_merit = np.where(np.isfinite(merit), merit, 0.0)
+            penalty = within_merit * overhead_fraction
+
+            # Best state that is allowed to switch to something else.
+            completed = value[rows, last]
+            best = int(np.argmax(completed))
+            if completed[best] > idle:
+                free_value, free_source[s] = completed[best], best
+            else:
+                free_value, free_source[s] = idle, -1
+
+            new_value = np.full_like(value, -np.inf)
+            new_value[:, 0] = free_value - penalty + merit
+            new_value[:, 1:] = value[:, :-1] + within_merit[:, None]
+
+            stay = completed + merit
+            stayed[s] = stay >= new_value[rows, last]
+            new_value[rows, last] = np.where(stayed[s], stay, new_value[rows, last])
+            new_value[invalid] = -np.inf
+
+            value = new_value
+            idle = free_value
+
+        # Backtrack from the best final state that has met its minimum.
+        sequence = [-1] * num_slots
+        completed = value[rows, last]
+        best = int(np.argmax(completed))
+        if completed[best] > idle:
+            state = (best, int(last[best]))
+        else:
+            state = (-1, 0)
+
+        for s in range(num_slots - 1, -1, -1):
+            obs_index, count = state
+            sequence[s] = obs_index
+            if obs_index < 0 or count == 0 and not (last[obs_index] == 0 and stayed[s, obs_index]):
+                source = free_source[s]
+                state = (source, last[source]) if source >= 0 else (-1, 0)
+            elif count == last[obs_index] and stayed[s, obs_index]:
+                state = (obs_index, count)
+            else:
+                state = (obs_index, count - 1)
+
+        return sequence
+
+    def _get_slot_index(self, time):
+        """Index of the plan slot containing `time`, or None if outside the plan."""
+        if len(self._plan) == 0:
+            return None
+
+        offset = (time - self._plan[0].start_time).sec
+        index = int(offset // self.slot_duration.to_value(u.second))
+        if 0 <= index < len(self._plan):
+            return index
+
+        return None
@@ -4,23 +4,115 @@ Defines BaseScheduler, an abstract class that loads field definitions
 and manages the list of Observation objects, current selection, and common
 properties used during scheduling. Concrete schedulers subclass this and
 implement get_observation().
+
+Also defines ScoreMatrix, the per-constraint scores of all observations from a
+scheduling pass (see `BaseScheduler.get_score_matrix`).
 """
 
+import copy
+import hashlib
 import os
+import threading
 from abc import abstractmethod
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import suppress
+from dataclasses import dataclass
 
+import numpy as np
+import pandas as pd
 from astroplan import Observer
 from astropy import units as u
-from astropy.coordinates import get_body
+from astropy.coordinates import SkyCoord
+from astropy.time import Time
 
 from panoptes.utils import error
 from panoptes.utils.serializers import from_yaml
 from panoptes.utils.time import current_time
+from panoptes.utils.utils import get_quantity_value, listify
 
 from panoptes.pocs.base import PanBase
+from panoptes.pocs.scheduler.cache import read_fields_cache
+from panoptes.pocs.scheduler.catalog import FieldCatalog
+from panoptes.pocs.scheduler.constraint import get_field_coords
+from panoptes.pocs.scheduler.coordination import DEFAULT_LEASE_TIME, create_coordinator_from_config
+from panoptes.pocs.scheduler.ephemeris import EphemerisGrid, get_night_ephemeris
 from panoptes.pocs.scheduler.observation.base import Observation
+from panoptes.pocs.scheduler.spatial import SkyIndex
+
+# Valid values of `BaseScheduler.pool_type`.
+POOL_TYPES = (None, "thread", "process")
+
+# Name of the `ScoreMatrix` column for the observation-specific constraints.
+OBSERVATION_CONSTRAINTS = "Observation constraints"
+
+# Config item a target of opportunity can be requested with from another process,
+# see `panoptes.pocs.observatory.Observatory.check_targets_of_opportunity`.
+TOO_CONFIG_KEY = "scheduler.target_of_opportunity"
+
+
+@dataclass
+class ScoreMatrix:
+    """Scores of every observation for every constraint from one scheduling pass.
+
+    Rows are observations and columns are the global constraints, followed by one
+    column for the sum of the observation-specific constraints. Scores are already
+    multiplied by the constraint weights. Constraints are not evaluated once an
+    observation has been vetoed, so the rest of its row is NaN.
+    """
+
+    time: Time
+    names: list[str]
+    constraints: list[str]
+    scores: np.ndarray
+    vetoes: np.ndarray
+    priorities: np.ndarray
+
+    @property
+    def valid(self) -> np.ndarray:
+        """numpy.ndarray: True for observations that were not vetoed."""
+        return ~self.vetoes.any(axis=1)
+
+    @property
+    def totals(self) -> np.ndarray:
+        """numpy.ndarray: Sum of the constraint scores, NaN for vetoed observations."""
+        return np.where(self.valid, np.nansum(self.scores, axis=1), np.nan)
+
+    @property
+    def merits(self) -> np.ndarray:
+        """numpy.ndarray: Totals multiplied by the priority, NaN for vetoed observations."""
+        return self.totals * self.priorities
+
+    def to_dataframe(self):
+        """Return the matrix as a `pandas.DataFrame` indexed by observation name.
+
+        There is one score column per constraint, a ``vetoed_by`` column with the
+        constraint that vetoed the observation (if any), and the ``total``,
+        ``priority`` and ``merit`` columns.
+        """
+        df = pd.DataFrame(self.scores, index=pd.Index(self.names, name="name"), columns=self.constraints)
+
+        vetoed_by = np.array(self.constraints, dtype=object)[self.vetoes.argmax(axis=1)]
+        df["vetoed_by"] = np.where(self.valid, None, vetoed_by)
+        df["total"] = self.totals
+        df["priority"] = self.priorities
+        df["merit"] = self.merits
+
+        return df
+
+    def log(self, logger):
+        """Log the score of every observation for every constraint at the info level."""
+        running = np.nancumsum(self.scores, axis=1)
+        for j, constraint in enumerate(self.constraints):
+            logger.info(f"{constraint}")
+            for i in np.flatnonzero(self.vetoes[:, j] | ~np.isnan(self.scores[:, j])):
+                if self.vetoes[i, j]:
+                    logger.info(f"\t{self.names[i]:30s}Vetoed by {constraint}")
+                else:
+                    logger.info(
+                        f"\t{self.names[i]:30s}Constraint score: {self.scores[i, j]:10.02f}\t"
+                        f"Total score: {running[i, j]:10.02f}"
+                    )
 
 
 class BaseScheduler(PanBase):
@@ -30,7 +122,23 @@ class BaseScheduler(PanBase):
     selection, and provides helpers used by concrete schedulers.
     """
 
-    def __init__(self, observer, fields_list=None, fields_file=None, constraints=None, *args, **kwargs):
+    def __init__(
+        self,
+        observer,
+        fields_list=None,
+        fields_file=None,
+        constraints=None,
+        ephemeris_step=None,
+        ephemeris_max_fields=None,
+        catalog_threshold=None,
+        log_scores=None,
+        pool_type=None,
+        pool_workers=None,
+        pool_chunk_size=None,
+        coordinator=None,
+        *args,
+        **kwargs,
+    ):
         """Loads `~pocs.scheduler.field.Field`s from a field.
 
         Note:
@@ -47,6 +155,36 @@ class BaseScheduler(PanBase):
             fields_list (list, optional): A list of valid target configurations.
             fields_file (str): YAML file containing field parameters.
             constraints (list, optional): List of `Constraints` to apply to each observation.
+            ephemeris_step (float or astropy.units.Quantity, optional): Spacing of the nightly
+                ephemeris grid in minutes. If `None` (the default), use the
+                `scheduler.ephemeris_step` config item, falling back to 5 minutes. A
+                value of 0 disables the grid.
+            ephemeris_max_fields (int, optional): Most fields held in the ephemeris grid.
+                Scoring passes with more candidates than fit transform their coordinates
+                instead. If `None` (the default), use the `scheduler.ephemeris_max_fields`
+                config item, falling back to 20000. A value of 0 means no limit.
+            catalog_threshold (int, optional): Field lists with at least this many entries
+                are held in a columnar `~pocs.scheduler.catalog.FieldCatalog` and only the
+                selected field is turned into an `Observation`. If `None` (the default), use
+                the `scheduler.catalog_threshold` config item, falling back to 1000. A value
+                of 0 disables the catalog.
+            log_scores (bool, optional): If True, log the score of every field for every
+                constraint (see `ScoreMatrix.log`), which is slow for large fields lists.
+                If `None` (the default), use the `scheduler.log_scores` config item,
+                falling back to False.
+            pool_type (str, optional): Evaluate constraints that are `parallel_safe` over a
+                ``thread`` or ``process`` pool. If `None` (the default), use the
+                `scheduler.pool_type` config item, falling back to evaluating serially.
+            pool_workers (int, optional): Number of workers in the pool. If `None` (the
+                default), use the `scheduler.pool_workers` config item, falling back to the
+                `concurrent.futures` default.
+            pool_chunk_size (int, optional): Number of fields per pool task. If `None` (the
+                default), use the `scheduler.pool_chunk_size` config item, falling back to 500.
+            coordinator (optional): A `~pocs.scheduler.coordination.LocalCoordinator` or
+                `~pocs.scheduler.coordination.HTTPCoordinator` that the current observation
+                is claimed with, so other units at the site can skip it. If `None` (the
+                default), it is created from the `scheduler.coordination` config items
+                (none if no ``url`` is configured).
             *args: Arguments to be passed to `PanBase`
             **kwargs: Keyword args to be passed to `PanBase`
         """
@@ -54,8 +192,30 @@ class BaseScheduler(PanBase):
 
         assert isinstance(observer, Observer)
 
+        if catalog_threshold is None:
+            catalog_threshold = self.get_config("scheduler.catalog_threshold", default=1000)
+        self.catalog_threshold = int(catalog_threshold or 0)
+
         self._observations = dict()
+        self._catalog = None
+        self._catalog_source = None
+        self._cached_catalog = None
+        self._targets = None
+        self._field_coords = None
+        self._sky_index = None
+        self._ephemeris = None
+        self._field_configs = dict()
+        self._too_configs = dict()
+        self._fields_file_stat = None
+        self._fields_file_hash = None
         self._current_observation = None
+
+        if coordinator is None:
+            coordinator = create_coordinator_from_config()
+        self.coordinator = coordinator
+        self.unit_id = self.get_config("pan_id", default="PAN000")
+        self.lease_time = self.get_config("scheduler.coordination.lease_time", default=DEFAULT_LEASE_TIME)
+
         self._fields_list = fields_list
         # Use the setter, which will force a file read.
         self.fields_file = fields_file
@@ -63,6 +223,47 @@ class BaseScheduler(PanBase):
         self.observer = observer
         self.constraints = constraints or list()
         self.observed_list = OrderedDict()
+        # Names of the fields in `observed_list`, for constant time lookups.
+        self.visited_names = set()
+
+        if log_scores is None:
+            log_scores = self.get_config("scheduler.log_scores", default=False)
+        self.log_scores = bool(log_scores)
+        # Result of the last call to `get_score_matrix`.
+        self.score_matrix = None
+
+        # Where the mount points and its `~pocs.mount.slew.SlewTimeModel`, set by the
+        # observatory for the `SlewTime` constraint. Without `mount_coords` the field
+        # of the current observation is used.
+        self.mount_coords = None
+        self.slew_model = None
+
+        # Targets of opportunity by name and the flag that asks the observing loop to stop.
+        self.too_priority = self.get_config("scheduler.too_priority", default=10_000)
+        self._preempt = threading.Event()
+
+        if pool_type is None:
+            pool_type = self.get_config("scheduler.pool_type", default=None)
+        if pool_type not in POOL_TYPES:
+            raise error.InvalidConfig(
+                f"Invalid scheduler pool_type={pool_type!r}, must be one of {POOL_TYPES}"
+            )
+        if pool_workers is None:
+            pool_workers = self.get_config("scheduler.pool_workers", default=None)
+        if pool_chunk_size is None:
+            pool_chunk_size = self.get_config("scheduler.pool_chunk_size", default=500)
+        self.pool_type = pool_type
+        self.pool_workers = pool_workers
+        self.pool_chunk_size = max(int(pool_chunk_size), 1)
+        self._executor = None
+
+        if ephemeris_step is None:
+            ephemeris_step = self.get_config("scheduler.ephemeris_step", default=5)
+        self.ephemeris_step = get_quantity_value(ephemeris_step, u.minute) * u.minute
+
+        if ephemeris_max_fields is None:
+            ephemeris_max_fields = self.get_config("scheduler.ephemeris_max_fields", default=20000)
+        self.ephemeris_max_fields = int(ephemeris_max_fields or 0) or None
 
         if self.get_config("scheduler.check_file", default=True):
             self.logger.debug("Reading fields list.")
@@ -86,16 +287,107 @@ class BaseScheduler(PanBase):
 
         Note:
             `read_field_list` is called if list is None
+
+            Fields held in the `catalog` are only included once they have been
+            selected (see `load_observation`). Use `targets` for all fields.
         """
         if self.has_valid_observations is False:
             self.read_field_list()
 
         return self._observations
 
+    @property
+    def catalog(self):
+        """`~pocs.scheduler.catalog.FieldCatalog` or None: Columnar catalog of the fields
+        from a large fields list, see `catalog_threshold`."""
+        return self._catalog
+
+    @property
+    def targets(self):
+        """dict: All fields that can be scheduled, keyed by name.
+
+        The values are `Observation` objects, or lightweight
+        `~pocs.scheduler.catalog.CatalogEntry` objects for fields in the `catalog`
+        that have not been selected yet. Fields in the catalog come first. The
+        dict is rebuilt when observations are added or removed.
+        """
+        if self._targets is None:
+            targets = dict()
+            observations = self.observations
+            if self._catalog is not None:
+                for name, entry in zip(self._catalog.names, self._catalog.entries):
+                    targets[name] = observations.get(name, entry)
+
+            for name, obs in observations.items():
+                targets.setdefault(name, obs)
+
+            self._targets = targets
+
+        return self._targets
+
+    @property
+    def field_coords(self):
+        """`astropy.coordinates.SkyCoord`: Array of field coordinates for `observations`.
+
+        The array is in the same order as `targets` and is rebuilt only when
+        observations are added or removed.
+        """
+        if self._field_coords is None:
+            targets = self.targets
+            if self._catalog is None:
+                self._field_coords = get_field_coords(list(targets.values()))
+            else:
+                others = list(targets.values())[len(self._catalog) :]
+                if len(others) == 0:
+                    self._field_coords = self._catalog.coords
+                else:
+                    catalog_coords = self._catalog.coords
+                    other_coords = get_field_coords(others)
+                    self._field_coords = SkyCoord(
+                        ra=np.concatenate([catalog_coords.ra.degree, other_coords.ra.degree]) * u.degree,
+                        dec=np.concatenate([catalog_coords.dec.degree, other_coords.dec.degree]) * u.degree,
+                        frame="icrs",
+                    )
+
+        return self._field_coords
+
+    @property
+    def sky_index(self):
+        """`~pocs.scheduler.spatial.SkyIndex`: Spatial index of `field_coords`.
+
+        The index is rebuilt when the field coordinates change.
+        """
+        coords = self.field_coords
+        if self._sky_index is None or self._sky_index.coords is not coords:
+            self._sky_index = SkyIndex(coords)
+
+        return self._sky_index
+
+    @property
+    def executor(self):
+        """`concurrent.futures.Executor` or None: Pool for constraints that are `parallel_safe`.
+
+        The pool is created on first use, see `pool_type`.
+        """
+        if self._executor is None and self.pool_type is not None:
+            self.logger.debug(f"Starting {self.pool_type} pool with max_workers={self.pool_workers}")
+            if self.pool_type == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_workers)
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.pool_workers)
+
+        return self._executor
+
+    def shutdown_pool(self):
+        """Shut down the constraint evaluation pool, if it was started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
     @property
     def has_valid_observations(self):
         """bool: True if one or more observations are currently available."""
-        return len(self._observations.keys()) > 0
+        return len(self._observations.keys()) > 0 or (self._catalog is not None and len(self._catalog) > 0)
 
     @property
     def current_observation(self):
@@ -124,6 +416,7 @@ class BaseScheduler(PanBase):
             if new_observation is not None:
                 new_observation.seq_time = current_time(flatten=True)
                 self.observed_list[new_observation.seq_time] = new_observation
+                self.visited_names.add(new_observation.name)
         else:
             # If no new observation, simply reset the current
             if new_observation is None:
@@ -134,10 +427,49 @@ class BaseScheduler(PanBase):
                     self.current_observation.reset()
                     new_observation.seq_time = current_time(flatten=True)
                     self.observed_list[new_observation.seq_time] = new_observation
+                    self.visited_names.add(new_observation.name)
+
+        self._release_claim(new_observation)
 
         self.logger.info(f"Setting new observation to {new_observation}")
         self._current_observation = new_observation
 
+    def _release_claim(self, new_observation):
+        """Release the claim on the current observation when switching away from it."""
+        if self.coordinator is None:
+            return
+
+        old_observation = self._current_observation
+        if old_observation is not None and (
+            new_observation is None or old_observation.name != new_observation.name
+        ):
+            self.coordinator.release(old_observation.name, self.unit_id)
+
+    def claim_ranked(self, ranked):
+        """Claim the best candidate that no other unit holds.
+
+        Called by `get_observation` before the selected observation is set. The
+        candidates are tried in order, and the ones another unit claimed in the
+        meantime are skipped. Claiming the current observation again renews its lease.
+
+        Args:
+            ranked (list[tuple]): ``(name, merit)`` tuples, best first.
+
+        Returns:
+            list[tuple]: The candidates from the first one that was claimed, empty if
+            all of them are held by other units. Without a `coordinator` the
+            candidates are returned unchanged.
+        """
+        if self.coordinator is None:
+            return ranked
+
+        for i, (name, _) in enumerate(ranked):
+            if self.coordinator.claim(name, self.unit_id, self.lease_time):
+                return ranked[i:]
+            self.logger.info(f"{name} is claimed by another unit, trying the next best observation")
+
+        return list()
+
     @property
     def fields_file(self):
         """Field configuration file
@@ -202,16 +534,216 @@ class BaseScheduler(PanBase):
         """Get a valid observation."""
         raise NotImplementedError
 
+    def score_observations(self, time, constraints=None):
+        """Apply the constraints to all observations and sum the scores.
+
+        See `get_score_matrix` for the details of the scoring.
+
+        Args:
+            time (astropy.time.Time): Time at which the constraints are evaluated.
+            constraints (list of panoptes.pocs.scheduler.constraint.Constraint, optional): The
+                constraints to check. If `None` (the default), use the `scheduler.constraints`.
+
+        Returns:
+            dict: Total (unweighted by priority) score keyed by observation name for
+            the observations that were not vetoed.
+        """
+        matrix = self.get_score_matrix(time, constraints=constraints)
+
+        return {matrix.names[i]: float(matrix.totals[i]) for i in np.flatnonzero(matrix.valid)}
+
+    def get_score_matrix(self, time, constraints=None):
+        """Apply the constraints to all observations and return the individual scores.
+
+        The global constraints first veto whole regions of the sky (e.g. below the
+        horizon or near the Moon) with `get_group_vetoes` and the `sky_index`. They
+        are then evaluated for all remaining candidates at once via `get_scores`,
+        using a single coordinate array and AltAz transform (or an interpolation
+        into the nightly ephemeris grid).
+        Observation-specific constraints are then applied to each surviving
+        observation with `get_score`. `set_common_properties` must be called first.
+
+        The result is also kept as `score_matrix`. The scores of each field are only
+        logged if `log_scores` is True.
+
+        Args:
+            time (astropy.time.Time): Time at which the constraints are evaluated.
+            constraints (list of panoptes.pocs.scheduler.constraint.Constraint, optional): The
+                constraints to check. If `None` (the default), use the `scheduler.constraints`.
+
+        Returns:
+            ScoreMatrix: The scores and vetoes of every observation and constraint.
+        """
+        observations = list(self.targets.values())
+        obs_names = list(self.targets.keys())
+        constraints = listify(constraints or self.constraints)
+
+        # One column per global constraint plus one for the observation-specific constraints.
+        num_columns = len(constraints) + 1
+        scores = np.full((len(observations), num_columns), np.nan)
+        vetoes = np.zeros((len(observations), num_columns), dtype=bool)
+        priorities = np.array([obs.priority for obs in observations], dtype=float)
+
+        self.score_matrix = ScoreMatrix(
+            time=time,
+            names=obs_names,
+            constraints=[str(constraint) for constraint in constraints] + [OBSERVATION_CONSTRAINTS],
+            scores=scores,
+            vetoes=vetoes,
+            priorities=priorities,
+        )
+        if len(observations) == 0:
+            return self.score_matrix
+
+        coords = self.field_coords
+        is_valid = np.ones(len(observations), dtype=bool)
+
+        # Special case where we skip the Moon Avoidance constraint if the observation name is "Moon".
+        is_moon = np.array([name.lower() == "moon" for name in obs_names], dtype=bool)
+
+        # Rule out whole regions of the sky before scoring individual fields.
+        for j, constraint in enumerate(constraints):
+            group_vetoes = constraint.get_group_vetoes(
+                time, self.observer, self.sky_index, **self.common_properties
+            )
+            if group_vetoes is None:
+                continue
+
+            if constraint.name == "MoonAvoidance":
+                group_vetoes &= ~is_moon
+
+            group_vetoes &= is_valid
+            self.logger.info(f"{constraint} vetoed {np.count_nonzero(group_vetoes)} fields")
+            vetoes[group_vetoes, j] = True
+            is_valid &= ~group_vetoes
+
+        rows = np.flatnonzero(is_valid)
+        if len(rows) > 0:
+            # Interpolate into the nightly ephemeris grid when possible, otherwise transform.
+            # Only the fields that pass the group vetoes are added to the grid.
+            grid_rows = None
+            ephemeris = self.common_properties.get("ephemeris")
+            if ephemeris is not None and ephemeris.covers(time):
+                grid_rows = ephemeris.ensure(
+                    [obs_names[i] for i in rows], coords[rows], max_fields=self.ephemeris_max_fields
+                )
+                if grid_rows is None:
+                    self.logger.debug(f"Too many fields for the ephemeris grid: {len(rows)}")
+
+            if grid_rows is not None:
+                altaz = ephemeris.altaz(time, rows=grid_rows)
+            else:
+                altaz = self.observer.altaz(time, target=coords[rows])
+
+            # Position of each observation in `altaz`.
+            altaz_index = np.full(len(observations), -1)
+            altaz_index[rows] = np.arange(len(rows))
+
+            for j, constraint in enumerate(constraints):
+                candidates = is_valid.copy()
+                if constraint.name == "MoonAvoidance" and is_moon.any():
+                    self.logger.info(
+                        f"Skipping Moon Avoidance constraint for {obs_names[np.argmax(is_moon)]}"
+                    )
+                    candidates &= ~is_moon
+
+                idx = np.flatnonzero(candidates)
+                if len(idx) == 0:
+                    continue
+
+                constraint_vetoes, constraint_scores = self._get_constraint_scores(
+                    constraint,
+                    time,
+                    [observations[i] for i in idx],
+                    coords=coords[idx],
+                    altaz=altaz[altaz_index[idx]],
+                    **self.common_properties,
+                )
+
+                vetoes[idx, j] = constraint_vetoes
+                scores[idx[~constraint_vetoes], j] = constraint_scores[~constraint_vetoes]
+                is_valid[idx[constraint_vetoes]] = False
+
+        # Add the observation specific constraints.
+        for i in np.flatnonzero(is_valid):
+            observation = observations[i]
+            total = 0.0
+            for constraint in listify(observation.constraints):
+                veto, score = constraint.get_score(time, self.observer, observation, **self.common_properties)
+
+                if veto:
+                    vetoes[i, -1] = True
+                    break
+
+                total += score
+
+            if not vetoes[i, -1]:
+                scores[i, -1] = total
+
+        if self.log_scores:
+            self.score_matrix.log(self.logger)
+
+        return self.score_matrix
+
+    def _get_constraint_scores(self, constraint, time, observations, **kwargs):
+        """Call `get_scores` of a global constraint, in chunks over the pool if it is `parallel_safe`.
+
+        The chunks are merged in order, so the result doesn't depend on the
+        order in which the workers finish.
+        """
+        executor = self.executor if getattr(constraint, "parallel_safe", False) else None
+        if executor is None or len(observations) <= self.pool_chunk_size:
+            return constraint.get_scores(time, self.observer, observations, **kwargs)
+
+        if self.pool_type == "process":
+            # The ephemeris grid is too large to send to each worker process.
+            kwargs.pop("ephemeris", None)
+
+        coords = kwargs.pop("coords")
+        altaz = kwargs.pop("altaz")
+
+        futures = list()
+        for start in range(0, len(observations), self.pool_chunk_size):
+            chunk = slice(start, start + self.pool_chunk_size)
+            futures.append(
+                executor.submit(
+                    constraint.get_scores,
+                    time,
+                    self.observer,
+                    observations[chunk],
+                    coords=coords[chunk],
+                    altaz=altaz[chunk],
+                    **kwargs,
+                )
+            )
+        self.logger.debug(f"Evaluating {constraint} in {len(futures)} chunks")
+
+        results = [future.result() for future in futures]
+        vetoes = np.concatenate([np.asarray(chunk_vetoes, dtype=bool) for chunk_vetoes, _ in results])
+        scores = np.concatenate([np.asarray(chunk_scores, dtype=float) for _, chunk_scores in results])
+
+        return vetoes, scores
+
     def clear_available_observations(self):
         """Reset the list of available observations"""
         # Clear out existing list and observations
         self.current_observation = None
         self._observations = dict()
+        self._catalog = None
+        self._catalog_source = None
+        self._cached_catalog = None
+        self._targets = None
+        self._field_configs = dict()
+        self._field_coords = None
+        self._ephemeris = None
+        self._fields_file_stat = None
+        self._fields_file_hash = None
 
     def reset_observed_list(self):
         """Reset the observed list"""
         self.logger.debug("Resetting observed list")
         self.observed_list = OrderedDict()
+        self.visited_names = set()
 
     def observation_available(self, observation, time):
         """Check if observation is available at given time
@@ -221,7 +753,62 @@ class BaseScheduler(PanBase):
             time (astropy.time.Time): The time at which to check observation
 
         """
-        return self.observer.target_is_up(time, observation.field, horizon=30 * u.degree)
+        horizon = 30 * u.degree
+
+        ephemeris = self.get_ephemeris(time)
+        if ephemeris is not None and ephemeris.covers(time):
+            rows = ephemeris.rows([observation])
+            if rows is not None:
+                return bool(ephemeris.is_up(time, horizon, rows=rows)[0])
+
+        return self.observer.target_is_up(time, observation.field, horizon=horizon)
+
+    def get_ephemeris(self, time):
+        """Get the ephemeris grid for the night of `time`, building it if needed.
+
+        The grid covers the night from `time` (or sunset, if `time` is during the
+        day) until sunrise. It starts without fields: `get_score_matrix` adds the
+        fields that pass the group vetoes, up to `ephemeris_max_fields`, so fields
+        that are never candidates are never computed. Observations that are added
+        or removed only add or remove their own rows. A new grid is built when
+        `time` is past the end of the current grid.
+
+        Args:
+            time (astropy.time.Time): The time that the grid should apply to.
+
+        Returns:
+            `panoptes.pocs.scheduler.ephemeris.EphemerisGrid` or None: The grid, or
+            None if the grid is disabled, there are no observations, or `time` falls
+            during the day before the grid starts.
+        """
+        if self.ephemeris_step <= 0 * u.minute or not self.has_valid_observations:
+            return None
+
+        grid = self._ephemeris
+        if grid is None or time > grid.end_time or time < grid.start_time - 1 * u.day:
+            try:
+                start_time, end_time = get_night_ephemeris(self.observer, time).tonight(
+                    time, horizon=0 * u.degree
+                )
+                grid = EphemerisGrid(
+                    self.observer, None, list(), start_time, end_time, step=self.ephemeris_step
+                )
+            except Exception as e:
+                self.logger.warning(f"Unable to build ephemeris grid: {e!r}")
+                return None
+
+            self.logger.debug(f"Built new ephemeris grid: {grid!r}")
+            self._ephemeris = grid
+
+        if time < grid.start_time:
+            return None
+
+        return grid
+
+    def _remove_from_ephemeris(self, names):
+        """Remove fields from the ephemeris grid, if there is one."""
+        if self._ephemeris is not None:
+            self._ephemeris.remove(names)
 
     def add_observation(self, observation_config: dict, **kwargs):
         """Adds an `Observation` to the scheduler.
@@ -237,11 +824,63 @@ class BaseScheduler(PanBase):
             if obs.name in self._observations:
                 self.logger.debug(f"Overriding existing entry for {obs.name=!r}")
             self._observations[obs.name] = obs
+            self._targets = None
+            self._field_coords = None
+            # The position may have changed, the field is added back when it is scored.
+            self._remove_from_ephemeris([obs.name])
             self.logger.debug(f"{obs!r} added to {self}.")
 
         except Exception as e:
             raise error.InvalidObservation(f"Invalid field: {observation_config!r} {e!r}")
 
+    def add_target_of_opportunity(self, observation_config: dict, priority=None) -> Observation:
+        """Add an urgent observation and ask the observing loop to stop for it.
+
+        The observation gets a high priority, so the next scheduling pass selects
+        it as soon as it is observable, and `preempt_requested` is set until that
+        pass (see `clear_preemption`). It is kept when the fields file is reread
+        and until it is removed with `remove_observation`.
+
+        Args:
+            observation_config (dict): Configuration dict for `Field` and `Observation`,
+                as for `add_observation`.
+            priority (float, optional): Priority of the observation. If `None` (the
+                default), use the ``priority`` from the config, falling back to the
+                `scheduler.too_priority` config item (10000).
+
+        Returns:
+            `~pocs.scheduler.observation.Observation`: The added observation.
+
+        Raises:
+            panoptes.utils.error.InvalidObservation: If the config is not valid.
+        """
+        observation_config = copy.deepcopy(observation_config)
+        try:
+            name = observation_config["field"]["name"]
+            obs_config = observation_config.setdefault("observation", dict())
+        except (KeyError, TypeError, AttributeError):
+            raise error.InvalidObservation(f"Invalid target of opportunity: {observation_config!r}")
+
+        if priority is not None:
+            obs_config["priority"] = priority
+        obs_config.setdefault("priority", self.too_priority)
+
+        self.add_observation(observation_config)
+        self._too_configs[name] = observation_config
+        self._preempt.set()
+        self.logger.success(f"Target of opportunity added: {self._observations[name]}")
+
+        return self._observations[name]
+
+    @property
+    def preempt_requested(self) -> bool:
+        """bool: True if a target of opportunity was added since the last scheduling pass."""
+        return self._preempt.is_set()
+
+    def clear_preemption(self):
+        """Clear `preempt_requested`, called when the scheduler is about to select again."""
+        self._preempt.clear()
+
     def remove_observation(self, field_name):
         """Removes an `Observation` from the scheduler
 
@@ -249,33 +888,256 @@ class BaseScheduler(PanBase):
             field_name (str): Field name corresponding to entry key in `observations`
 
         """
+        self._too_configs.pop(field_name, None)
+
+        if self._catalog is not None and field_name in self._catalog:
+            self._catalog = self._catalog.without(field_name)
+            self._targets = None
+            self._field_coords = None
+            self._remove_from_ephemeris([field_name])
+            self.logger.debug(f"Field removed from catalog: {field_name}")
+
         with suppress(Exception):
             obs = self._observations[field_name]
             del self._observations[field_name]
+            self._targets = None
+            self._field_coords = None
+            self._remove_from_ephemeris([field_name])
             self.logger.debug(f"Observation removed: {obs}")
 
+    def load_observation(self, field_name):
+        """Get the full `Observation` for a field, creating it from the `catalog` if needed.
+
+        Observations created from the catalog are kept in `observations`, so the
+        same object is returned on later calls.
+
+        Args:
+            field_name (str): Field name corresponding to entry key in `targets`.
+
+        Returns:
+            `~pocs.scheduler.observation.Observation`: The observation.
+        """
+        obs = self._observations.get(field_name)
+        if obs is None and self._catalog is not None and field_name in self._catalog:
+            obs = self._catalog.get_observation(field_name)
+            self.logger.debug(f"Observation created from catalog: {obs!r}")
+
+            # Same name and position, so the coordinates and ephemeris stay valid.
+            self._observations[field_name] = obs
+            if self._targets is not None:
+                self._targets[field_name] = obs
+
+        if obs is None:
+            obs = self.observations[field_name]
+
+        return obs
+
     def read_field_list(self):
-        """Reads the field file and creates valid `Observations`."""
+        """Reads the field file and creates valid `Observations`.
+
+        The file is only parsed if its modification time or size has changed and
+        its content hash differs from the last read, otherwise only the targets of
+        opportunity are added back. Only entries that were added, removed or
+        modified since the last read are applied, so existing `Observation`
+        objects (and their progress and merit) are kept.
+        """
         self.logger.debug(f"Reading fields from file: {self.fields_file}")
         if self._fields_file is not None:
             if not os.path.exists(self.fields_file):
                 raise FileNotFoundError
 
-            with open(self.fields_file) as f:
-                self._fields_list = from_yaml(f.read())
+            file_stat = os.stat(self.fields_file)
+            file_stat = (file_stat.st_mtime_ns, file_stat.st_size)
+
+            if file_stat == self._fields_file_stat:
+                self._add_targets_of_opportunity()
+                return
+
+            with open(self.fields_file, "rb") as f:
+                contents = f.read()
+
+            self._fields_file_stat = file_stat
+            file_hash = hashlib.sha256(contents).hexdigest()
+            if file_hash == self._fields_file_hash:
+                self.logger.debug(f"Fields file touched but not changed: {self.fields_file}")
+                self._add_targets_of_opportunity()
+                return
+
+            default_exptime = self.get_config("cameras.defaults.exptime", default=120)
+            cached = read_fields_cache(self.fields_file, file_hash, default_exptime=default_exptime)
+            if cached is not None:
+                self.logger.debug(f"Fields file changed, using cache for {self.fields_file}")
+                self._fields_list, catalog = cached
+                self._cached_catalog = None
+                if catalog is not None and len(catalog) > 0:
+                    self._cached_catalog = (self._fields_list, catalog)
+            else:
+                self.logger.debug(f"Fields file changed, parsing {self.fields_file}")
+                self._fields_list = from_yaml(contents.decode())
+            self._fields_file_hash = file_hash
 
         if self._fields_list is not None:
-            for observation_config in self._fields_list:
+            self._update_observations(self._fields_list)
+
+        self._add_targets_of_opportunity()
+
+    def _add_targets_of_opportunity(self):
+        # Targets of opportunity aren't in the fields file, so add them back after a clear.
+        for name, observation_config in self._too_configs.items():
+            if name not in self._observations:
+                self.add_observation(observation_config)
+
+    def _update_observations(self, fields_list):
+        """Apply the differences between `fields_list` and the previously loaded configs.
+
+        Large lists (see `catalog_threshold`) are stored in a `FieldCatalog`, except
+        for entries the catalog can't hold, which are still added as observations.
+
+        Args:
+            fields_list (list[dict]): Observation configs, see `add_observation`.
+        """
+        use_catalog = self.catalog_threshold > 0 and len(fields_list) >= self.catalog_threshold
+
+        new_configs = dict()
+        for observation_config in fields_list:
+            if use_catalog and FieldCatalog.accepts(observation_config):
+                continue
+
+            try:
+                name = observation_config["field"]["name"]
+            except (KeyError, TypeError):
+                # Can't track it by name, so just (re)add it.
                 try:
                     self.add_observation(observation_config)
                 except Exception as e:
                     self.logger.warning(f"Error adding observation: {e!r}")
+                continue
+
+            new_configs[name] = observation_config
+
+        # Remove observations that were loaded from the list before but are now gone.
+        for name in self._field_configs.keys() - new_configs.keys():
+            self.logger.debug(f"Field removed from list: {name}")
+            self.remove_observation(name)
+
+        field_configs = dict()
+        for name, observation_config in new_configs.items():
+            if name in self._observations and self._field_configs.get(name) == observation_config:
+                field_configs[name] = observation_config
+                continue
+
+            try:
+                self.add_observation(observation_config)
+            except Exception as e:
+                self.logger.warning(f"Error adding observation: {e!r}")
+            else:
+                field_configs[name] = observation_config
+
+        self._field_configs = field_configs
+
+        if use_catalog:
+            self._update_catalog(fields_list)
+        elif self._catalog is not None:
+            self._update_catalog(list())
+
+    def _update_catalog(self, fields_list):
+        """Rebuild the `catalog` from the configs in `fields_list` it can hold.
+
+        Observations that were created from the old catalog are kept if their
+        config is unchanged.
+
+        Args:
+            fields_list (list[dict]): Observation configs, see `add_observation`.
+        """
+        # Nothing to do if the catalog was already built from this (unmodified) list.
+        source = self._catalog_source
+        if self._catalog is not None and source[0] is fields_list and source[1] == len(fields_list):
+            return
+
+        catalog = None
+        if self._cached_catalog is not None and self._cached_catalog[0] is fields_list:
+            # Already validated, see `panoptes.pocs.scheduler.cache`.
+            catalog = self._cached_catalog[1]
+            self.logger.debug(f"Loaded {catalog!r} from cache")
+        else:
+            configs = [config for config in fields_list if FieldCatalog.accepts(config)]
+            if len(configs) > 0:
+                default_exptime = self.get_config("cameras.defaults.exptime", default=120)
+                catalog = FieldCatalog.from_configs(configs, default_exptime=default_exptime)
+                self.logger.debug(f"Loaded {catalog!r}")
+
+        if self._catalog is not None:
+
+            def is_changed(name):
+                return (
+                    catalog is None
+                    or name not in catalog
+                    or catalog.get_config(name) != self._catalog.get_config(name)
+                )
+
+            for name in self._catalog.names:
+                if name in self._observations and is_changed(name):
+                    del self._observations[name]
+
+            if self._ephemeris is not None:
+                self._remove_from_ephemeris(
+                    [name for name in self._ephemeris.names if name in self._catalog and is_changed(name)]
+                )
+
+        self._catalog = catalog
+        self._catalog_source = (fields_list, len(fields_list)) if catalog is not None else None
+        self._targets = None
+        self._field_coords = None
+
+    def get_mount_coords(self):
+        """Where the mount is expected to point, for estimating slew times.
+
+        Returns:
+            astropy.coordinates.SkyCoord or None: `mount_coords` if set, else the field
+            of the current observation, or None (the home position).
+        """
+        if self.mount_coords is not None:
+            return self.mount_coords
+
+        if self.current_observation is not None:
+            return self.current_observation.field.coord
+
+        return None
+
+    def get_claimed_names(self):
+        """Names of the fields that other units claimed through the `coordinator`.
+
+        Returns:
+            set[str]: The field names, empty without a coordinator.
+        """
+        if self.coordinator is None:
+            return set()
+
+        return self.coordinator.get_claimed_names(exclude_unit=self.unit_id)
+
+    def set_common_properties(self, time, claimed_names=None):
+        """Sets some properties common to all observations, such as end of night, moon, etc.
+
+        The end of the night and the Moon come from the shared per-night ephemeris,
+        see `panoptes.pocs.scheduler.ephemeris.get_night_ephemeris`.
+
+        Args:
+            time (astropy.time.Time): The time the properties apply to.
+            claimed_names (set[str], optional): Names claimed by other units. If `None`
+                (the default), they are fetched from the `coordinator`.
+        """
+        if claimed_names is None:
+            claimed_names = self.get_claimed_names()
 
-    def set_common_properties(self, time):
-        """Sets some properties common to all observations, such as end of night, moon, etc."""
         horizon_limit = self.get_config("location.observe_horizon", default=-18 * u.degree)
+        night = get_night_ephemeris(self.observer, time)
         self.common_properties = {
-            "end_of_night": self.observer.tonight(time=time, horizon=horizon_limit)[-1],
-            "moon": get_body("moon", time, self.observer.location),
+            "end_of_night": night.end_of_night(time, horizon=horizon_limit),
+            "moon": night.moon(time),
             "observed_list": self.observed_list,
+            "visited_names": self.visited_names,
+            "ephemeris": self.get_ephemeris(time),
+            "mount_coords": self.get_mount_coords(),
+            "slew_model": self.slew_model,
+            "claimed_names": claimed_names,
         }
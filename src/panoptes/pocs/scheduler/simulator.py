@@ -0,0 +1,148 @@
+"""Whole-night scheduling simulator.
+
+Steps a scheduler through a night on a virtual clock instead of running POCS:
+at each step the scheduler picks an observation, the clock advances by the
+observation's `set_duration` plus a fixed overhead, and the scheduler is asked
+again. Selecting an observation marks it as visited in the usual way (see
+`BaseScheduler.current_observation`), so the same `Scheduler`, constraints and
+fields file give the same decisions as during a real night.
+
+The virtual clock is the ``POCSTIME`` environment variable, which is what
+`panoptes.utils.time.current_time` reports while it is set.
+
+A simulation doesn't claim or release fields on the site coordination service
+(see `panoptes.pocs.scheduler.coordination`): the scheduler's `coordinator` is
+removed for the duration of the simulation, so the other units are unaffected.
+
+Run it with ``pocs scheduler simulate``.
+"""
+
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from astropy import units as u
+from astropy.time import Time
+
+from panoptes.utils.time import current_time
+from panoptes.utils.utils import get_quantity_value
+
+from panoptes.pocs.scheduler.ephemeris import get_night_ephemeris
+from panoptes.pocs.utils.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class TimelineEntry:
+    """A block of time in a simulated night, spent on one set of an observation or idle."""
+
+    start_time: Time
+    end_time: Time
+    name: str | None
+    merit: float | None = None
+    priority: float | None = None
+
+    def to_dict(self) -> dict:
+        """Return the entry as a dict with ISO times, e.g. for JSON output."""
+        return {
+            "start_time": self.start_time.isot,
+            "end_time": self.end_time.isot,
+            "name": self.name,
+            "merit": self.merit,
+            "priority": self.priority,
+        }
+
+
+@contextmanager
+def virtual_clock(time: Time):
+    """Context manager that sets ``POCSTIME`` to `time` and restores it afterwards."""
+    original = os.environ.get("POCSTIME")
+    os.environ["POCSTIME"] = time.isot
+    try:
+        yield
+    finally:
+        if original is None:
+            os.environ.pop("POCSTIME", None)
+        else:
+            os.environ["POCSTIME"] = original
+
+
+def simulate_night(
+    scheduler,
+    time: Time | None = None,
+    end_time: Time | None = None,
+    overhead: u.Quantity = 60 * u.second,
+    idle_step: u.Quantity = 5 * u.minute,
+) -> list[TimelineEntry]:
+    """Step `scheduler` through a night on a virtual clock.
+
+    Args:
+        scheduler (panoptes.pocs.scheduler.scheduler.BaseScheduler): The scheduler,
+            e.g. from `panoptes.pocs.scheduler.create_scheduler_from_config`.
+        time (astropy.time.Time, optional): A time during or before the night to simulate,
+            defaults to now. The simulation starts at `time` or at the start of the night,
+            when the Sun sets below `location.observe_horizon`, whichever is later.
+        end_time (astropy.time.Time, optional): End of the simulation, defaults to the end
+            of the night.
+        overhead (float or astropy.units.Quantity, optional): Time in seconds added to each
+            set for slewing, readout and processing, default 60 seconds.
+        idle_step (float or astropy.units.Quantity, optional): Time in seconds to wait when
+            there is no valid observation, default 5 minutes.
+
+    Returns:
+        list[TimelineEntry]: One entry per set of exposures, plus the idle periods.
+    """
+    coordinator = scheduler.coordinator
+    scheduler.coordinator = None
+    try:
+        return _simulate_night(scheduler, time, end_time, overhead, idle_step)
+    finally:
+        scheduler.coordinator = coordinator
+
+
+def _simulate_night(scheduler, time, end_time, overhead, idle_step) -> list[TimelineEntry]:
+    observe_horizon = scheduler.get_config("location.observe_horizon", default=-18 * u.degree)
+
+    if time is None:
+        time = current_time()
+
+    start_time, end_of_night = get_night_ephemeris(scheduler.observer, time).tonight(
+        time, horizon=observe_horizon
+    )
+    if end_time is None:
+        end_time = end_of_night
+
+    overhead = get_quantity_value(overhead, u.second) * u.second
+    idle_step = get_quantity_value(idle_step, u.second) * u.second
+
+    logger.info(f"Simulating night from {start_time.isot} to {end_time.isot}")
+
+    timeline = list()
+    time = start_time
+    while time < end_time:
+        with virtual_clock(time):
+            scheduler.get_observation(time=time)
+
+        observation = scheduler.current_observation
+        if observation is None:
+            next_time = min(time + idle_step, end_time)
+            if len(timeline) > 0 and timeline[-1].name is None:
+                timeline[-1].end_time = next_time
+            else:
+                timeline.append(TimelineEntry(time, next_time, None))
+        else:
+            next_time = time + observation.set_duration + overhead
+            timeline.append(
+                TimelineEntry(
+                    time,
+                    next_time,
+                    observation.name,
+                    merit=float(observation.merit),
+                    priority=float(observation.priority),
+                )
+            )
+
+        time = next_time
+
+    return timeline
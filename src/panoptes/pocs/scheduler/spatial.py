@@ -0,0 +1,113 @@
+"""Spatial index over the scheduler's fields.
+
+Defines SkyIndex, a KD-tree on the unit vectors of the field positions. A cone
+query (e.g. around the Moon) or a query for everything far from the zenith
+returns whole groups of fields in one operation, so constraints can veto them
+before the per-field scoring runs (see `BaseConstraint.get_group_vetoes`).
+"""
+
+import numpy as np
+from astropy import units as u
+from astropy.coordinates import AltAz, SkyCoord
+from astropy.time import Time
+from scipy.spatial import KDTree
+
+from panoptes.utils.utils import get_quantity_value
+
+
+def get_unit_vectors(coords: SkyCoord) -> np.ndarray:
+    """Return an (n, 3) array of unit vectors for the ICRS directions of `coords`.
+
+    Frames with the same axes as ICRS (e.g. GCRS, such as the Moon from
+    `astropy.coordinates.get_body`) are used as is, ignoring the small difference
+    due to aberration. Other frames are transformed to ICRS first.
+    """
+    if coords.frame.name not in ("icrs", "gcrs"):
+        coords = coords.icrs
+
+    ra = np.atleast_1d(coords.spherical.lon.radian)
+    dec = np.atleast_1d(coords.spherical.lat.radian)
+
+    return np.column_stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)])
+
+
+class SkyIndex:
+    """KD-tree of field positions for fast cone and horizon queries.
+
+    Distances between unit vectors are chord lengths, which increase
+    monotonically with the angular separation, so a cone query is a ball query
+    on the tree.
+    """
+
+    def __init__(self, coords: SkyCoord):
+        """Build the index.
+
+        Args:
+            coords (astropy.coordinates.SkyCoord): Array of field coordinates. The
+                rows of the index match the order of `coords`.
+        """
+        self.coords = coords
+        self.vectors = get_unit_vectors(coords)
+        self.tree = KDTree(self.vectors)
+
+    def query_cone(self, center: SkyCoord, radius: u.Quantity) -> np.ndarray:
+        """Return the rows of all fields within `radius` of `center`.
+
+        Args:
+            center (astropy.coordinates.SkyCoord): Center of the cone.
+            radius (astropy.units.Quantity): Opening angle of the cone, in degrees if a float.
+
+        Returns:
+            numpy.ndarray: Sorted row indices.
+        """
+        radius_rad = np.deg2rad(get_quantity_value(radius, u.degree))
+        if radius_rad <= 0:
+            return np.array([], dtype=int)
+
+        chord = 2 * np.sin(min(radius_rad, np.pi) / 2)
+        rows = self.tree.query_ball_point(get_unit_vectors(center)[0], chord)
+
+        return np.sort(np.asarray(rows, dtype=int))
+
+    def query_outside(self, center: SkyCoord, radius: u.Quantity) -> np.ndarray:
+        """Return a boolean mask that is True for the fields further than `radius` from `center`.
+
+        Args:
+            center (astropy.coordinates.SkyCoord): Center of the cone.
+            radius (astropy.units.Quantity): Opening angle of the cone, in degrees if a float.
+
+        Returns:
+            numpy.ndarray: Boolean mask, one entry per row.
+        """
+        outside = np.ones(len(self), dtype=bool)
+        outside[self.query_cone(center, radius)] = False
+
+        return outside
+
+    def below_horizon(self, observer, time: Time, altitude: u.Quantity) -> np.ndarray:
+        """Return a boolean mask that is True for the fields below `altitude`.
+
+        This is a query for everything more than ``90 - altitude`` from the
+        zenith, so it only uses the ICRS positions of the fields. Callers that
+        need to be conservative should lower `altitude` by a small margin to allow
+        for precession and nutation of the catalog positions.
+
+        Args:
+            observer (astroplan.Observer): The observing site.
+            time (astropy.time.Time): The time of the query.
+            altitude (astropy.units.Quantity): The altitude limit, in degrees if a float.
+
+        Returns:
+            numpy.ndarray: Boolean mask, one entry per row.
+        """
+        zenith = SkyCoord(
+            alt=90 * u.degree, az=0 * u.degree, frame=AltAz(obstime=time, location=observer.location)
+        ).icrs
+
+        return self.query_outside(zenith, 90 - get_quantity_value(altitude, u.degree))
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def __repr__(self):
+        return f"<SkyIndex: {len(self)} fields>"
@@ -23,7 +23,9 @@ from panoptes.pocs.utils.cli import (
     notebook,
     power,
     run,
+    scheduler,
     sensor,
+    timing,
     weather,
 )
 
@@ -37,7 +39,9 @@ app.add_typer(camera.app, name="camera", help="Simple camera controls.")
 app.add_typer(notebook.app, name="notebook", help="Start Jupyter notebook environment.")
 app.add_typer(power.app, name="power", help="Interact with power relays.")
 app.add_typer(run.app, name="run", help="Run POCS!")
+app.add_typer(scheduler.app, name="scheduler", help="Scheduler utilities.")
 app.add_typer(sensor.app, name="sensor", help="Interact with system sensors.")
+app.add_typer(timing.app, name="timing", help="Report where the observing time goes.")
 app.add_typer(weather.app, name="weather", help="Interact with weather station service.")
 
 
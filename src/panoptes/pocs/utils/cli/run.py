@@ -7,7 +7,6 @@ import os
 import warnings
 from collections import defaultdict
 from itertools import product
-from multiprocessing import Process
 from pathlib import Path
 
 import typer
@@ -177,7 +176,6 @@ def run_long_alignment(
         # Shared sequence time for all alignment observations.
         sequence_time = current_time(flatten=True)
 
-        procs = list()
         for i, altaz_coord in enumerate(altaz_coords):
             # Check safety (parking happens below if unsafe).
             if pocs.is_safe(park_if_not_safe=False) is False:
@@ -214,9 +212,7 @@ def run_long_alignment(
 
                 # Do processing in background (if exposure time is long enough).
                 if exptime > 10:
-                    process_proc = Process(target=pocs.observatory.process_observation)
-                    process_proc.start()
-                    procs.append(process_proc)
+                    pocs.observatory.process_observation(blocking=False)
 
             mount.query("stop_tracking")
 
@@ -239,8 +235,7 @@ def run_long_alignment(
 
         # Wait for all the processing to finish.
         print("Waiting for image processing to finish.")
-        for proc in procs:
-            proc.join()
+        pocs.observatory.wait_for_processing()
 
         pocs.power_down()
 
@@ -283,21 +278,15 @@ def run_quick_alignment(
     pocs.observatory.current_observation = observation
     mount = pocs.observatory.mount
 
-    procs = list()
-
     def _start_processing():
-        process_proc = Process(
-            target=pocs.observatory.process_observation,
-            kwargs=dict(
-                plate_solve=True,
-                compress_fits=False,
-                record_observations=False,
-                make_pretty_images=False,
-                upload_image=False,
-            ),
+        pocs.observatory.process_observation(
+            plate_solve=True,
+            compress_fits=False,
+            record_observations=False,
+            make_pretty_images=False,
+            upload_image=False,
+            blocking=False,
         )
-        process_proc.start()
-        procs.append(process_proc)
 
     try:
         mount.unpark()
@@ -339,8 +328,7 @@ def run_quick_alignment(
 
     # Wait for all the processing to finish.
     print("Waiting for image processing to finish.")
-    for proc in procs:
-        proc.join()
+    pocs.observatory.wait_for_processing()
 
     # Gather a list of files from the exposure_list.
     fits_files = defaultdict(dict)
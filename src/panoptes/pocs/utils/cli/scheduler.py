@@ -0,0 +1,243 @@
+"""Typer CLI helpers for the PANOPTES scheduler.
+
+Provides a command to prebuild the binary cache of a fields file so the
+scheduler doesn't have to parse the YAML at startup, a command to run the
+scheduler benchmarks, a command to simulate a night with the configured
+scheduler and a command to request a target of opportunity from a running POCS.
+"""
+
+import json
+from pathlib import Path
+
+import typer
+from astropy import units as u
+from astropy.time import Time
+from rich import print
+from rich.table import Table
+
+from panoptes.utils.config.client import get_config, set_config
+from panoptes.utils.serializers import from_yaml
+
+from panoptes.pocs.scheduler import benchmark, create_scheduler_from_config, simulator
+from panoptes.pocs.scheduler.cache import get_cache_path, read_fields_cache, write_fields_cache
+from panoptes.pocs.scheduler.observation.base import Observation
+from panoptes.pocs.scheduler.scheduler import TOO_CONFIG_KEY
+
+app = typer.Typer(no_args_is_help=True)
+
+
+@app.command(name="build-cache")
+def build_cache(
+    fields_file: Path = typer.Argument(..., help="The YAML fields file to cache."),
+    default_exptime: float | None = typer.Option(
+        None,
+        help="Exposure time in seconds for fields without one. "
+        "Defaults to the `cameras.defaults.exptime` config item or 120 seconds.",
+    ),
+    force: bool = typer.Option(False, help="Rebuild the cache even if it is up to date."),
+):
+    """Prebuild the binary cache for a fields file.
+
+    The cache is written next to the fields file and is used by the scheduler
+    as long as the fields file doesn't change.
+
+    Args:
+        fields_file: The YAML fields file to cache.
+        default_exptime: Exposure time in seconds for fields that don't specify one.
+        force: If True, rebuild the cache even if it is up to date.
+
+    Returns:
+        None
+    """
+    if not fields_file.exists():
+        print(f"[red]Fields file {fields_file} does not exist.[/red]")
+        raise typer.Exit(code=1)
+
+    if default_exptime is None:
+        default_exptime = get_config("cameras.defaults.exptime", default=120)
+
+    if not force and read_fields_cache(fields_file, default_exptime=default_exptime) is not None:
+        print(f"Cache {get_cache_path(fields_file)} is up to date.")
+        return
+
+    fields_list = from_yaml(fields_file.read_text())
+    try:
+        cache_path = write_fields_cache(fields_file, fields_list, default_exptime=default_exptime)
+    except (TypeError, ValueError) as e:
+        print(f"[red]Unable to cache {fields_file}: {e!r}[/red]")
+        raise typer.Exit(code=1)
+
+    print(f"Wrote {len(fields_list)} fields to [green]{cache_path}[/green].")
+
+
+@app.command(name="benchmark")
+def run_benchmark(
+    num_fields: list[int] = typer.Option(
+        list(benchmark.DEFAULT_NUM_FIELDS),
+        "--num-fields",
+        "-n",
+        help="Size of the synthetic fields lists, can be given multiple times.",
+    ),
+    layout: list[str] = typer.Option(
+        list(benchmark.FIELD_LAYOUTS),
+        "--layout",
+        "-l",
+        help=f"Sky coverage of the fields lists, one of {benchmark.FIELD_LAYOUTS}. "
+        "Can be given multiple times.",
+    ),
+    repeat: int = typer.Option(3, help="Number of calls per benchmark."),
+    seed: int = typer.Option(42, help="Seed for the synthetic fields lists."),
+    output: Path = typer.Option(Path("scheduler-benchmark.json"), help="The JSON file for the results."),
+):
+    """Benchmark the scheduler with synthetic fields lists.
+
+    Times reading the fields file, `get_observation` and each built-in constraint
+    at fixed times from a fixed location and writes the results as JSON. Runs
+    offline and doesn't need the config server.
+
+    Args:
+        num_fields: Sizes of the synthetic fields lists.
+        layout: Sky coverage of the fields lists, ``random`` or ``grid``.
+        repeat: Number of calls per benchmark.
+        seed: Seed for the synthetic fields lists.
+        output: The JSON file for the results.
+
+    Returns:
+        None
+    """
+    for name in layout:
+        if name not in benchmark.FIELD_LAYOUTS:
+            print(f"[red]Unknown layout {name!r}, must be one of {benchmark.FIELD_LAYOUTS}.[/red]")
+            raise typer.Exit(code=1)
+
+    results = benchmark.run_benchmarks(num_fields=num_fields, layouts=layout, repeat=repeat, seed=seed)
+    output = benchmark.write_results(results, output)
+
+    for result in results["results"]:
+        name = result["benchmark"]
+        if "constraint" in result:
+            name = f"{name} {result['constraint']}"
+        print(
+            f"{name:30s} {result['layout']:>6s} {result['num_fields']:>7d} "
+            f"{result.get('time', ''):23s} median={result['median']:.4f}s"
+        )
+
+    print(f"Wrote {len(results['results'])} results to [green]{output}[/green].")
+
+
+@app.command(name="simulate")
+def simulate(
+    time: str | None = typer.Option(
+        None, help="A time during or before the night to simulate, e.g. '2024-08-13 20:00'. Defaults to now."
+    ),
+    fields_file: Path | None = typer.Option(
+        None, help="Fields file to use instead of the configured `scheduler.fields_file`."
+    ),
+    overhead: float = typer.Option(60, help="Seconds added to each set for slewing, readout and processing."),
+    output: Path | None = typer.Option(None, help="A JSON file for the timeline."),
+):
+    """Simulate a night with the configured scheduler.
+
+    Steps the scheduler, its constraints and the fields file from the config
+    through the night on a virtual clock and prints the timeline. Exits with an
+    error if no observation was scheduled, so it can be used to check a fields
+    file before deploying it.
+
+    Args:
+        time: A time during or before the night to simulate, defaults to now.
+        fields_file: Fields file to use instead of the configured one.
+        overhead: Seconds added to each set of exposures.
+        output: A JSON file for the timeline.
+
+    Returns:
+        None
+    """
+    scheduler_config = dict(get_config("scheduler", default=dict()))
+    if fields_file is not None:
+        if not fields_file.exists():
+            print(f"[red]Fields file {fields_file} does not exist.[/red]")
+            raise typer.Exit(code=1)
+        scheduler_config["fields_file"] = str(fields_file.absolute())
+
+    scheduler = create_scheduler_from_config(config=scheduler_config)
+    if scheduler is None:
+        print("[red]No scheduler in config.[/red]")
+        raise typer.Exit(code=1)
+
+    timeline = simulator.simulate_night(
+        scheduler, time=Time(time) if time else None, overhead=overhead * u.second
+    )
+
+    table = Table(title="Simulated night")
+    table.add_column("Start (UTC)")
+    table.add_column("End (UTC)")
+    table.add_column("Observation")
+    table.add_column("Priority", justify="right")
+    table.add_column("Merit", justify="right")
+    for entry in timeline:
+        table.add_row(
+            entry.start_time.iso[:19],
+            entry.end_time.iso[:19],
+            entry.name or "[dim]idle[/dim]",
+            "" if entry.priority is None else f"{entry.priority:.1f}",
+            "" if entry.merit is None else f"{entry.merit:.2f}",
+        )
+    print(table)
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps([entry.to_dict() for entry in timeline], indent=2))
+        print(f"Wrote {len(timeline)} entries to [green]{output}[/green].")
+
+    num_sets = sum(entry.name is not None for entry in timeline)
+    if num_sets == 0:
+        print("[red]No observations were scheduled.[/red]")
+        raise typer.Exit(code=1)
+
+    print(f"Scheduled {num_sets} sets of {len({entry.name for entry in timeline} - {None})} observations.")
+
+
+@app.command(name="too")
+def target_of_opportunity(
+    name: str = typer.Argument(..., help="Name of the field."),
+    position: str = typer.Argument(..., help="Position of the field, e.g. '20h00m43.7s +22d42m39s'."),
+    priority: float | None = typer.Option(
+        None, help="Priority of the observation. Defaults to the `scheduler.too_priority` config item."
+    ),
+    exptime: float | None = typer.Option(None, help="Exposure time in seconds."),
+    min_nexp: int | None = typer.Option(None, help="Minimum number of exposures."),
+    exp_set_size: int | None = typer.Option(None, help="Number of exposures in a set."),
+):
+    """Request a target of opportunity from the running POCS.
+
+    The request is sent through the config server. POCS picks it up before the
+    next exposure, stops the current observation and schedules again.
+
+    Args:
+        name: Name of the field.
+        position: Position of the field.
+        priority: Priority of the observation.
+        exptime: Exposure time in seconds.
+        min_nexp: Minimum number of exposures.
+        exp_set_size: Number of exposures in a set.
+
+    Returns:
+        None
+    """
+    observation = {
+        key: value
+        for key, value in dict(
+            priority=priority, exptime=exptime, min_nexp=min_nexp, exp_set_size=exp_set_size
+        ).items()
+        if value is not None
+    }
+    observation_config = {"field": {"name": name, "position": position}, "observation": observation}
+
+    try:
+        Observation.from_dict(observation_config)
+    except Exception as e:
+        print(f"[red]Invalid target of opportunity: {e!r}[/red]")
+        raise typer.Exit(code=1)
+
+    set_config(TOO_CONFIG_KEY, observation_config)
+    print(f"Requested target of opportunity [green]{name}[/green].")
@@ -0,0 +1,96 @@
+"""Typer CLI for the timing records of a PANOPTES unit.
+
+Provides a report of where a night went: the open-shutter efficiency of each
+camera, the phases that contribute the most dead time and the time spent in
+each POCS state, see `panoptes.pocs.utils.timing`.
+"""
+
+from datetime import date
+from pathlib import Path
+
+import typer
+from rich import print
+from rich.table import Table
+
+from panoptes.utils.config.client import get_config
+
+from panoptes.pocs.utils.timing import TimingStore, create_timing_store_from_config, summarize_night
+
+app = typer.Typer(no_args_is_help=True)
+
+
+@app.command(name="report")
+def report(
+    night: str | None = typer.Option(
+        None, help="The night as YYYY-MM-DD (the local date of the evening), default the latest night."
+    ),
+    directory: Path | None = typer.Option(
+        None, help="Directory of the timing records. Defaults to the `timing.directory` config item."
+    ),
+    top: int = typer.Option(10, help="Number of dead-time contributors to show."),
+):
+    """Show the open-shutter efficiency and the biggest dead-time contributors of a night.
+
+    Args:
+        night: The night as YYYY-MM-DD, default the latest night with records.
+        directory: Directory of the timing records.
+        top: Number of dead-time contributors to show.
+
+    Returns:
+        None
+    """
+    if directory is not None:
+        store = TimingStore(directory, timezone=get_config("location.timezone", default="UTC"))
+    else:
+        store = create_timing_store_from_config(
+            {**(get_config("timing", default=None) or dict()), "enabled": True}
+        )
+
+    if night is None:
+        nights = store.nights()
+        if len(nights) == 0:
+            print(f"[red]No timing records in {store.directory}.[/red]")
+            raise typer.Exit(code=1)
+        night_date = nights[-1]
+    else:
+        try:
+            night_date = date.fromisoformat(night)
+        except ValueError:
+            print(f"[red]Invalid night {night!r}, must be YYYY-MM-DD.[/red]")
+            raise typer.Exit(code=1)
+
+    records = store.read(night_date)
+    if len(records) == 0:
+        print(f"[red]No timing records for {night_date} in {store.directory}.[/red]")
+        raise typer.Exit(code=1)
+
+    summary = summarize_night(records, top=top)
+    span = summary["span"]
+    print(f"Night of {night_date}: {len(records)} records over {span / 3600:.2f} hours.")
+
+    table = Table(title="Open-shutter efficiency")
+    table.add_column("Camera")
+    table.add_column("Exposure (h)", justify="right")
+    table.add_column("Efficiency", justify="right")
+    for camera, efficiency in summary["efficiency"].items():
+        table.add_row(camera, f"{summary['exposure'][camera] / 3600:.2f}", f"{efficiency:.1%}")
+    print(table)
+
+    table = Table(title="Dead-time contributors (summed over cameras)")
+    table.add_column("Phase")
+    table.add_column("Total (min)", justify="right")
+    table.add_column("Count", justify="right")
+    table.add_column("Mean (s)", justify="right")
+    table.add_column("Share of night", justify="right")
+    for phase, total, count in summary["dead_time"]:
+        share = total / span if span > 0 else 0.0
+        table.add_row(phase, f"{total / 60:.1f}", str(count), f"{total / count:.2f}", f"{share:.1%}")
+    print(table)
+
+    if summary["states"]:
+        table = Table(title="Time per state")
+        table.add_column("State")
+        table.add_column("Total (min)", justify="right")
+        for name, total in summary["states"].items():
+            table.add_row(name, f"{total / 60:.1f}")
+        print(table)
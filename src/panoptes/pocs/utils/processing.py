@@ -0,0 +1,448 @@
+"""Processing of exposures after they are taken.
+
+Processing is split into stages: plate solving, compressing (fpack), making a
+pretty image and uploading, followed by recording the results. The stages are
+functions of a `ProcessingJob`, so `process_exposure` can run them one after
+the other, and ProcessingPipeline can run them concurrently.
+
+ProcessingPipeline gives each stage its own bounded queue and long-lived
+worker threads, so a slow `solve-field` for one frame doesn't hold up
+compressing and uploading the frames behind it. The heavy lifting is done by
+external programs (``solve-field``, ``fpack``, ``dcraw``) and network calls, so
+threads are enough to overlap the stages. `submit` waits while the first queue
+is full and a worker waits while the queue of the next stage is full, so the
+back-pressure reaches the observing loop. The number of jobs in the pipeline
+is `queue_depth` and the per-stage queue sizes and latencies are `stats`.
+
+A frame that is already in the pipeline is not queued again, and the caller
+skips frames whose metadata ``status`` is ``complete``, so processing the same
+exposure twice is harmless.
+"""
+
+import queue
+import threading
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from panoptes.utils import error
+from panoptes.utils import images as img_utils
+from panoptes.utils.images import fits as fits_utils
+
+from panoptes.pocs.utils.cloud import upload_image as image_uploader
+from panoptes.pocs.utils.logger import get_logger
+from panoptes.pocs.utils.timing import record_timing, timed
+
+logger = get_logger()
+
+
+@dataclass
+class ProcessingJob:
+    """An exposure on its way through the processing stages.
+
+    Attributes:
+        metadata (dict): The exposure metadata, including the ``filepath`` of the FITS file.
+        image_path (str): The path of the image as taken, which is uploaded unless the
+            FITS file is compressed.
+        options (dict): Options for the stages, see `process_exposure`.
+        pretty_image_path (str or None): The pretty image, once made.
+        callback (callable or None): Called with the processed metadata by the ``record`` stage.
+        timings (dict): Seconds spent in each stage.
+    """
+
+    metadata: dict
+    image_path: str
+    options: dict = field(default_factory=dict)
+    pretty_image_path: str | None = None
+    callback: object = None
+    timings: dict = field(default_factory=dict)
+
+    @property
+    def image_id(self) -> str:
+        """str: The ``image_id`` of the exposure."""
+        return self.metadata["image_id"]
+
+    @property
+    def file_path(self) -> str:
+        """str: The FITS file, which is the solved file after plate solving."""
+        return self.metadata.get("solved_fits_file", self.metadata["filepath"])
+
+    def result(self) -> dict:
+        """Return the processed metadata, with ``image_path`` set to the processed image."""
+        return {**self.metadata, "image_path": str(self.image_path)}
+
+
+def solve_exposure(job: ProcessingJob):
+    """Plate solve the FITS file, merging the solve results into the metadata."""
+    file_path = job.file_path
+    logger.debug(f"Plate solving {file_path=}")
+    try:
+        solved = fits_utils.get_solve_field(file_path, timeout=job.options.get("solve_timeout", 60))
+        job.metadata.update(solved)
+        logger.debug(f"Solved {job.file_path}, replacing metadata.")
+    except Exception as e:
+        logger.warning(f"Problem solving {file_path=}: {e!r}")
+
+
+def compress_exposure(job: ProcessingJob):
+    """Compress the FITS file into .fits.fz."""
+    file_path = job.file_path
+    logger.debug(f"Compressing {file_path=!r}")
+    try:
+        compressed_file_path = fits_utils.fpack(str(file_path))
+        job.image_path = compressed_file_path
+        job.metadata["filepath"] = compressed_file_path
+        job.metadata.pop("solved_fits_file", None)
+        logger.debug(f"Compressed {compressed_file_path}")
+    except (FileNotFoundError, AssertionError) as e:
+        logger.warning(f"Problem compressing, file not found {file_path=}: {e!r}")
+
+
+def make_pretty_exposure(job: ProcessingJob):
+    """Make a pretty image, linked to the ``latest_link_path`` option for the primary camera."""
+    metadata = job.metadata
+    try:
+        image_title = f"{metadata.get('field_name', '')} [{metadata['exptime']}s] {metadata['sequence_id']}"
+
+        cr2_file_path = str(job.file_path).replace(".fits", ".cr2").replace(".fz", "")
+
+        link_path = None
+        if metadata.get("is_primary", False):
+            link_path = job.options.get("latest_link_path")
+        logger.debug(f"Making pretty image for {cr2_file_path=!r}")
+
+        job.pretty_image_path = img_utils.make_pretty_image(
+            cr2_file_path, title=image_title, link_path=link_path
+        )
+        logger.debug(f"Pretty image created: {job.pretty_image_path}")
+        logger.debug(f"Pretty image linked to {link_path}")
+    except Exception as e:  # pragma: no cover
+        logger.warning(f"Problem with extracting pretty image: {e!r}")
+
+
+def upload_exposure(job: ProcessingJob):
+    """Upload the image (and the pretty image) to the ``bucket_name`` option."""
+    metadata = job.metadata
+    bucket_name = job.options.get("bucket_name")
+    images_dir = job.options.get("images_dir", "")
+    unit_id = metadata["sequence_id"].split("_")[0]
+
+    logger.debug(f"Uploading current observation: {job.image_id}")
+    try:
+        image_path = Path(job.image_path).as_posix()
+        logger.debug(f"Preparing {image_path=} for upload to {bucket_name=}")
+
+        # Remove images directory from path so it's stored in bucket relative to images directory.
+        bucket_path = Path(image_path[image_path.find(images_dir) + len(images_dir) :])
+
+        logger.debug(f"Adding {unit_id=} to {bucket_path=}")
+        bucket_path = Path(unit_id) / bucket_path.relative_to("/")
+
+        # Upload FITS.
+        metadata["fits_public_url"] = image_uploader(
+            file_path=Path(image_path),
+            bucket_path=bucket_path.as_posix(),
+            bucket_name=bucket_name,
+        )
+        # Upload pretty image.
+        if job.pretty_image_path:
+            metadata["pretty_image_url"] = image_uploader(
+                file_path=job.pretty_image_path,
+                bucket_path=bucket_path.with_suffix(".jpg").as_posix().replace(".fits", ""),
+                bucket_name=bucket_name,
+            )
+    except Exception as e:
+        logger.warning(f"Problem uploading exposure: {e!r}")
+
+
+def record_exposure(job: ProcessingJob):
+    """Hand the processed metadata to the job's callback, e.g. to record it."""
+    if job.callback is not None:
+        job.callback(job.result())
+
+
+# The stages in order, with the option that turns each on (None for always).
+STAGES = {
+    "solve": (solve_exposure, "plate_solve"),
+    "compress": (compress_exposure, "compress_fits"),
+    "pretty": (make_pretty_exposure, "make_pretty_images"),
+    "upload": (upload_exposure, "upload_image"),
+    "record": (record_exposure, None),
+}
+
+
+def get_job_stages(options: dict) -> list[str]:
+    """Return the names of the stages that `options` turn on, in order."""
+    return [name for name, (_, option) in STAGES.items() if option is None or options.get(option, False)]
+
+
+def process_exposure(
+    metadata: dict,
+    image_path: str,
+    plate_solve: bool = False,
+    solve_timeout: float = 60,
+    compress_fits: bool = False,
+    make_pretty_images: bool = False,
+    latest_link_path: str | None = None,
+    upload_image: bool = False,
+    bucket_name: str | None = None,
+    images_dir: str = "",
+) -> dict:
+    """Process one exposure, running the stages one after the other.
+
+    Performs the following steps, each if requested:
+
+        1. Plate solves the FITS file, merging the solve results into the metadata.
+        2. Compresses the FITS file (fpack).
+        3. Makes a pretty image, linked to `latest_link_path` for the primary camera.
+        4. Uploads the image (and the pretty image) to `bucket_name`.
+
+    Args:
+        metadata (dict): The exposure metadata, including the ``filepath`` of the FITS file.
+        image_path (str): The path of the image as taken, which is uploaded unless the
+            FITS file is compressed.
+        plate_solve (bool, optional): If the image should be plate solved.
+        solve_timeout (float, optional): Timeout for `solve-field` in seconds.
+        compress_fits (bool, optional): If the FITS file should be fpacked into .fits.fz.
+        make_pretty_images (bool, optional): If a jpg should be made from the raw image.
+        latest_link_path (str, optional): Where to link the pretty image of the primary camera.
+        upload_image (bool, optional): If the image should be uploaded.
+        bucket_name (str, optional): The bucket to upload to.
+        images_dir (str, optional): The images directory, which is removed from the
+            bucket path.
+
+    Returns:
+        dict: The updated metadata, with ``image_path`` set to the path of the processed
+        image (e.g. the compressed file).
+    """
+    options = dict(
+        plate_solve=plate_solve,
+        solve_timeout=solve_timeout,
+        compress_fits=compress_fits,
+        make_pretty_images=make_pretty_images,
+        latest_link_path=latest_link_path,
+        upload_image=upload_image,
+        bucket_name=bucket_name,
+        images_dir=images_dir,
+    )
+    job = ProcessingJob(dict(metadata), image_path, options)
+    for name in get_job_stages(options):
+        with timed(f"process_{name}", image_id=job.image_id):
+            STAGES[name][0](job)
+
+    return job.result()
+
+
+class ProcessingStage:
+    """One stage of a `ProcessingPipeline`: a bounded queue and its worker threads.
+
+    Args:
+        name (str): Name of the stage, one of `STAGES`.
+        workers (int, optional): Number of worker threads, default 1.
+        max_queue_size (int, optional): Maximum number of waiting jobs, default 8.
+    """
+
+    def __init__(self, name: str, workers: int = 1, max_queue_size: int = 8):
+        if name not in STAGES:
+            raise error.InvalidConfig(f"Invalid processing stage {name!r}, must be one of {list(STAGES)}")
+
+        self.name = name
+        self.func = STAGES[name][0]
+        self.workers = max(int(workers), 1)
+        self.max_queue_size = max(int(max_queue_size), 1)
+        self.queue = queue.Queue(maxsize=self.max_queue_size)
+
+        self.processed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.total_wait = 0.0
+        self._lock = threading.Lock()
+
+    def add_timing(self, latency: float, wait: float):
+        """Record the seconds a job spent in the stage and waiting in its queue."""
+        with self._lock:
+            self.processed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self.total_wait += wait
+
+    @property
+    def stats(self) -> dict:
+        """dict: Queue size, number of processed jobs and latencies in seconds."""
+        with self._lock:
+            processed = self.processed
+            return {
+                "workers": self.workers,
+                "queued": self.queue.qsize(),
+                "processed": processed,
+                "mean_latency": self.total_latency / processed if processed else None,
+                "max_latency": self.max_latency if processed else None,
+                "mean_wait": self.total_wait / processed if processed else None,
+            }
+
+
+class ProcessingPipeline:
+    """Process exposures concurrently in stages, see the module docstring.
+
+    Args:
+        stages (dict, optional): Per-stage ``workers`` and ``max_queue_size``, keyed by
+            the names in `STAGES`. Missing items use the defaults below.
+        workers (int, optional): Default number of workers per stage, default 1.
+        max_queue_size (int, optional): Default queue size per stage, default 8.
+    """
+
+    def __init__(self, stages: dict | None = None, workers: int = 1, max_queue_size: int = 8):
+        stages = stages or dict()
+        for name in stages:
+            if name not in STAGES:
+                raise error.InvalidConfig(f"Invalid processing stage {name!r}, must be one of {list(STAGES)}")
+
+        self.stages = dict()
+        for name in STAGES:
+            config = stages.get(name) or dict()
+            self.stages[name] = ProcessingStage(
+                name,
+                workers=config.get("workers", workers),
+                max_queue_size=config.get("max_queue_size", max_queue_size),
+            )
+
+        self._in_flight = set()
+        self._done = threading.Condition()
+        self._threads = list()
+
+    @property
+    def is_running(self) -> bool:
+        """bool: If the worker threads have been started."""
+        return len(self._threads) > 0
+
+    @property
+    def queue_depth(self) -> int:
+        """int: Number of jobs in the pipeline, whatever their stage."""
+        with self._done:
+            return len(self._in_flight)
+
+    @property
+    def stats(self) -> dict:
+        """dict: The `ProcessingStage.stats` of each stage."""
+        return {name: stage.stats for name, stage in self.stages.items()}
+
+    def start(self):
+        """Start the worker threads of all stages, if they aren't running."""
+        if self.is_running:
+            return
+
+        for stage in self.stages.values():
+            for i in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(stage,), name=f"processing-{stage.name}-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+        logger.debug(f"Started processing pipeline with {len(self._threads)} workers")
+
+    def submit(self, metadata: dict, image_path: str, options: dict, callback=None, timeout=None) -> bool:
+        """Queue an exposure, waiting while the queue of its first stage is full.
+
+        Args:
+            metadata (dict): The exposure metadata, see `ProcessingJob`.
+            image_path (str): The path of the image as taken.
+            options (dict): The options of `process_exposure`, which select the stages.
+            callback (callable, optional): Called by the ``record`` stage with the
+                processed metadata (see `ProcessingJob.result`).
+            timeout (float, optional): Maximum number of seconds to wait for room in the
+                queue, defaults to waiting forever.
+
+        Returns:
+            bool: True if the exposure was queued, False if it is already in the pipeline.
+
+        Raises:
+            panoptes.utils.error.Timeout: If the queue stayed full for `timeout` seconds.
+        """
+        job = ProcessingJob(dict(metadata), image_path, dict(options), callback=callback)
+        stages = get_job_stages(options)
+
+        with self._done:
+            if job.image_id in self._in_flight:
+                logger.debug(f"{job.image_id} is already being processed, skipping")
+                return False
+            self._in_flight.add(job.image_id)
+
+        self.start()
+
+        first_stage = self.stages[stages[0]]
+        if first_stage.queue.full():
+            logger.warning(f"Processing queue of the {first_stage.name} stage is full, waiting")
+
+        try:
+            first_stage.queue.put((job, stages, time.monotonic()), timeout=timeout)
+        except queue.Full:
+            self._finish(job)
+            raise error.Timeout(f"Processing queue still full after {timeout} seconds")
+
+        return True
+
+    def _work(self, stage: ProcessingStage):
+        """Run the jobs from the queue of `stage` and pass them on to their next stage."""
+        while True:
+            item = stage.queue.get()
+            if item is None:
+                break
+
+            job, stages, queued_at = item
+            start = time.time()
+            started_at = time.monotonic()
+            try:
+                stage.func(job)
+            except Exception as e:
+                logger.warning(f"Problem in processing stage {stage.name} for {job.image_id}: {e!r}")
+            finished_at = time.monotonic()
+
+            job.timings[stage.name] = finished_at - started_at
+            stage.add_timing(finished_at - started_at, started_at - queued_at)
+            record_timing(f"process_{stage.name}", start, finished_at - started_at, image_id=job.image_id)
+
+            remaining = stages[stages.index(stage.name) + 1 :]
+            if remaining:
+                # Waits while the next stage is full, which holds up this stage in turn.
+                self.stages[remaining[0]].queue.put((job, remaining, finished_at))
+            else:
+                logger.debug(f"Processed {job.image_id}: {job.timings}")
+                self._finish(job)
+
+    def _finish(self, job: ProcessingJob):
+        with self._done:
+            self._in_flight.discard(job.image_id)
+            self._done.notify_all()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait for the jobs in the pipeline to finish.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait.
+
+        Returns:
+            bool: True if all jobs finished.
+        """
+        with self._done:
+            return self._done.wait_for(lambda: len(self._in_flight) == 0, timeout=timeout)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads, by default after the queued jobs are done."""
+        if not self.is_running:
+            return
+
+        if wait:
+            self.join()
+
+        for stage in self.stages.values():
+            for _ in range(stage.workers):
+                with suppress(queue.Full):
+                    stage.queue.put(None, block=wait)
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+        self._threads = list()
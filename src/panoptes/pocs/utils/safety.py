@@ -0,0 +1,214 @@
+"""Background evaluation of the safety checks.
+
+`POCS.is_safe` is called on every transition, before every exposure and while
+waiting for the horizon. Reading the weather and power records and the free disk
+space each time is wasted work when the readings only change every few seconds
+or minutes, so a SafetyMonitor evaluates each check on a thread at its own
+interval and keeps a snapshot of the latest values. Reading the snapshot is a
+dictionary copy under a lock.
+
+Subscribers are called from the monitor thread as soon as a check changes value,
+e.g. when the weather becomes unsafe, instead of at the next time someone asks.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from panoptes.utils import error
+
+from panoptes.pocs.utils.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class SafetyCheck:
+    """A safety check and its latest reading.
+
+    Attributes:
+        name (str): Name of the check, e.g. ``good_weather``.
+        func (callable): Function returning True if safe.
+        interval (float): Seconds between evaluations.
+        value (bool or None): Latest reading, None before the first evaluation.
+        checked_at (float or None): `time.monotonic` of the latest reading.
+    """
+
+    name: str
+    func: Callable[[], bool]
+    interval: float
+    value: bool | None = None
+    checked_at: float | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def age(self) -> float | None:
+        """Seconds since the latest reading."""
+        return None if self.checked_at is None else time.monotonic() - self.checked_at
+
+    @property
+    def is_due(self) -> bool:
+        return self.checked_at is None or self.age >= self.interval
+
+
+class SafetyMonitor:
+    """Evaluate safety checks in the background and keep the latest readings.
+
+    Args:
+        checks (dict, optional): Checks by name as ``(func, interval)`` tuples, see `add_check`.
+        stale_factor (float, optional): The readings are stale if a check is older than
+            this many times its interval, e.g. because a check hangs, default 3.
+    """
+
+    def __init__(self, checks: dict | None = None, stale_factor: float = 3.0):
+        self.stale_factor = stale_factor
+
+        self._checks: dict[str, SafetyCheck] = dict()
+        self._subscribers: list[Callable] = list()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        for name, (func, interval) in (checks or dict()).items():
+            self.add_check(name, func, interval)
+
+    def add_check(self, name: str, func: Callable[[], bool], interval: float):
+        """Add a check.
+
+        Args:
+            name (str): Name of the check, used as the key of the snapshot.
+            func (callable): Function without arguments that returns True if safe.
+                Exceptions are logged and count as unsafe.
+            interval (float): Seconds between evaluations.
+
+        Raises:
+            panoptes.utils.error.InvalidConfig: If the interval isn't positive.
+        """
+        if interval is None or interval <= 0:
+            raise error.InvalidConfig(f"Interval of safety check {name} must be positive, got {interval}")
+
+        with self._lock:
+            self._checks[name] = SafetyCheck(name=name, func=func, interval=float(interval))
+
+    @property
+    def checks(self) -> dict[str, SafetyCheck]:
+        return self._checks
+
+    def subscribe(self, callback: Callable[[str, bool], None]):
+        """Call ``callback(name, value)`` whenever a check changes value.
+
+        The callback is called from the thread that evaluated the check, also for
+        the first reading of each check. Exceptions are logged and ignored.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[str, bool], None]):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    @property
+    def snapshot(self) -> dict[str, bool | None]:
+        """The latest value of each check, None if not evaluated yet."""
+        with self._lock:
+            return {name: check.value for name, check in self._checks.items()}
+
+    @property
+    def is_stale(self) -> bool:
+        """True if any check is missing or older than `stale_factor` times its interval."""
+        with self._lock:
+            checks = list(self._checks.values())
+
+        return any(check.age is None or check.age > check.interval * self.stale_factor for check in checks)
+
+    def is_safe(self, ignore: Iterable[str] | None = None) -> bool:
+        """True if all the checks that aren't ignored were safe at their latest reading."""
+        ignore = set(ignore or list())
+        return all(value is True for name, value in self.snapshot.items() if name not in ignore)
+
+    def check(self, names: Iterable[str] | None = None) -> dict[str, bool | None]:
+        """Evaluate checks now, regardless of their interval.
+
+        Args:
+            names (list[str], optional): The checks to evaluate, default all.
+
+        Returns:
+            dict: The snapshot after the evaluation.
+        """
+        with self._lock:
+            checks = [check for name, check in self._checks.items() if names is None or name in names]
+
+        for check in checks:
+            self._evaluate(check)
+
+        return self.snapshot
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Evaluate all the checks once and start the monitor thread."""
+        if self.is_running:
+            return
+
+        self.check()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SafetyMonitor", daemon=True)
+        self._thread.start()
+        logger.debug(f"Safety monitor started with {list(self._checks)}")
+
+    def stop(self, timeout: float | None = None):
+        """Stop the monitor thread, waiting up to `timeout` seconds for a running check."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            with self._lock:
+                checks = list(self._checks.values())
+
+            for check in checks:
+                if self._stop_event.is_set():
+                    return
+                if check.is_due:
+                    self._evaluate(check)
+
+            # Sleep until the next check is due.
+            next_due = min(
+                (max(check.interval - (check.age or 0.0), 0.0) for check in checks),
+                default=1.0,
+            )
+            self._stop_event.wait(max(next_due, 0.05))
+
+    def _evaluate(self, check: SafetyCheck):
+        # A check is evaluated by one thread at a time, the others use its latest value.
+        if not check.lock.acquire(blocking=False):
+            return
+
+        try:
+            try:
+                value = bool(check.func())
+            except Exception as e:
+                logger.warning(f"Safety check {check.name} failed, marking unsafe: {e!r}")
+                value = False
+
+            with self._lock:
+                changed = value != check.value
+                check.value = value
+                check.checked_at = time.monotonic()
+                subscribers = list(self._subscribers)
+        finally:
+            check.lock.release()
+
+        if changed:
+            logger.debug(f"Safety check {check.name} is now {value}")
+            for callback in subscribers:
+                try:
+                    callback(check.name, value)
+                except Exception as e:
+                    logger.warning(f"Problem notifying {callback} of {check.name}={value}: {e!r}")
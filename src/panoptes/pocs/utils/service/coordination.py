@@ -0,0 +1,111 @@
+"""FastAPI service that coordinates the schedulers of the units at a site.
+
+Units claim the field they are observing with a lease and ask for the claims of
+the other units, see `panoptes.pocs.scheduler.coordination`. The claims are
+kept in memory by a `LocalCoordinator`, so restarting the service clears them;
+the units renew their claims on the next scheduling pass.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Annotated
+
+from fastapi import Depends, FastAPI, Request
+from pydantic import BaseModel
+
+from panoptes.pocs.scheduler.coordination import DEFAULT_LEASE_TIME, LocalCoordinator
+
+
+class ClaimRequest(BaseModel):
+    """Payload for claiming a field.
+
+    Attributes:
+        field_name (str): Name of the field.
+        unit_id (str): The unit making the claim.
+        lease_time (float): Length of the lease in seconds.
+    """
+
+    field_name: str
+    unit_id: str
+    lease_time: float = DEFAULT_LEASE_TIME
+
+
+class ReleaseRequest(BaseModel):
+    """Payload for releasing a field.
+
+    Attributes:
+        field_name (str): Name of the field.
+        unit_id (str): The unit holding the claim.
+    """
+
+    field_name: str
+    unit_id: str
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Context manager for the FastAPI application's lifespan.
+
+    Creates the in-memory coordinator that holds the claims.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    Yields:
+        None: Control to FastAPI while the app is running.
+    """
+    app.state.coordinator = LocalCoordinator()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def get_coordinator(request: Request) -> LocalCoordinator:
+    """Dependency that retrieves the coordinator from application state.
+
+    Args:
+        request (Request): The incoming FastAPI request.
+
+    Returns:
+        LocalCoordinator: The coordinator.
+    """
+    return request.app.state.coordinator
+
+
+CoordinatorDep = Annotated[LocalCoordinator, Depends(get_coordinator)]
+
+
+@app.get("/claims")
+def claims(coordinator: CoordinatorDep):
+    """Return the current claims."""
+    return [claim.to_dict() for claim in coordinator.get_claims()]
+
+
+@app.post("/claim")
+def claim(claim_request: ClaimRequest, coordinator: CoordinatorDep):
+    """Claim a field, or renew the claim.
+
+    Args:
+        claim_request (ClaimRequest): The field, unit and lease time.
+        coordinator (CoordinatorDep): The coordinator.
+
+    Returns:
+        dict: ``granted`` is False if another unit holds the field.
+    """
+    granted = coordinator.claim(claim_request.field_name, claim_request.unit_id, claim_request.lease_time)
+    return {"granted": granted}
+
+
+@app.post("/release")
+def release(release_request: ReleaseRequest, coordinator: CoordinatorDep):
+    """Release a field.
+
+    Args:
+        release_request (ReleaseRequest): The field and unit.
+        coordinator (CoordinatorDep): The coordinator.
+
+    Returns:
+        dict: ``released`` is True if the unit held the field.
+    """
+    released = coordinator.release(release_request.field_name, release_request.unit_id)
+    return {"released": released}
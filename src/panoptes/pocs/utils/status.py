@@ -0,0 +1,113 @@
+"""Cached sections of a status dictionary.
+
+Building the observatory status queries the mount over serial and computes
+hour angles and Moon positions, while it is asked for on every state change,
+every exposure and every safety check. A StatusCache keeps the latest value of
+each section and only refreshes a section when its time to live (TTL) has
+expired, when its key changes or when a fresh read is forced. The key is
+something cheap that changes with the section, e.g. the current observation,
+so the status follows changes right away without waiting for the TTL.
+
+Some fields follow the clock, e.g. the time and the hour angles, and change on
+every refresh. They are left out with `without_clock_fields` when checking if
+the status changed.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+# Status fields that change with the time alone, by name in any section.
+CLOCK_FIELDS = frozenset(
+    {
+        "utctime",
+        "siderealtime",
+        "local_sun_position",
+        "local_moon_alt",
+        "local_moon_illumination",
+        "local_moon_phase",
+        "current_ha",
+        "mount_target_ha",
+        "field_ha",
+    }
+)
+
+
+def is_equal(a, b) -> bool:
+    """Compare two status values, False if they can't be compared."""
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+def without_clock_fields(status):
+    """Return a copy of a status with the `CLOCK_FIELDS` removed from every section."""
+    if isinstance(status, dict):
+        return {k: without_clock_fields(v) for k, v in status.items() if k not in CLOCK_FIELDS}
+
+    return status
+
+
+@dataclass
+class StatusSection:
+    """The cached value of a status section.
+
+    Attributes:
+        value: The latest value of the section.
+        key: The key the value was computed for.
+        updated_at (float): `time.monotonic` of the latest refresh.
+    """
+
+    value: Any
+    key: Hashable
+    updated_at: float
+
+
+class StatusCache:
+    """Status sections that are refreshed when their TTL expires or their key changes.
+
+    Args:
+        ttls (dict, optional): Seconds each section is reused, by section name.
+        default_ttl (float, optional): TTL of sections that aren't in `ttls`, default
+            zero, i.e. the section is refreshed on every read.
+    """
+
+    def __init__(self, ttls: dict[str, float] | None = None, default_ttl: float = 0.0):
+        self.ttls = dict(ttls or dict())
+        self.default_ttl = default_ttl
+        self._sections: dict[str, StatusSection] = dict()
+        self._lock = threading.Lock()
+
+    def get_ttl(self, name: str) -> float:
+        return self.ttls.get(name, self.default_ttl)
+
+    def get(self, name: str, func: Callable[[], Any], key: Hashable = None, force: bool = False):
+        """Return the value of a section, refreshing it with `func` if needed.
+
+        Args:
+            name (str): Name of the section.
+            func (callable): Computes the section, called without arguments.
+            key (hashable, optional): The section is refreshed when this changes.
+            force (bool, optional): Refresh the section regardless of the TTL, default False.
+
+        Returns:
+            The value of the section.
+        """
+        now = time.monotonic()
+        with self._lock:
+            section = self._sections.get(name)
+
+        if (
+            force
+            or section is None
+            or not is_equal(section.key, key)
+            or now - section.updated_at >= self.get_ttl(name)
+        ):
+            section = StatusSection(value=func(), key=key, updated_at=now)
+            with self._lock:
+                self._sections[name] = section
+
+        return section.value
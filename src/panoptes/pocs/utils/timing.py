@@ -0,0 +1,277 @@
+"""Timeline of where the night goes.
+
+The hardware and the observing loop record how long each phase of an exposure
+takes: slewing, filter moves, the open shutter, readout, writing the FITS file,
+updating the headers and the processing stages, plus the time spent in each
+POCS state. Durations are measured with `time.monotonic`, the start times are
+Unix times so the records can be grouped by night.
+
+The records are appended as compact JSON lines to one file per night in the
+`timing.directory` (relative to `directories.base`), see TimingStore. Recording
+is turned on with `timing.enabled`. Phases can nest: ``fits_write`` is part of
+``readout``, and ``observation`` covers the exposure and readout of all cameras.
+
+`summarize_night` turns the records of a night into the open-shutter efficiency
+of each camera and the biggest contributors to dead time, which is what
+``pocs timing report`` shows. The dead time is summed over the cameras, so the
+readouts of cameras that read out at the same time all count.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from panoptes.utils.config.client import get_config
+
+from panoptes.pocs.utils.logger import get_logger
+
+logger = get_logger()
+
+# The phase of the open shutter, which isn't dead time.
+EXPOSURE_PHASE = "exposure"
+# The phase of the time spent in a POCS state, which overlaps all the others.
+STATE_PHASE = "state"
+# Phases that include other phases and are left out of the dead-time contributors.
+ENCLOSING_PHASES = {EXPOSURE_PHASE, STATE_PHASE, "observation"}
+# Phases that run inside another phase of the same camera, by the phase they are part of.
+NESTED_PHASES = {"fits_write": "readout"}
+# Seconds of rounding allowed when checking if a record is inside another one.
+_NESTING_TOLERANCE = 0.002
+
+
+class TimingStore:
+    """Append-only store of timing records, one JSON lines file per night.
+
+    Args:
+        directory (str or Path): Directory of the night files.
+        timezone (str, optional): Time zone of the site, used to assign records to the
+            night that started on the local date, default UTC.
+    """
+
+    def __init__(self, directory, timezone: str = "UTC"):
+        self.directory = Path(directory)
+        self.timezone = ZoneInfo(timezone)
+        self._lock = threading.Lock()
+
+    def get_night(self, start: float) -> date:
+        """Return the night of a Unix time, the local date of the preceding noon."""
+        return (datetime.fromtimestamp(start, tz=self.timezone) - timedelta(hours=12)).date()
+
+    def get_path(self, night: date) -> Path:
+        """Return the file of a night."""
+        return self.directory / f"{night.isoformat()}.jsonl"
+
+    def record(self, phase: str, start: float, duration: float, **tags):
+        """Append a record.
+
+        Args:
+            phase (str): What the time was spent on, e.g. ``slew`` or ``readout``.
+            start (float): Unix time of the start.
+            duration (float): Duration in seconds.
+            **tags: Context such as the ``camera``, ``image_id`` or state ``name``.
+                Items that are None are left out.
+        """
+        record = {"phase": phase, "start": round(start, 3), "duration": round(duration, 4)}
+        record.update({key: value for key, value in tags.items() if value is not None})
+        line = json.dumps(record, separators=(",", ":"), default=str)
+
+        path = self.get_path(self.get_night(start))
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a") as f:
+                f.write(line + "\n")
+
+    def read(self, night: date) -> list[dict]:
+        """Return the records of a night, skipping lines that can't be parsed."""
+        path = self.get_path(night)
+        if not path.exists():
+            return list()
+
+        records = list()
+        with path.open() as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping bad timing record in {path}: {line!r}")
+
+        return records
+
+    def nights(self) -> list[date]:
+        """Return the nights that have records, oldest first."""
+        return sorted(date.fromisoformat(path.stem) for path in self.directory.glob("*.jsonl"))
+
+
+_store = None
+_store_loaded = False
+_store_lock = threading.Lock()
+
+
+def create_timing_store_from_config(config: dict | None = None) -> TimingStore | None:
+    """Create the store from the `timing` config items.
+
+    Args:
+        config (dict, optional): The timing config, with ``enabled`` and the ``directory``
+            (relative to `directories.base`). Defaults to the config items.
+
+    Returns:
+        TimingStore or None: The store, or None if timing isn't enabled.
+    """
+    config = config or get_config("timing", default=None) or dict()
+    if not config.get("enabled", False):
+        return None
+
+    directory = Path(config.get("directory", "timings"))
+    if not directory.is_absolute():
+        directory = Path(get_config("directories.base", default=".")) / directory
+
+    return TimingStore(directory, timezone=get_config("location.timezone", default="UTC"))
+
+
+def get_timing_store() -> TimingStore | None:
+    """Return the store of this process, created from the config on first use."""
+    global _store, _store_loaded
+    with _store_lock:
+        if not _store_loaded:
+            try:
+                _store = create_timing_store_from_config()
+            except Exception as e:
+                logger.warning(f"Can't set up the timing store, not recording timings: {e!r}")
+                _store = None
+            _store_loaded = True
+
+    return _store
+
+
+def set_timing_store(store: TimingStore | None):
+    """Use `store` for the timings of this process, None to stop recording."""
+    global _store, _store_loaded
+    with _store_lock:
+        _store = store
+        _store_loaded = True
+
+
+def record_timing(phase: str, start: float, duration: float, **tags):
+    """Record a phase in the store of this process, if timing is enabled.
+
+    Errors are logged and otherwise ignored so timing never gets in the way of observing.
+    """
+    store = get_timing_store()
+    if store is None:
+        return
+
+    try:
+        store.record(phase, start, duration, **tags)
+    except Exception as e:
+        logger.warning(f"Problem recording timing of {phase}: {e!r}")
+
+
+@contextmanager
+def timed(phase: str, **tags):
+    """Context manager that records the time spent in the block, see `record_timing`."""
+    start = time.time()
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        record_timing(phase, start, time.monotonic() - started, **tags)
+
+
+def record_when_set(event: threading.Event, phase: str, timeout: float | None = None, **tags):
+    """Record the time from now until `event` is set, without blocking the caller.
+
+    Used for moves that finish in the background, e.g. the filter wheel.
+    """
+    if get_timing_store() is None:
+        return
+
+    start = time.time()
+    started = time.monotonic()
+
+    def _wait():
+        if event.wait(timeout=timeout):
+            record_timing(phase, start, time.monotonic() - started, **tags)
+
+    threading.Thread(target=_wait, name=f"Timing-{phase}", daemon=True).start()
+
+
+def summarize_night(records: list[dict], top: int = 10) -> dict:
+    """Summarize the records of a night.
+
+    The dead-time totals are summed over the cameras, e.g. two cameras that read
+    out at the same time for 10 seconds add 20 seconds of ``readout``. A phase
+    in `NESTED_PHASES` is taken out of the record of the same camera it ran in,
+    so ``readout`` doesn't include the ``fits_write`` that is listed on its own.
+
+    Args:
+        records (list[dict]): The records, see `TimingStore.read`.
+        top (int, optional): Number of dead-time contributors to return, default 10.
+
+    Returns:
+        dict: With the ``span`` from the first start to the last end in seconds,
+        the open-shutter ``efficiency`` (exposure time over span) and ``exposure``
+        time of each camera, the ``dead_time`` contributors as a list of
+        ``(phase, total seconds, count)`` sorted by total time, and the total
+        ``states`` time by state name.
+    """
+    if len(records) == 0:
+        return {"span": 0.0, "efficiency": {}, "exposure": {}, "dead_time": [], "states": {}}
+
+    first_start = min(record["start"] for record in records)
+    last_end = max(record["start"] + record["duration"] for record in records)
+    span = last_end - first_start
+
+    exposure = defaultdict(float)
+    dead_time = defaultdict(lambda: [0.0, 0])
+    states = defaultdict(float)
+    for record in records:
+        phase = record["phase"]
+        if phase == EXPOSURE_PHASE:
+            exposure[record.get("camera", "unknown")] += record["duration"]
+        elif phase == STATE_PHASE:
+            states[record.get("name", "unknown")] += record["duration"]
+        elif phase not in ENCLOSING_PHASES:
+            dead_time[phase][0] += record["duration"]
+            dead_time[phase][1] += 1
+
+    # Take nested phases out of the record they ran in, so they aren't counted twice.
+    parents = defaultdict(list)
+    for record in sorted(records, key=lambda item: item["start"]):
+        if record["phase"] in NESTED_PHASES.values():
+            parents[(record["phase"], record.get("camera"))].append(record)
+    parent_starts = {key: [record["start"] for record in items] for key, items in parents.items()}
+
+    for record in records:
+        parent_phase = NESTED_PHASES.get(record["phase"])
+        if parent_phase is None:
+            continue
+
+        key = (parent_phase, record.get("camera"))
+        # The latest record of the same camera that started before the nested one.
+        i = bisect_right(parent_starts.get(key, []), record["start"] + _NESTING_TOLERANCE)
+        if i > 0:
+            parent = parents[key][i - 1]
+            end = record["start"] + record["duration"]
+            if end <= parent["start"] + parent["duration"] + _NESTING_TOLERANCE:
+                dead_time[parent_phase][0] -= record["duration"]
+
+    efficiency = {camera: seconds / span if span > 0 else 0.0 for camera, seconds in exposure.items()}
+    contributors = sorted(
+        ((phase, total, count) for phase, (total, count) in dead_time.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+    return {
+        "span": span,
+        "efficiency": dict(sorted(efficiency.items())),
+        "exposure": dict(sorted(exposure.items())),
+        "dead_time": contributors[:top],
+        "states": dict(sorted(states.items(), key=lambda item: item[1], reverse=True)),
+    }
@@ -1,7 +1,12 @@
+import json
+from unittest.mock import patch
+
 import pytest
+import yaml
 from astroplan import Observer
 from astropy import units as u
-from astropy.coordinates import EarthLocation
+from astropy.coordinates import EarthLocation, SkyCoord
+from astropy.time import Time
 
 from panoptes.utils import error
 from panoptes.utils.config.client import get_config, set_config
@@ -266,3 +271,90 @@ def test_new_field_custom_type_bad(scheduler):
 
     with pytest.raises(error.InvalidObservation):
         scheduler.add_observation(obs_config)
+
+
+def write_fields_file(path, fields):
+    # Round trip through json to drop the ruamel types.
+    path.write_text(yaml.safe_dump(json.loads(json.dumps(fields))))
+
+
+def test_reread_unchanged_file_keeps_observations(observer, constraints, tmp_path, fields_list):
+    fields_file = tmp_path / "fields.yaml"
+    write_fields_file(fields_file, fields_list)
+
+    scheduler = Scheduler(observer, fields_file=str(fields_file), constraints=constraints)
+    observations = dict(scheduler.observations)
+    observations["HD 189733"].merit = 42.0
+    observations["HD 189733"].exposure_list["Cam00"] = ["exp0", "exp1", "exp2"]
+
+    scheduler.read_field_list()
+    assert all(scheduler.observations[name] is obs for name, obs in observations.items())
+
+    # Touching the file without changing the contents doesn't reload.
+    write_fields_file(fields_file, fields_list)
+    scheduler.read_field_list()
+    assert all(scheduler.observations[name] is obs for name, obs in observations.items())
+    assert scheduler.observations["HD 189733"].merit == 42.0
+    assert scheduler.observations["HD 189733"].current_exp_num == 3
+
+
+def test_reread_unchanged_file_skips_update(observer, constraints, tmp_path, fields_list):
+    fields_file = tmp_path / "fields.yaml"
+    write_fields_file(fields_file, fields_list)
+
+    scheduler = Scheduler(observer, fields_file=str(fields_file), constraints=constraints)
+    with patch.object(scheduler, "_update_observations", wraps=scheduler._update_observations) as update:
+        scheduler.read_field_list()
+        write_fields_file(fields_file, fields_list)
+        scheduler.read_field_list()
+        assert update.call_count == 0
+
+        write_fields_file(fields_file, fields_list[:-1])
+        scheduler.read_field_list()
+        assert update.call_count == 1
+
+
+def test_reread_changed_file_applies_diff(observer, constraints, tmp_path, fields_list):
+    fields_file = tmp_path / "fields.yaml"
+    write_fields_file(fields_file, fields_list)
+
+    scheduler = Scheduler(observer, fields_file=str(fields_file), constraints=constraints)
+    observations = dict(scheduler.observations)
+
+    new_fields = [dict(config) for config in fields_list if config["field"]["name"] != "Wasp 33"]
+    new_fields[1] = {"field": new_fields[1]["field"], "observation": {"priority": 500}}
+    new_fields.append({"field": {"name": "Kepler 1100", "position": "19h27m29.10s +44d05m15.00s"}})
+    write_fields_file(fields_file, new_fields)
+
+    scheduler.read_field_list()
+
+    modified_name = new_fields[1]["field"]["name"]
+    assert "Wasp 33" not in scheduler.observations
+    assert "Kepler 1100" in scheduler.observations
+    assert scheduler.observations[modified_name] is not observations[modified_name]
+    assert scheduler.observations[modified_name].priority == 500
+    assert scheduler.observations["HD 189733"] is observations["HD 189733"]
+
+    # Observations added directly aren't touched by a reread.
+    scheduler.add_observation({"field": {"name": "Manual", "position": "05h35m17.2992s -05d23m27.996s"}})
+    write_fields_file(fields_file, fields_list)
+    scheduler.read_field_list()
+    assert "Manual" in scheduler.observations
+    assert "Wasp 33" in scheduler.observations
+    assert "Kepler 1100" not in scheduler.observations
+
+
+def test_mount_coords(scheduler):
+    time = Time("2016-08-13 10:00:00")
+
+    # Parked at home until something is observed.
+    assert scheduler.get_mount_coords() is None
+
+    scheduler.current_observation = scheduler.observations["HD 189733"]
+    assert scheduler.get_mount_coords() == scheduler.observations["HD 189733"].field.coord
+
+    coords = SkyCoord("02h26m51.0582s +37d33m01.733s")
+    scheduler.mount_coords = coords
+    scheduler.set_common_properties(time)
+    assert scheduler.common_properties["mount_coords"] is coords
+    assert scheduler.common_properties["slew_model"] is None
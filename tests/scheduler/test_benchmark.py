@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pytest
+from astropy.coordinates import SkyCoord
+
+from panoptes.utils.serializers import from_yaml
+
+from panoptes.pocs.scheduler import benchmark
+
+
+@pytest.mark.parametrize("layout", benchmark.FIELD_LAYOUTS)
+def test_make_fields_list(layout):
+    fields_list = benchmark.make_fields_list(500, layout=layout)
+    assert len(fields_list) == 500
+    assert len({config["field"]["name"] for config in fields_list}) == 500
+
+    coords = SkyCoord([config["field"]["position"] for config in fields_list])
+    assert np.all(np.abs(coords.dec.degree) <= 90)
+
+    # Both layouts cover the whole sky, about evenly split between the hemispheres.
+    assert 200 < np.count_nonzero(coords.dec.degree > 0) < 300
+
+    # Same seed, same fields.
+    assert benchmark.make_fields_list(500, layout=layout) == fields_list
+
+
+def test_make_fields_list_bad_layout():
+    with pytest.raises(ValueError):
+        benchmark.make_fields_list(10, layout="spiral")
+
+
+def test_write_fields_file(tmp_path):
+    fields_list = benchmark.make_fields_list(10)
+    fields_file = benchmark.write_fields_file(tmp_path / "fields.yaml", fields_list)
+    assert from_yaml(fields_file.read_text()) == fields_list
+
+
+def test_run_benchmarks(tmp_path):
+    times = benchmark.DEFAULT_TIMES[:1]
+    results = benchmark.run_benchmarks(num_fields=[20], layouts=["grid"], times=times, repeat=2)
+
+    assert results["metadata"]["version"] == benchmark.RESULTS_VERSION
+    assert results["metadata"]["repeat"] == 2
+
+    records = results["results"]
+    names = [record["benchmark"] for record in records]
+    assert names.count("read_field_list") == 1
+    assert names.count("get_observation") == 1
+    assert {record["constraint"] for record in records if record["benchmark"] == "constraint"} == {
+        "Altitude",
+        "Duration",
+        "MoonAvoidance",
+        "AlreadyVisited",
+        "TimeWindow",
+    }
+
+    for record in records:
+        assert record["num_fields"] == 20
+        assert record["layout"] == "grid"
+        assert record["repeat"] == 2
+        assert 0 <= record["min"] <= record["median"] <= record["max"]
+
+    output_file = benchmark.write_results(results, tmp_path / "results" / "benchmark.json")
+    assert json.loads(output_file.read_text()) == results
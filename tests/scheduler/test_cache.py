@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from astroplan import Observer
+from astropy.coordinates import EarthLocation
+
+from panoptes.utils.config.client import get_config
+from panoptes.utils.serializers import from_yaml
+
+from panoptes.pocs.scheduler.cache import get_cache_path, read_fields_cache, write_fields_cache
+from panoptes.pocs.scheduler.dispatch import Scheduler
+
+FIELDS_YAML = """
+-
+  field:
+    name: HD 189733
+    position: 20h00m43.7135s +22d42m39.0645s
+  observation:
+    priority: 100
+-
+  field:
+    name: HD 209458
+    position: 22h03m10.7721s +18d53m03.543s
+  observation:
+    priority: 100
+    exptime: 1/2
+-
+  field:
+    name: Kepler 1100
+    position: 19h27m29.10s +44d05m15.00s
+  observation:
+    constraints:
+      - name: panoptes.pocs.scheduler.constraint.Altitude
+"""
+
+
+@pytest.fixture(scope="module")
+def observer():
+    loc = get_config("location")
+    location = EarthLocation(lon=loc["longitude"], lat=loc["latitude"], height=loc["elevation"])
+    return Observer(location=location, name="Test Observer", timezone=loc["timezone"])
+
+
+@pytest.fixture
+def fields_file(tmp_path):
+    fields_file = tmp_path / "fields.yaml"
+    fields_file.write_text(FIELDS_YAML)
+    return fields_file
+
+
+def test_cache_round_trip(fields_file):
+    fields_list = from_yaml(fields_file.read_text())
+    cache_path = write_fields_cache(fields_file, fields_list)
+    assert cache_path == get_cache_path(fields_file)
+    assert cache_path.name == "fields.yaml.cache.npz"
+
+    cached_list, catalog = read_fields_cache(fields_file)
+    assert cached_list == fields_list
+    assert catalog.names == ["HD 189733", "HD 209458"]
+    assert catalog.get_config("HD 209458") == fields_list[1]
+    assert np.isclose(catalog.data["exptime"][1], 0.5)
+
+
+def test_cache_missing_or_stale(fields_file):
+    assert read_fields_cache(fields_file) is None
+
+    write_fields_cache(fields_file, from_yaml(fields_file.read_text()))
+    assert read_fields_cache(fields_file) is not None
+
+    fields_file.write_text(FIELDS_YAML.replace("priority: 100", "priority: 50"))
+    assert read_fields_cache(fields_file) is None
+
+
+def test_cache_default_exptime(fields_file):
+    write_fields_cache(fields_file, from_yaml(fields_file.read_text()), default_exptime=120)
+
+    fields_list, catalog = read_fields_cache(fields_file, default_exptime=60)
+    assert len(fields_list) == 3
+    assert catalog is None
+
+
+def test_cache_bad_file(fields_file):
+    get_cache_path(fields_file).write_bytes(b"not a cache")
+    assert read_fields_cache(fields_file) is None
+
+
+def test_scheduler_reads_cache(observer, fields_file):
+    write_fields_cache(fields_file, from_yaml(fields_file.read_text()))
+
+    cached = Scheduler(observer, fields_file=str(fields_file), catalog_threshold=1)
+    assert cached.catalog.names == ["HD 189733", "HD 209458"]
+    assert list(cached.observations.keys()) == ["Kepler 1100"]
+
+    get_cache_path(fields_file).unlink()
+    parsed = Scheduler(observer, fields_file=str(fields_file), catalog_threshold=1)
+    assert (parsed.catalog.data == cached.catalog.data).all()
+    assert list(parsed.targets.keys()) == list(cached.targets.keys())
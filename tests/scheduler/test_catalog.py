@@ -0,0 +1,167 @@
+import pickle
+
+import numpy as np
+import pytest
+from astroplan import Observer
+from astropy import units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+from panoptes.utils.config.client import get_config
+
+from panoptes.pocs.scheduler.catalog import CatalogEntry, FieldCatalog
+from panoptes.pocs.scheduler.constraint import Altitude, Duration, MoonAvoidance
+from panoptes.pocs.scheduler.dispatch import Scheduler
+from panoptes.pocs.scheduler.observation.base import Observation
+
+
+@pytest.fixture(scope="module")
+def observer():
+    loc = get_config("location")
+    location = EarthLocation(lon=loc["longitude"], lat=loc["latitude"], height=loc["elevation"])
+    return Observer(location=location, name="Test Observer", timezone=loc["timezone"])
+
+
+@pytest.fixture(scope="module")
+def constraints():
+    return [Altitude(), MoonAvoidance(), Duration(30 * u.deg)]
+
+
+@pytest.fixture(scope="function")
+def field_list():
+    return [
+        {"field": {"name": "HD 189733", "position": "20h00m43.7135s +22d42m39.0645s"}},
+        {
+            "field": {"name": "HD 209458", "position": "22h03m10.7721s +18d53m03.543s"},
+            "observation": {"priority": 50, "exptime": "1/2"},
+        },
+        {
+            "field": {"name": "Tres 3", "position": "17h52m07.02s +37d32m46.2012s"},
+            "observation": {"priority": 100, "exp_set_size": 15, "min_nexp": 240},
+        },
+        {"field": {"name": "Wasp 33", "position": "02h26m51.0582s +37d33m01.733s"}},
+        {
+            "field": {"name": "M42", "position": "05h35m17.2992s -05d23m27.996s"},
+            "observation": {"exptime": 240},
+        },
+    ]
+
+
+def test_from_configs(field_list):
+    catalog = FieldCatalog.from_configs(field_list, default_exptime=120)
+
+    assert len(catalog) == len(field_list)
+    assert catalog.names == [config["field"]["name"] for config in field_list]
+    assert "Tres 3" in catalog
+    assert catalog.data["exptime"][1] == 0.5
+    assert catalog.data["priority"][1] == 50
+    assert catalog.coords.shape == (len(field_list),)
+
+
+def test_entries_match_observations(field_list):
+    catalog = FieldCatalog.from_configs(field_list, default_exptime=120)
+
+    for entry, config in zip(catalog.entries, field_list):
+        obs = Observation.from_dict(config)
+        assert isinstance(entry, CatalogEntry)
+        assert entry.name == obs.name
+        assert entry.priority == obs.priority
+        assert entry.minimum_duration == obs.minimum_duration
+        assert entry.set_duration == obs.set_duration
+        assert entry.coord.separation(obs.field.coord).arcsec < 1e-3
+
+
+def test_invalid_configs(field_list):
+    field_list.append({"field": {"name": "Bad position", "position": "not a position"}})
+    field_list.append(
+        {"field": {"name": "Bad nexp", "position": "00h00m00s +00d00m00s"}, "observation": {"min_nexp": 7}}
+    )
+    field_list.append({"field": {"name": "", "position": "00h00m00s +00d00m00s"}})
+
+    catalog = FieldCatalog.from_configs(field_list)
+    assert len(catalog) == len(field_list) - 3
+    assert "Bad position" not in catalog
+    assert "Bad nexp" not in catalog
+
+
+def test_accepts():
+    assert FieldCatalog.accepts({"field": {"name": "A", "position": "00h00m00s +00d00m00s"}})
+    assert not FieldCatalog.accepts({"field": {"name": "A", "position": "0 0", "type": "my.Field"}})
+    assert not FieldCatalog.accepts(
+        {"field": {"name": "A", "position": "0 0"}, "observation": {"constraints": []}}
+    )
+    assert not FieldCatalog.accepts({"name": "A", "position": "0 0"})
+
+
+def test_without(field_list):
+    catalog = FieldCatalog.from_configs(field_list)
+    smaller = catalog.without("Tres 3")
+
+    assert len(smaller) == len(catalog) - 1
+    assert "Tres 3" not in smaller
+    assert smaller.index["Wasp 33"] == 2
+
+
+def test_pickle_entry(field_list):
+    catalog = FieldCatalog.from_configs(field_list)
+    entry = catalog.entries[1]
+
+    unpickled = pickle.loads(pickle.dumps(entry))
+    assert unpickled.name == entry.name
+    assert unpickled.coord.separation(entry.coord).arcsec < 1e-6
+    assert unpickled.minimum_duration == entry.minimum_duration
+
+    # Only the row of the entry is pickled.
+    assert len(unpickled.catalog) == 1
+
+
+def test_scheduler_uses_catalog(observer, constraints, field_list):
+    scheduler = Scheduler(observer, fields_list=field_list, constraints=constraints, catalog_threshold=1)
+
+    assert len(scheduler.catalog) == len(field_list)
+    assert len(scheduler.observations) == 0
+    assert len(scheduler.targets) == len(field_list)
+    assert scheduler.has_valid_observations
+
+    # Only the selected field becomes a full observation.
+    best = scheduler.get_observation(time=Time("2016-08-13 10:00:00"))
+    assert list(scheduler.observations.keys()) == [best[0]]
+    assert isinstance(scheduler.current_observation, Observation)
+    assert scheduler.targets[best[0]] is scheduler.current_observation
+    assert scheduler.load_observation(best[0]) is scheduler.current_observation
+
+
+def test_scheduler_catalog_same_result(observer, constraints, field_list):
+    time = Time("2016-08-13 10:00:00")
+
+    with_catalog = Scheduler(observer, fields_list=field_list, constraints=constraints, catalog_threshold=1)
+    without_catalog = Scheduler(
+        observer, fields_list=field_list, constraints=constraints, catalog_threshold=0
+    )
+    assert without_catalog.catalog is None
+
+    best0 = with_catalog.get_observation(time=time, show_all=True)
+    best1 = without_catalog.get_observation(time=time, show_all=True)
+
+    assert [name for name, _ in best0] == [name for name, _ in best1]
+    assert np.allclose([score for _, score in best0], [score for _, score in best1])
+
+
+def test_scheduler_catalog_mixed(observer, constraints, field_list):
+    # Entries the catalog can't hold are still added as observations.
+    field_list.append(
+        {
+            "field": {"name": "Kepler 1100", "position": "19h27m29.10s +44d05m15.00s"},
+            "observation": {"constraints": [{"name": "panoptes.pocs.scheduler.constraint.Altitude"}]},
+        }
+    )
+    scheduler = Scheduler(observer, fields_list=field_list, constraints=constraints, catalog_threshold=1)
+
+    assert len(scheduler.catalog) == len(field_list) - 1
+    assert list(scheduler.observations.keys()) == ["Kepler 1100"]
+    assert list(scheduler.targets.keys())[-1] == "Kepler 1100"
+    assert len(scheduler.field_coords) == len(field_list)
+
+    scheduler.remove_observation("Wasp 33")
+    assert "Wasp 33" not in scheduler.catalog
+    assert "Wasp 33" not in scheduler.targets
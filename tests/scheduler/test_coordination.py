@@ -0,0 +1,174 @@
+import pytest
+import yaml
+from astroplan import Observer
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+from fastapi.testclient import TestClient
+
+from panoptes.utils.config.client import get_config
+
+from panoptes.pocs.scheduler.constraint import Altitude, ClaimedElsewhere
+from panoptes.pocs.scheduler.coordination import (
+    Claim,
+    HTTPCoordinator,
+    LocalCoordinator,
+    create_coordinator_from_config,
+)
+from panoptes.pocs.scheduler.dispatch import Scheduler
+from panoptes.pocs.utils.service.coordination import app
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def observer():
+    loc = get_config("location")
+    location = EarthLocation(lon=loc["longitude"], lat=loc["latitude"], height=loc["elevation"])
+    return Observer(location=location, name="Test Observer", timezone=loc["timezone"])
+
+
+@pytest.fixture
+def field_list():
+    return yaml.full_load("""
+    -
+      field:
+        name: HD 189733
+        position: 20h00m43.7135s +22d42m39.0645s
+      observation:
+        priority: 100
+    -
+      field:
+        name: HD 209458
+        position: 22h03m10.7721s +18d53m03.543s
+      observation:
+        priority: 100
+    """)
+
+
+def test_local_coordinator():
+    clock = FakeClock()
+    coordinator = LocalCoordinator(clock=clock)
+
+    assert coordinator.claim("M42", "PAN001", lease_time=60) is True
+    assert coordinator.claim("M42", "PAN002", lease_time=60) is False
+    # Renewing your own claim.
+    assert coordinator.claim("M42", "PAN001", lease_time=60) is True
+
+    assert coordinator.get_claims() == [Claim("M42", "PAN001", 1060.0)]
+    assert coordinator.get_claimed_names() == {"M42"}
+    assert coordinator.get_claimed_names(exclude_unit="PAN001") == set()
+
+    # Leases run out.
+    clock.now += 61
+    assert coordinator.get_claims() == []
+    assert coordinator.claim("M42", "PAN002", lease_time=60) is True
+
+    assert coordinator.release("M42", "PAN001") is False
+    assert coordinator.release("M42", "PAN002") is True
+    assert coordinator.get_claims() == []
+
+
+def test_coordination_service():
+    with TestClient(app) as client:
+        coordinator = HTTPCoordinator("http://testserver", session=client)
+
+        assert coordinator.claim("M42", "PAN001") is True
+        assert coordinator.claim("M42", "PAN002") is False
+        assert coordinator.get_claimed_names(exclude_unit="PAN002") == {"M42"}
+
+        claims = coordinator.get_claims()
+        assert len(claims) == 1
+        assert claims[0].unit_id == "PAN001"
+
+        assert coordinator.release("M42", "PAN002") is False
+        assert coordinator.release("M42", "PAN001") is True
+        assert coordinator.get_claims() == []
+
+
+def test_http_coordinator_fails_open():
+    coordinator = HTTPCoordinator("http://127.0.0.1:9", timeout=0.5)
+
+    assert coordinator.claim("M42", "PAN001") is True
+    assert coordinator.release("M42", "PAN001") is False
+    assert coordinator.get_claimed_names() == set()
+
+
+def test_create_coordinator_from_config():
+    assert create_coordinator_from_config({"url": None}) is None
+
+    coordinator = create_coordinator_from_config({"url": "http://localhost:6567/", "timeout": 1})
+    assert isinstance(coordinator, HTTPCoordinator)
+    assert coordinator.url == "http://localhost:6567"
+
+
+def test_schedulers_split_fields(observer, field_list):
+    coordinator = LocalCoordinator()
+    time = Time("2016-08-13 10:00:00")
+
+    schedulers = list()
+    for unit_id in ["PAN001", "PAN002"]:
+        scheduler = Scheduler(
+            observer,
+            fields_list=field_list,
+            constraints=[Altitude(horizon=30, obstructions=[]), ClaimedElsewhere()],
+            coordinator=coordinator,
+        )
+        scheduler.unit_id = unit_id
+        schedulers.append(scheduler)
+
+    first = schedulers[0].get_observation(time=time)[0]
+    second = schedulers[1].get_observation(time=time)[0]
+    assert first != second
+    assert {claim.unit_id for claim in coordinator.get_claims()} == {"PAN001", "PAN002"}
+
+    # The veto shows up in the score matrix of the second unit.
+    assert schedulers[1].score_matrix.vetoes[schedulers[1].score_matrix.names.index(first)].any()
+
+    # Releasing the field makes it available again.
+    schedulers[0].current_observation = None
+    assert coordinator.get_claimed_names(exclude_unit="PAN002") == set()
+
+
+def test_schedulers_race_for_top_field(observer, field_list):
+    """Two units that both rank the same field first end up on different fields."""
+    coordinator = LocalCoordinator()
+    time = Time("2016-08-13 10:00:00")
+
+    # Without the `ClaimedElsewhere` veto both units score the fields the same,
+    # like two units that score at the same moment.
+    schedulers = list()
+    for unit_id in ["PAN001", "PAN002"]:
+        scheduler = Scheduler(
+            observer,
+            fields_list=field_list,
+            constraints=[Altitude(horizon=30, obstructions=[])],
+            coordinator=coordinator,
+        )
+        scheduler.unit_id = unit_id
+        schedulers.append(scheduler)
+
+    ranked = schedulers[1].get_observation(time=time, show_all=True)
+    schedulers[1].current_observation = None
+    top_name = ranked[0][0]
+
+    first = schedulers[0].get_observation(time=time)[0]
+    second = schedulers[1].get_observation(time=time)[0]
+    assert first == top_name
+    assert second != first
+    assert schedulers[1].current_observation.name == second
+    assert {claim.field_name: claim.unit_id for claim in coordinator.get_claims()} == {
+        first: "PAN001",
+        second: "PAN002",
+    }
+
+    # With every field claimed elsewhere there is nothing to observe.
+    schedulers[1].current_observation = None
+    assert coordinator.claim(second, "PAN003")
+    assert schedulers[1].get_observation(time=time) == []
+    assert schedulers[1].current_observation is None
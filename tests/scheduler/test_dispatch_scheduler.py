@@ -1,5 +1,6 @@
 import os
 
+import numpy as np
 import pytest
 import yaml
 from astroplan import Observer
@@ -7,12 +8,22 @@ from astropy import units as u
 from astropy.coordinates import EarthLocation
 from astropy.time import Time
 
+from panoptes.utils import error
 from panoptes.utils.config.client import get_config
 
-from panoptes.pocs.scheduler.constraint import Duration, MoonAvoidance
+from panoptes.pocs.scheduler.constraint import BaseConstraint, Duration, MoonAvoidance
 from panoptes.pocs.scheduler.dispatch import Scheduler
 
 
+class NameLength(BaseConstraint):
+    """A parallel safe constraint that vetoes long names and scores short ones."""
+
+    parallel_safe = True
+
+    def get_score(self, time, observer, observation, **kwargs):
+        return len(observation.name) > 9, 1 / len(observation.name) * self.weight
+
+
 @pytest.fixture
 def constraints():
     return [MoonAvoidance(), Duration(30 * u.deg)]
@@ -125,6 +136,78 @@ def test_get_observation(scheduler):
     assert isinstance(best[1], float)
 
 
+def test_score_matrix(scheduler):
+    time = Time("2016-08-13 10:00:00")
+
+    best = scheduler.get_observation(time=time, show_all=True)
+
+    matrix = scheduler.score_matrix
+    assert matrix.time == time
+    assert matrix.names == list(scheduler.targets.keys())
+    assert matrix.constraints[:-1] == [str(c) for c in scheduler.constraints]
+    assert matrix.scores.shape == matrix.vetoes.shape == (len(matrix.names), len(matrix.constraints))
+
+    # The merits match the ranked observations and vetoed ones are left out.
+    merits = dict(zip(matrix.names, matrix.merits))
+    assert len(best) == np.count_nonzero(matrix.valid)
+    for name, merit in best:
+        assert merits[name] == pytest.approx(merit)
+
+    vetoed = np.flatnonzero(~matrix.valid)
+    assert len(vetoed) > 0
+    assert np.all(np.isnan(matrix.totals[vetoed]))
+
+    df = matrix.to_dataframe()
+    assert list(df.index) == matrix.names
+    assert df.loc[best[0][0], "merit"] == pytest.approx(best[0][1])
+    assert df["vetoed_by"].isna()[best[0][0]]
+    assert df["vetoed_by"].notna().sum() == len(vetoed)
+
+
+def test_log_scores(field_list, observer, constraints, caplog):
+    time = Time("2016-08-13 10:00:00")
+
+    scheduler = Scheduler(observer, fields_list=field_list, constraints=constraints)
+    assert scheduler.log_scores is False
+    scheduler.get_observation(time=time)
+    assert "Constraint score" not in caplog.text
+
+    scheduler = Scheduler(observer, fields_list=field_list, constraints=constraints, log_scores=True)
+    scheduler.get_observation(time=time)
+    assert "Constraint score" in caplog.text
+
+
+@pytest.mark.parametrize("pool_type", ["thread", "process"])
+def test_pool(field_list, observer, constraints, pool_type):
+    time = Time("2016-08-13 10:00:00")
+    constraints = constraints + [NameLength()]
+
+    serial = Scheduler(observer, fields_list=field_list, constraints=constraints)
+    pooled = Scheduler(
+        observer,
+        fields_list=field_list,
+        constraints=constraints,
+        pool_type=pool_type,
+        pool_workers=2,
+        pool_chunk_size=2,
+    )
+    assert pooled.executor is not None
+
+    assert pooled.get_observation(time=time, show_all=True) == serial.get_observation(
+        time=time, show_all=True
+    )
+    np.testing.assert_array_equal(pooled.score_matrix.vetoes, serial.score_matrix.vetoes)
+    np.testing.assert_allclose(pooled.score_matrix.scores, serial.score_matrix.scores)
+
+    pooled.shutdown_pool()
+    assert pooled._executor is None
+
+
+def test_pool_bad_type(field_list, observer, constraints):
+    with pytest.raises(error.InvalidConfig):
+        Scheduler(observer, fields_list=field_list, constraints=constraints, pool_type="gpu")
+
+
 def test_get_observation_reread(field_list, observer, temp_file, constraints):
     time = Time("2016-08-13 10:00:00")
 
@@ -266,6 +349,8 @@ def test_observed_list(scheduler, monkeypatch):
     monkeypatch.setenv("POCSTIME", time1.to_value("iso"))
     scheduler.get_observation(time=time1)
     assert len(scheduler.observed_list) == 2
+    assert scheduler.visited_names == {obs.name for obs in scheduler.observed_list.values()}
+    assert scheduler.common_properties["visited_names"] is scheduler.visited_names
 
     # A few hours later should be the same
     time2 = Time("2016-09-11 14:38:00")
@@ -275,6 +360,7 @@ def test_observed_list(scheduler, monkeypatch):
 
     scheduler.reset_observed_list()
     assert len(scheduler.observed_list) == 0
+    assert len(scheduler.visited_names) == 0
 
 
 def test_timebased_priority(scheduler):
@@ -291,3 +377,33 @@ def test_timebased_priority(scheduler):
     scheduler.get_observation(time=time1)
 
     assert scheduler.current_observation.name != "HD 189733"
+
+
+def test_target_of_opportunity(scheduler):
+    time = Time("2016-08-13 10:00:00")
+    assert scheduler.get_observation(time=time)[0] == "HD 189733"
+    assert scheduler.preempt_requested is False
+
+    too_config = {"field": {"name": "GRB 160813A", "position": "20h30m00s +20d00m00s"}}
+    too = scheduler.add_target_of_opportunity(too_config)
+    assert too.priority == scheduler.too_priority
+    assert "observation" not in too_config
+    assert scheduler.preempt_requested is True
+
+    scheduler.clear_preemption()
+    assert scheduler.get_observation(time=time)[0] == "GRB 160813A"
+    assert scheduler.preempt_requested is False
+
+    # Kept when the observations are cleared and reread.
+    scheduler.clear_available_observations()
+    assert "GRB 160813A" in scheduler.observations
+
+    scheduler.remove_observation("GRB 160813A")
+    scheduler.clear_available_observations()
+    assert "GRB 160813A" not in scheduler.observations
+
+    with pytest.raises(error.InvalidObservation):
+        scheduler.add_target_of_opportunity({"name": "No field"})
+
+    too = scheduler.add_target_of_opportunity(too_config, priority=5)
+    assert too.priority == 5
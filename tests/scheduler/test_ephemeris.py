@@ -0,0 +1,285 @@
+import numpy as np
+import pytest
+from astroplan import Observer
+from astropy import units as u
+from astropy.coordinates import EarthLocation, SkyCoord, get_body
+from astropy.time import Time
+
+from panoptes.utils.config.client import get_config
+
+from panoptes.pocs.scheduler.constraint import Duration
+from panoptes.pocs.scheduler.dispatch import Scheduler
+from panoptes.pocs.scheduler.ephemeris import (
+    EphemerisGrid,
+    FieldEphemeris,
+    get_night_ephemeris,
+    get_transit_and_set_offsets,
+)
+from panoptes.pocs.scheduler.field import Field
+from panoptes.pocs.scheduler.observation.base import Observation
+
+
+@pytest.fixture(scope="module")
+def observer():
+    loc = get_config("location")
+    location = EarthLocation(lon=loc["longitude"], lat=loc["latitude"], height=loc["elevation"])
+    return Observer(location=location, name="Test Observer", timezone=loc["timezone"])
+
+
+@pytest.fixture(scope="module")
+def field_list():
+    return [
+        {"field": {"name": "HD 189733", "position": "20h00m43.7135s +22d42m39.0645s"}},
+        {"field": {"name": "Hat-P-16", "position": "00h38m17.59s +42d27m47.2s"}},
+        {"field": {"name": "Sabik", "position": "17h10m23s -15d43m30s"}},
+        {"field": {"name": "Wasp 33", "position": "02h26m51.0582s +37d33m01.733s"}},
+    ]
+
+
+@pytest.fixture(scope="module")
+def coords(field_list):
+    return SkyCoord([f["field"]["position"] for f in field_list])
+
+
+@pytest.fixture(scope="module")
+def grid(observer, coords, field_list):
+    start_time, end_time = observer.tonight(time=Time("2016-08-13 06:00:00"), horizon=0 * u.degree)
+    names = [f["field"]["name"] for f in field_list]
+    return EphemerisGrid(observer, coords, names, start_time, end_time, step=5 * u.minute)
+
+
+def test_grid_covers(grid):
+    assert grid.covers(Time("2016-08-13 10:00:00"))
+    assert not grid.covers(Time("2016-08-13 20:00:00"))
+    assert len(grid) == 4
+
+
+def test_grid_altaz(observer, coords, grid):
+    time = Time("2016-08-13 10:02:30")
+    expected = observer.altaz(time, coords)
+    interpolated = grid.altaz(time)
+
+    assert np.allclose(interpolated.alt.degree, expected.alt.degree, atol=0.05)
+    assert interpolated.separation(expected).degree.max() < 0.1
+
+
+def test_grid_time_to_set(observer, coords, grid):
+    time = Time("2016-08-13 10:00:00")
+    horizon = 30 * u.degree
+
+    seconds = grid.time_to_set(time, horizon)
+    is_up = observer.target_is_up(time, coords, horizon=horizon)
+
+    assert (grid.is_up(time, horizon) == is_up).all()
+    for i in np.flatnonzero(is_up):
+        set_time = observer.target_set_time(time, coords[i], which="next", horizon=horizon)
+        if set_time < grid.end_time:
+            assert seconds[i] == pytest.approx((set_time - time).sec, abs=30)
+        else:
+            assert np.isinf(seconds[i])
+
+    assert (seconds[~is_up] == 0).all()
+
+
+def test_grid_time_to_transit(observer, coords, grid):
+    time = Time("2016-08-13 10:00:00")
+    expected = observer.target_meridian_transit_time(time, coords, which="next")
+
+    seconds = grid.time_to_transit(time)
+
+    assert np.allclose(seconds, (expected - time).sec, atol=30)
+
+
+@pytest.mark.parametrize("time", [Time("2016-08-13 10:00:00"), Time("2018-01-19 07:10:00")])
+def test_analytic_offsets(observer, coords, time):
+    horizon = 30 * u.degree
+    transit_sec, set_sec = get_transit_and_set_offsets(observer, time, coords, horizon)
+
+    expected_transit = observer.target_meridian_transit_time(time, coords, which="next")
+    assert np.allclose(transit_sec, (expected_transit - time).sec, atol=30)
+
+    expected_set = observer.target_set_time(time, coords, which="next", horizon=horizon)
+    for i, set_time in enumerate(expected_set):
+        assert set_sec[i] == pytest.approx((set_time - time).sec, abs=30)
+
+
+def test_analytic_offsets_circumpolar(observer):
+    time = Time("2016-08-13 10:00:00")
+    coords = SkyCoord(["00h00m00s +89d00m00s", "00h00m00s -89d00m00s"])
+
+    _, set_sec = get_transit_and_set_offsets(observer, time, coords, 10 * u.degree)
+
+    assert np.isinf(set_sec[0])
+    assert set_sec[1] == 0
+
+
+def test_duration_analytic_matches_astroplan(observer, field_list):
+    class NonSiderealField(Field):
+        is_sidereal = False
+
+    duration = Duration(30 * u.degree)
+    time = Time("2016-08-13 10:00:00")
+
+    for config in field_list:
+        analytic = Observation(Field(**config["field"]))
+        astroplan = Observation(NonSiderealField(**config["field"]))
+
+        veto0, score0 = duration.get_score(time, observer, analytic)
+        veto1, score1 = duration.get_score(time, observer, astroplan)
+
+        assert veto0 == veto1
+        assert score0 == pytest.approx(score1, abs=1e-3)
+
+
+def test_grid_rows(grid, field_list):
+    class Named:
+        def __init__(self, name):
+            self.name = name
+
+    assert list(grid.rows([Named("Sabik"), Named("HD 189733")])) == [2, 0]
+    assert grid.rows([Named("Not a field")]) is None
+
+
+def test_grid_add_remove(observer, coords, field_list, grid):
+    names = [f["field"]["name"] for f in field_list]
+    partial = EphemerisGrid(observer, coords[:2], names[:2], grid.start_time, grid.end_time)
+    assert len(partial) == 2
+
+    # Missing fields are added with their own transform.
+    rows = partial.ensure(names, coords)
+    assert list(rows) == [0, 1, 2, 3]
+    assert np.allclose(partial.alt, grid.alt)
+    assert np.allclose(partial.ra, grid.ra)
+
+    partial.remove(["Hat-P-16", "Not a field"])
+    assert partial.names == ["HD 189733", "Sabik", "Wasp 33"]
+    assert np.allclose(partial.alt, grid.alt[[0, 2, 3]])
+
+    # Not added if the grid would hold too many fields.
+    assert partial.ensure(names, coords, max_fields=3) is None
+    assert len(partial) == 3
+    assert list(partial.ensure(names[2:], coords[2:], max_fields=3)) == [1, 2]
+
+
+def test_scheduler_ephemeris(observer, field_list):
+    scheduler = Scheduler(observer, fields_list=field_list)
+
+    time = Time("2016-08-13 10:00:00")
+    grid = scheduler.get_ephemeris(time)
+    assert grid is not None
+    assert len(grid) == 0
+
+    # Scoring adds the fields that pass the group vetoes.
+    scheduler.get_observation(time=time)
+    assert 0 < len(grid) <= len(field_list)
+    assert set(grid.names) <= set(scheduler.targets)
+
+    # The grid is reused for later times in the same night.
+    assert scheduler.get_ephemeris(time + 2 * u.hour) is grid
+
+    # Adding an observation keeps the grid, the field is added when it is scored.
+    scheduler.add_observation({"field": {"name": "M42", "position": "05h35m17.2992s -05d23m27.996s"}})
+    assert scheduler.get_ephemeris(time) is grid
+    assert "M42" not in grid.index
+
+    # Replacing or removing an observation removes its row.
+    name = grid.names[0]
+    scheduler.remove_observation(name)
+    assert name not in grid.index
+
+    # Next night builds a new grid.
+    assert scheduler.get_ephemeris(time + 1 * u.day) is not grid
+
+
+def test_scheduler_ephemeris_max_fields(observer, field_list):
+    time = Time("2016-08-13 10:00:00")
+    scheduler = Scheduler(observer, fields_list=field_list, ephemeris_max_fields=1)
+
+    best = scheduler.get_observation(time=time, show_all=True)
+    assert len(scheduler.get_ephemeris(time)) == 0
+
+    unlimited = Scheduler(observer, fields_list=field_list, ephemeris_max_fields=0)
+    with_grid = unlimited.get_observation(time=time, show_all=True)
+    assert len(unlimited.get_ephemeris(time)) > 1
+
+    assert [name for name, _ in with_grid] == [name for name, _ in best]
+    for (_, score0), (_, score1) in zip(with_grid, best):
+        assert score0 == pytest.approx(score1, rel=1e-2)
+
+
+def test_scheduler_ephemeris_disabled(observer, field_list):
+    scheduler = Scheduler(observer, fields_list=field_list, ephemeris_step=0)
+    assert scheduler.get_ephemeris(Time("2016-08-13 10:00:00")) is None
+
+
+def test_scheduler_ephemeris_same_result(observer, field_list):
+    time = Time("2016-08-13 10:00:00")
+
+    with_grid = Scheduler(observer, fields_list=field_list).get_observation(time=time, show_all=True)
+    without_grid = Scheduler(observer, fields_list=field_list, ephemeris_step=0).get_observation(
+        time=time, show_all=True
+    )
+
+    assert [name for name, _ in with_grid] == [name for name, _ in without_grid]
+    for (_, score0), (_, score1) in zip(with_grid, without_grid):
+        assert score0 == pytest.approx(score1, rel=1e-2)
+
+
+def test_night_ephemeris(observer):
+    time = Time("2016-08-13 10:02:30")
+    night = get_night_ephemeris(observer, time)
+    assert night.covers(time)
+    assert night.start_time <= time <= night.end_time
+
+    # Shared for the whole observing day, which starts at local noon (22:22 UTC).
+    assert get_night_ephemeris(observer, Time("2016-08-13 20:00:00")) is night
+    assert get_night_ephemeris(observer, Time("2016-08-13 23:00:00")) is not night
+
+    moon = get_body("moon", time, observer.location)
+    assert night.moon(time).separation(moon).arcsec < 1
+    assert night.moon(time).frame.name == "gcrs"
+
+    sun_altaz = observer.altaz(time, target=get_body("sun", time))
+    assert night.sun_altaz(time).separation(sun_altaz).degree < 0.01
+    assert night.moon_altaz(time).separation(observer.moon_altaz(time)).degree < 0.01
+    assert night.moon_illumination(time) == pytest.approx(observer.moon_illumination(time), abs=1e-4)
+    assert night.moon_phase(time).value == pytest.approx(observer.moon_phase(time).value, abs=1e-4)
+
+
+@pytest.mark.parametrize("time", ["2016-08-13 02:00:00", "2016-08-13 10:00:00"])
+def test_night_ephemeris_tonight(observer, time):
+    time = Time(time)
+    night = get_night_ephemeris(observer, time)
+    horizon = -18 * u.degree
+
+    for t in [time, time + 1 * u.hour, time + 2 * u.hour]:
+        start_time, end_time = night.tonight(t, horizon=horizon)
+        expected_start, expected_end = observer.tonight(time=t, horizon=horizon)
+        assert abs((start_time - expected_start).sec) < 1
+        assert abs((end_time - expected_end).sec) < 1
+        assert night.end_of_night(t, horizon=horizon) == end_time
+
+    # Reused until the end of the night.
+    assert night.end_of_night(time + 1 * u.hour, horizon=horizon) is night.end_of_night(time, horizon=horizon)
+
+
+def test_field_ephemeris(observer, coords):
+    start_time = Time("2016-08-13 10:00:00")
+    coord = coords[0]
+    ephemeris = FieldEphemeris(observer, coord, start_time, 2 * u.hour, name="HD 189733")
+
+    assert ephemeris.covers(start_time + 1 * u.hour)
+    assert not ephemeris.covers(start_time + 3 * u.hour)
+    assert ephemeris.matches("HD 189733", coord)
+    assert not ephemeris.matches("HD 189733", coords[1])
+    assert not ephemeris.matches("Hat-P-16", coord)
+
+    for time in [start_time, start_time + 10.5 * u.minute, start_time + 119 * u.minute]:
+        expected_airmass = observer.altaz(time, coord).secz.value
+        expected_ha = observer.target_hour_angle(time, coord).hour
+        moon = get_body("moon", time, observer.location)
+        expected_separation = moon.separation(coord, origin_mismatch="ignore").degree
+
+        assert ephemeris.airmass(time) == pytest.approx(expected_airmass, rel=1e-4)
+        assert ephemeris.hour_angle(time) == pytest.approx(expected_ha, abs=1e-4)
+        assert ephemeris.moon_separation(time) == pytest.approx(expected_separation, abs=1e-3)
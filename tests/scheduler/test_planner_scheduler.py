@@ -0,0 +1,227 @@
+import numpy as np
+import pytest
+import yaml
+from astroplan import Observer
+from astropy import units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+from panoptes.utils.config.client import get_config
+
+from panoptes.pocs.scheduler import create_scheduler_from_config
+from panoptes.pocs.scheduler.constraint import AlreadyVisited, Altitude, Duration, MoonAvoidance
+from panoptes.pocs.scheduler.coordination import LocalCoordinator
+from panoptes.pocs.scheduler.planner import PlanSlot, Scheduler
+
+
+@pytest.fixture
+def constraints():
+    return [Altitude(), MoonAvoidance(), Duration(30 * u.deg)]
+
+
+@pytest.fixture(scope="function")
+def observer():
+    loc = get_config("location")
+    location = EarthLocation(lon=loc["longitude"], lat=loc["latitude"], height=loc["elevation"])
+    return Observer(location=location, name="Test Observer", timezone=loc["timezone"])
+
+
+@pytest.fixture(scope="function")
+def field_list():
+    return yaml.full_load("""
+    -
+      field:
+        name: HD 189733
+        position: 20h00m43.7135s +22d42m39.0645s
+      observation:
+        priority: 100
+    -
+      field:
+        name: HD 209458
+        position: 22h03m10.7721s +18d53m03.543s
+      observation:
+        priority: 100
+    -
+      field:
+        name: Tres 3
+        position: 17h52m07.02s +37d32m46.2012s
+      observation:
+        priority: 100
+        exp_set_size: 15
+        min_nexp: 240
+    -
+      field:
+        name: Wasp 33
+        position: 02h26m51.0582s +37d33m01.733s
+      observation:
+        priority: 100
+    -
+      field:
+        name: M42
+        position: 05h35m17.2992s -05d23m27.996s
+      observation:
+        priority: 25
+        exptime: 240
+    """)
+
+
+@pytest.fixture(scope="function")
+def scheduler(field_list, observer, constraints):
+    return Scheduler(observer, fields_list=field_list, constraints=constraints)
+
+
+def test_get_observation(scheduler):
+    time = Time("2016-08-13 05:00:00")
+
+    best = scheduler.get_observation(time=time)
+
+    assert best[0] in scheduler.observations
+    assert isinstance(best[1], float)
+    assert scheduler.current_observation.name == best[0]
+
+
+def test_plan_fetches_claims_once(field_list, observer, constraints):
+    class CountingCoordinator(LocalCoordinator):
+        calls = 0
+
+        def get_claimed_names(self, exclude_unit=None):
+            self.calls += 1
+            return super().get_claimed_names(exclude_unit=exclude_unit)
+
+    coordinator = CountingCoordinator()
+    scheduler = Scheduler(observer, fields_list=field_list, constraints=constraints, coordinator=coordinator)
+
+    scheduler.get_observation(time=Time("2016-08-13 05:00:00"))
+
+    assert len(scheduler.plan) > 1
+    assert coordinator.calls == 1
+
+
+def test_plan_covers_night(scheduler):
+    time = Time("2016-08-13 05:00:00")
+    scheduler.get_observation(time=time)
+
+    plan = scheduler.plan
+    assert len(plan) > 0
+    assert all(isinstance(slot, PlanSlot) for slot in plan)
+    assert plan[0].start_time == time
+    assert plan[-1].start_time < scheduler.common_properties["end_of_night"]
+    assert scheduler.plan_merit > 0
+
+
+def test_plan_minimum_duration(scheduler):
+    time = Time("2016-08-13 05:00:00")
+    scheduler.get_observation(time=time)
+
+    names = [slot.name for slot in scheduler.plan]
+    slot_sec = scheduler.slot_duration.to_value(u.second)
+
+    # Every block (except one that is cut off by the end of the night) meets the minimum.
+    start = 0
+    for i in range(1, len(names) + 1):
+        if i == len(names) or names[i] != names[start]:
+            if names[start] is not None and i < len(names):
+                minimum = scheduler.observations[names[start]].minimum_duration.to_value(u.second)
+                assert (i - start) * slot_sec >= minimum
+            start = i
+
+
+def test_follow_plan(scheduler):
+    time = Time("2016-08-13 05:00:00")
+    scheduler.get_observation(time=time)
+    plan = list(scheduler.plan)
+
+    # Later calls follow the existing plan without replanning.
+    later = plan[1].start_time + 1 * u.second
+    best = scheduler.get_observation(time=later)
+    assert scheduler.plan[0].start_time == plan[0].start_time
+    assert best[0] == plan[1].name
+
+
+def test_replan_after_interrupt(scheduler):
+    time = Time("2016-08-13 05:00:00")
+    scheduler.get_observation(time=time)
+    first_plan_start = scheduler.plan[0].start_time
+
+    # Parking clears the current observation.
+    scheduler.current_observation = None
+
+    later = time + 30 * u.minute
+    scheduler.get_observation(time=later)
+    assert scheduler.plan[0].start_time == later
+    assert scheduler.plan[0].start_time != first_plan_start
+
+
+def test_replan_continues_visited(field_list, observer, constraints):
+    scheduler = Scheduler(observer, fields_list=field_list, constraints=constraints + [AlreadyVisited()])
+    time = Time("2016-08-13 05:00:00")
+    best = scheduler.get_observation(time=time)
+    assert best[0] in scheduler.visited_names
+
+    # Replanning mid-observation keeps the current observation.
+    later = time + scheduler.slot_duration
+    plan = scheduler.make_plan(later)
+    assert plan[0].name == best[0]
+    assert plan[0].merit > 0
+
+    # Other visited fields are still vetoed.
+    scheduler.current_observation = None
+    plan = scheduler.make_plan(later)
+    assert best[0] not in {slot.name for slot in plan}
+
+
+def test_no_valid_observation(scheduler):
+    time = Time("2016-08-13 15:00:00")
+    assert scheduler.get_observation(time=time) == []
+    assert scheduler.current_observation is None
+
+
+def test_solve_avoids_switching(scheduler):
+    merits = np.array(
+        [
+            [4.0, 4.0, 4.0, 4.0],
+            [5.0, -np.inf, -np.inf, -np.inf],
+        ]
+    )
+    min_slots = np.array([1, 1])
+
+    # Greedy would take the second observation first and then switch.
+    assert scheduler._solve(merits, min_slots, overhead_fraction=0.5) == [0, 0, 0, 0]
+    assert scheduler._solve(merits, min_slots, overhead_fraction=0.0) == [1, 0, 0, 0]
+
+
+def test_solve_minimum_slots(scheduler):
+    merits = np.array(
+        [
+            [1.0, 1.0, 1.0],
+            [3.0, -np.inf, -np.inf],
+        ]
+    )
+
+    # Once started, the second observation is kept for its minimum of two slots.
+    assert scheduler._solve(merits, np.array([1, 2]), overhead_fraction=0.0) == [1, 1, 0]
+    assert scheduler._solve(merits, np.array([1, 1]), overhead_fraction=0.0) == [1, 0, 0]
+
+    # A block that can't meet its minimum before the end of the night is worse than the alternative.
+    assert scheduler._solve(merits, np.array([1, 4]), overhead_fraction=0.0) == [0, 0, 0]
+
+
+def test_solve_continues_current(scheduler):
+    merits = np.array(
+        [
+            [4.0, 4.0],
+            [4.1, 4.1],
+        ]
+    )
+    min_slots = np.array([1, 1])
+
+    assert scheduler._solve(merits, min_slots, overhead_fraction=0.5, current_index=0) == [0, 0]
+    assert scheduler._solve(merits, min_slots, overhead_fraction=0.5) == [1, 1]
+
+
+def test_create_from_config(observer):
+    scheduler_config = get_config("scheduler").copy()
+    scheduler_config["type"] = "panoptes.pocs.scheduler.planner"
+
+    scheduler = create_scheduler_from_config(config=scheduler_config, observer=observer)
+    assert isinstance(scheduler, Scheduler)
@@ -0,0 +1,129 @@
+import os
+
+import pytest
+import yaml
+from astroplan import Observer
+from astropy import units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+from panoptes.utils.config.client import get_config
+
+from panoptes.pocs.scheduler.constraint import AlreadyVisited, Altitude, Duration, MoonAvoidance
+from panoptes.pocs.scheduler.coordination import LocalCoordinator
+from panoptes.pocs.scheduler.dispatch import Scheduler
+from panoptes.pocs.scheduler.ephemeris import get_night_ephemeris
+from panoptes.pocs.scheduler.simulator import TimelineEntry, simulate_night, virtual_clock
+
+
+@pytest.fixture(scope="function")
+def observer():
+    loc = get_config("location")
+    location = EarthLocation(lon=loc["longitude"], lat=loc["latitude"], height=loc["elevation"])
+    return Observer(location=location, name="Test Observer", timezone=loc["timezone"])
+
+
+@pytest.fixture(scope="function")
+def field_list():
+    return yaml.full_load("""
+    -
+      field:
+        name: HD 189733
+        position: 20h00m43.7135s +22d42m39.0645s
+      observation:
+        priority: 100
+    -
+      field:
+        name: HD 209458
+        position: 22h03m10.7721s +18d53m03.543s
+      observation:
+        priority: 100
+    -
+      field:
+        name: M5
+        position: 15h18m33.2201s +02d04m51.7008s
+      observation:
+        priority: 50
+    """)
+
+
+@pytest.fixture
+def scheduler(observer, field_list):
+    constraints = [Altitude(horizon=30 * u.deg, obstructions=[]), Duration(30 * u.deg), MoonAvoidance()]
+    return Scheduler(observer, fields_list=field_list, constraints=constraints)
+
+
+def test_virtual_clock():
+    original = os.environ.get("POCSTIME")
+    with virtual_clock(Time("2016-08-13 10:00:00")):
+        assert os.environ["POCSTIME"] == "2016-08-13T10:00:00.000"
+    assert os.environ.get("POCSTIME") == original
+
+
+def test_simulate_night(scheduler, observer):
+    time = Time("2016-08-13 05:00:00")
+    start_time, end_of_night = get_night_ephemeris(observer, time).tonight(time, horizon=-18 * u.degree)
+
+    timeline = simulate_night(scheduler, time=time, overhead=120 * u.second)
+
+    assert len(timeline) > 0
+    assert all(isinstance(entry, TimelineEntry) for entry in timeline)
+    assert timeline[0].start_time == start_time
+
+    # The entries are contiguous and stop at the end of the night.
+    for previous, entry in zip(timeline[:-1], timeline[1:]):
+        assert entry.start_time == previous.end_time
+    assert timeline[-1].start_time < end_of_night
+
+    sets = [entry for entry in timeline if entry.name is not None]
+    assert len(sets) > 0
+    for entry in sets:
+        observation = scheduler.observations[entry.name]
+        duration = (entry.end_time - entry.start_time).to_value(u.second)
+        assert duration == pytest.approx((observation.set_duration + 120 * u.second).to_value(u.second))
+        assert entry.merit > 0
+        assert entry.to_dict()["name"] == entry.name
+
+    # Idle periods are merged.
+    for previous, entry in zip(timeline[:-1], timeline[1:]):
+        assert previous.name is not None or entry.name is not None
+
+    # Each chosen observation was marked as visited.
+    assert {entry.name for entry in sets} == scheduler.visited_names
+
+
+def test_simulate_night_visited(observer, field_list):
+    constraints = [Altitude(horizon=30 * u.deg, obstructions=[]), AlreadyVisited()]
+    scheduler = Scheduler(observer, fields_list=field_list, constraints=constraints)
+
+    time = Time("2016-08-13 05:00:00")
+    timeline = simulate_night(scheduler, time=time, end_time=Time("2016-08-13 12:00:00"))
+
+    # The current observation may be reused, but no field is returned to after switching.
+    names = [entry.name for entry in timeline if entry.name is not None]
+    blocks = [name for i, name in enumerate(names) if i == 0 or name != names[i - 1]]
+    assert len(blocks) > 0
+    assert len(blocks) == len(set(blocks))
+    assert timeline[-1].end_time <= Time("2016-08-13 12:00:00") + 1 * u.hour
+
+
+def test_simulate_night_skips_coordination(observer, field_list):
+    class CountingCoordinator(LocalCoordinator):
+        calls = 0
+
+        def claim(self, *args, **kwargs):
+            self.calls += 1
+            return super().claim(*args, **kwargs)
+
+    coordinator = CountingCoordinator()
+    constraints = [Altitude(horizon=30 * u.deg, obstructions=[])]
+    scheduler = Scheduler(observer, fields_list=field_list, constraints=constraints, coordinator=coordinator)
+
+    timeline = simulate_night(
+        scheduler, time=Time("2016-08-13 05:00:00"), end_time=Time("2016-08-13 08:00:00")
+    )
+
+    assert any(entry.name is not None for entry in timeline)
+    assert coordinator.calls == 0
+    assert coordinator.get_claims() == []
+    assert scheduler.coordinator is coordinator
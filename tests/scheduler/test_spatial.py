@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from astroplan import Observer
+from astropy import units as u
+from astropy.coordinates import EarthLocation, SkyCoord, get_body
+from astropy.time import Time
+
+from panoptes.utils.config.client import get_config
+
+from panoptes.pocs.scheduler.constraint import Altitude, MoonAvoidance
+from panoptes.pocs.scheduler.spatial import SkyIndex, get_unit_vectors
+
+
+@pytest.fixture(scope="module")
+def observer():
+    loc = get_config("location")
+    location = EarthLocation(lon=loc["longitude"], lat=loc["latitude"], height=loc["elevation"])
+    return Observer(location=location, name="Test Observer", timezone=loc["timezone"])
+
+
+@pytest.fixture(scope="module")
+def coords():
+    rng = np.random.default_rng(42)
+    ra = rng.uniform(0, 360, 2000)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, 2000)))
+    return SkyCoord(ra=ra * u.degree, dec=dec * u.degree, frame="icrs")
+
+
+@pytest.fixture(scope="module")
+def sky_index(coords):
+    return SkyIndex(coords)
+
+
+def test_unit_vectors(coords):
+    vectors = get_unit_vectors(coords)
+    assert vectors.shape == (len(coords), 3)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1)
+
+
+def test_query_cone(sky_index, coords):
+    center = SkyCoord(ra=10 * u.degree, dec=20 * u.degree)
+    rows = sky_index.query_cone(center, 30 * u.degree)
+
+    expected = np.flatnonzero(center.separation(coords).degree < 30)
+    assert list(rows) == list(expected)
+    assert len(sky_index.query_cone(center, 0)) == 0
+
+    outside = sky_index.query_outside(center, 30)
+    assert not outside[rows].any()
+    assert outside.sum() == len(coords) - len(rows)
+
+
+@pytest.mark.parametrize("time", [Time("2016-08-13 10:00:00"), Time("2018-01-19 07:10:00")])
+def test_below_horizon(observer, sky_index, coords, time):
+    below = sky_index.below_horizon(observer, time, 30 * u.degree)
+    alt = observer.altaz(time, coords).alt.degree
+
+    # Catalog vs apparent positions only differ by a fraction of a degree.
+    assert (alt[below] < 30.5).all()
+    assert (alt[~below] > 29.5).all()
+
+
+@pytest.mark.parametrize("time", [Time("2016-08-13 10:00:00"), Time("2016-09-14 04:00:00")])
+def test_group_vetoes_are_vetoes(observer, sky_index, coords, time):
+    moon = get_body("moon", time, observer.location)
+    observations = [None] * len(coords)
+
+    for constraint in [Altitude(), MoonAvoidance(separation=45)]:
+        group_vetoes = constraint.get_group_vetoes(time, observer, sky_index, moon=moon)
+        vetoes, _ = constraint.get_scores(time, observer, observations, coords=coords, moon=moon)
+
+        assert group_vetoes.any()
+        assert vetoes[group_vetoes].all()
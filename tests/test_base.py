@@ -1,6 +1,14 @@
+import pickle
+
+import pytest
+
 from panoptes.utils.database import PanDB
 
-from panoptes.pocs.base import PAN_CONFIG_CACHE, PanBase
+from panoptes.pocs.base import PAN_CONFIG_CACHE, PanBase, Picklable
+
+
+class PicklableBase(Picklable, PanBase):
+    pass
 
 
 def test_with_logger():
@@ -22,3 +30,17 @@ def test_remember_config():
     assert "location" in PAN_CONFIG_CACHE
 
     assert location1 == location2
+
+
+def test_pickle():
+    base = PicklableBase()
+    base.foo = "bar"
+
+    unpickled = pickle.loads(pickle.dumps(base))
+    assert unpickled.foo == "bar"
+    assert unpickled.logger is not None
+    assert unpickled.db is base.db
+
+    # Other objects, e.g. the hardware, can't be pickled.
+    with pytest.raises(TypeError):
+        pickle.dumps(PanBase())
@@ -585,6 +585,20 @@ def test_observation(camera, images_dir):
     assert len(glob.glob(observation_pattern)) == 1
 
 
+def test_observation_future(camera, images_dir):
+    """The observation future resolves to the metadata once the observation is done."""
+    field = Field("Test Observation", "20h00m43.7135s +22d42m39.0645s")
+    observation = Observation(field, exptime=1.5 * u.second)
+    observation.seq_time = "19991231T235859"
+    metadata = camera.take_observation(observation)
+    assert camera.observation_future is not None
+
+    assert camera.wait_for_observation(timeout=60)
+    assert camera.is_observing is False
+    assert camera.observation_future.result() is metadata
+    assert os.path.exists(metadata["filepath"])
+
+
 def test_observation_headers_and_blocking(camera, images_dir):
     """
     Tests functionality of take_observation()
@@ -3,7 +3,7 @@ from collections import OrderedDict
 import pytest
 from astroplan import Observer
 from astropy import units as u
-from astropy.coordinates import EarthLocation, get_body
+from astropy.coordinates import EarthLocation, SkyCoord, get_body
 from astropy.time import Time
 
 from panoptes.utils import horizon as horizon_utils
@@ -11,6 +11,7 @@ from panoptes.utils.config.client import get_config
 from panoptes.utils.error import PanError
 from panoptes.utils.serializers import from_yaml
 
+from panoptes.pocs.mount.slew import SlewTimeModel
 from panoptes.pocs.scheduler import create_constraints_from_config
 from panoptes.pocs.scheduler.constraint import (
     AlreadyVisited,
@@ -18,6 +19,7 @@ from panoptes.pocs.scheduler.constraint import (
     BaseConstraint,
     Duration,
     MoonAvoidance,
+    SlewTime,
     TimeWindow,
 )
 from panoptes.pocs.scheduler.field import Field
@@ -280,6 +282,14 @@ def test_already_visited(observer):
     assert veto1 is True
     assert veto2 is False
 
+    # The scheduler passes the set of visited names, which takes precedence.
+    veto1, _ = avc.get_score(time, observer, observation1, observed_list=observed_list, visited_names=set())
+    veto3, _ = avc.get_score(
+        time, observer, observation3, observed_list=observed_list, visited_names={"Sabik"}
+    )
+    assert veto1 is False
+    assert veto3 is True
+
 
 def test_time_based_priority(observer):
     observation1 = Observation(Field("HD189733", "20h00m43.7135s +22d42m39.0645s"), priority=100)
@@ -309,3 +319,84 @@ def test_bad_time(observer):
 
     with pytest.raises(PanError):
         TimeWindow(start_time=Time("2016-08-13 10:00"), end_time="not a time")
+
+
+@pytest.mark.parametrize(
+    "time",
+    [Time("2016-08-13 10:00:00"), Time("2018-01-19 07:10:00")],
+)
+def test_get_scores_matches_get_score(observer, field_list, time):
+    observations = [Observation(Field(**field), **field) for field in field_list]
+    kwargs = dict(
+        moon=get_body("moon", time, observer.location),
+        observed_list=OrderedDict(),
+        end_of_night=observer.tonight(time=time, horizon=-18 * u.degree)[-1],
+        mount_coords=observations[0].field.coord,
+    )
+
+    for constraint in [
+        Altitude(),
+        Duration(30 * u.degree),
+        MoonAvoidance(),
+        AlreadyVisited(),
+        SlewTime(),
+    ]:
+        vetoes, scores = constraint.get_scores(time, observer, observations, **kwargs)
+        assert len(vetoes) == len(scores) == len(observations)
+
+        for observation, batch_veto, batch_score in zip(observations, vetoes, scores):
+            veto, score = constraint.get_score(time, observer, observation, **kwargs)
+            assert batch_veto == veto
+            if not veto:
+                assert batch_score == pytest.approx(score, rel=1e-3)
+
+
+def test_get_scores_fallback(observer, field_list):
+    class CustomConstraint(BaseConstraint):
+        def get_score(self, time, observer, observation, **kwargs):
+            assert "coords" not in kwargs
+            return observation.priority < 100, 0.5 * self.weight
+
+    time = Time("2016-08-13 10:00:00")
+    observations = [Observation(Field(**field), **field) for field in field_list]
+
+    vetoes, scores = CustomConstraint(weight=2.0).get_scores(
+        time, observer, observations, coords=None, altaz=None
+    )
+
+    assert list(vetoes) == [obs.priority < 100 for obs in observations]
+    assert all(scores == 1.0)
+
+
+def test_slew_time(observer):
+    time = Time("2016-08-13 10:00:00")
+    lst = observer.local_sidereal_time(time, kind="mean")
+
+    current = Observation(Field("Current", SkyCoord(ra=lst - 20 * u.deg, dec=20 * u.deg)))
+    near = Observation(Field("Near", SkyCoord(ra=lst - 30 * u.deg, dec=20 * u.deg)))
+    # Just across the meridian, so the mount has to flip.
+    flip = Observation(Field("Flip", SkyCoord(ra=lst + 1 * u.deg, dec=20 * u.deg)))
+
+    slew_model = SlewTimeModel(ra_rate=2.0, dec_rate=2.0, settle_time=5.0)
+    constraint = SlewTime(max_slew_time=180, weight=2.0)
+    kwargs = dict(mount_coords=current.field.coord, slew_model=slew_model)
+
+    veto, score = constraint.get_score(time, observer, current, **kwargs)
+    assert veto is False
+    assert score == pytest.approx(2.0)
+
+    vetoes, scores = constraint.get_scores(time, observer, [current, near, flip], **kwargs)
+    assert not vetoes.any()
+    assert scores[1] == pytest.approx((1 - (10 / 2 + 5) / 180) * 2.0)
+    assert scores[2] < scores[1]
+
+    # A slower mount makes the flip take longer than `max_slew_time`.
+    slow_model = SlewTimeModel(ra_rate=0.5, dec_rate=0.5)
+    veto, score = constraint.get_score(
+        time, observer, flip, mount_coords=current.field.coord, slew_model=slow_model
+    )
+    assert veto is False
+    assert score == 0
+
+    with pytest.raises(PanError):
+        SlewTime(max_slew_time=0)
@@ -1,14 +1,17 @@
 import os
 
 import pytest
+from astroplan import Observer
 from astropy import units as u
 from astropy.coordinates import EarthLocation, SkyCoord
+from astropy.time import Time
 
 from panoptes.utils import error
 from panoptes.utils.config.client import get_config
 from panoptes.utils.utils import altaz_to_radec
 
 from panoptes.pocs.mount.simulator import Mount
+from panoptes.pocs.mount.slew import SlewTimeModel
 
 
 @pytest.fixture
@@ -164,3 +167,59 @@ def test_slew_to_home(mount):
     mount.slew_to_home()
     assert mount.is_parked is False
     assert mount.is_home is True
+
+
+def test_slew_model_axis_distances():
+    model = SlewTimeModel(ra_rate=2.0, dec_rate=1.0, settle_time=5.0)
+
+    # No slew, no settle time.
+    assert model.get_slew_time(30.0, 20.0, 30.0, 20.0)[()] == 0
+
+    # 20 degrees in hour angle on the same side of the pier.
+    assert model.get_slew_time(10.0, 20.0, 30.0, 20.0)[()] == pytest.approx(20 / 2 + 5)
+
+    # The Dec axis is slower.
+    assert model.get_slew_time(10.0, 20.0, 10.0, 50.0)[()] == pytest.approx(30 / 1 + 5)
+
+    # A small step across the meridian flips the mount.
+    flip = model.get_slew_time(-1.0, 20.0, 1.0, 20.0)[()]
+    assert flip == pytest.approx(max(178 / 2, 140 / 1) + 5)
+
+    # From the home position (pointing at the pole).
+    assert model.get_slew_time(None, None, 90.0, 90.0)[()] == 0
+
+
+def test_slew_model_from_settings():
+    model = SlewTimeModel.from_settings(
+        {"ra_rate": 4 * u.deg / u.second, "settle_time": 2}, defaults={"ra_rate": 1, "dec_rate": 3}
+    )
+    assert model == SlewTimeModel(ra_rate=4.0, dec_rate=3.0, settle_time=2.0)
+
+    with pytest.raises(ValueError):
+        SlewTimeModel(ra_rate=0)
+
+
+def test_estimate_slew_time(mount, location):
+    time = Time("2016-08-13 10:00:00")
+    lst = Observer(location=location).local_sidereal_time(time, kind="mean")
+
+    east = SkyCoord(ra=lst + 30 * u.deg, dec=20 * u.deg)
+    west = SkyCoord(ra=lst - 30 * u.deg, dec=20 * u.deg)
+    near = SkyCoord(ra=lst + 40 * u.deg, dec=20 * u.deg)
+
+    # Parked, so slews start at the home position.
+    assert mount.pointing_coordinates is None
+    from_home = mount.estimate_slew_time(east, time=time)
+    assert from_home.unit == u.second
+
+    # The observer is built once and reused.
+    observer = mount._observer
+    slew_times = mount.estimate_slew_time(SkyCoord([west, near]), time=time, start=east)
+    assert mount._observer is observer
+    assert slew_times[1] < slew_times[0]
+    assert slew_times[1].value == pytest.approx(10 / mount.slew_model.ra_rate + 5)
+
+    mount._is_parked = False
+    mount._current_coordinates = east
+    assert mount.pointing_coordinates is east
+    assert mount.estimate_slew_time(east, time=time)[0] == 0 * u.second
@@ -1,13 +1,15 @@
 import os
 import time
+from concurrent.futures import Future
 
 import pytest
 import requests
+from astropy import units as u
 from astropy.coordinates import get_body
 from astropy.time import Time
 
 from panoptes.utils import error
-from panoptes.utils.config.client import set_config
+from panoptes.utils.config.client import get_config, set_config
 from panoptes.utils.serializers import to_json
 
 from panoptes.pocs import __version__, hardware
@@ -17,7 +19,9 @@ from panoptes.pocs.mount import AbstractMount, create_mount_from_config, create_
 from panoptes.pocs.observatory import Observatory
 from panoptes.pocs.scheduler import create_scheduler_from_config
 from panoptes.pocs.scheduler.dispatch import Scheduler
-from panoptes.pocs.scheduler.observation.base import Observation
+from panoptes.pocs.scheduler.field import Field
+from panoptes.pocs.scheduler.observation.base import Exposure, Observation
+from panoptes.pocs.scheduler.scheduler import TOO_CONFIG_KEY
 from panoptes.pocs.utils.location import create_location_from_config
 
 
@@ -214,6 +218,37 @@ def test_status(observatory):
     assert "observation" in status3
 
 
+def test_status_cache(observatory, monkeypatch):
+    os.environ["POCSTIME"] = "2016-08-13 15:00:00"
+    observatory._status_cache.ttls.update(mount=60, observer=60)
+    observatory.mount.initialize(unpark=True)
+
+    calls = list()
+    get_current_coordinates = observatory.mount.get_current_coordinates
+
+    def _get_current_coordinates():
+        calls.append(1)
+        return get_current_coordinates()
+
+    monkeypatch.setattr(observatory.mount, "get_current_coordinates", _get_current_coordinates)
+
+    status = observatory.status
+    num_calls = len(calls)
+    assert num_calls > 0
+    assert observatory.status["mount"] is status["mount"]
+    assert observatory.status["observer"] is status["observer"]
+    assert len(calls) == num_calls
+
+    # A forced read asks the mount again.
+    assert observatory.get_status(force=True)["mount"] is not status["mount"]
+    assert len(calls) > num_calls
+
+    # The mount section follows the mount target.
+    assert "mount_target_ha" not in status["mount"]
+    observatory.mount.set_target_coordinates(Field("TestField", "20h00m43.7135s +22d42m39.0645s").coord)
+    assert "mount_target_ha" in observatory.status["mount"]
+
+
 def test_default_config(observatory):
     """Creates a default Observatory and tests some of the basic parameters"""
 
@@ -245,6 +280,49 @@ def test_is_dark(observatory):
     assert observatory.is_dark(horizon="invalid-defaults-to-observe") is True
 
 
+def test_time_until_dark(observatory):
+    os.environ["POCSTIME"] = "2016-08-13 10:00:00"
+    assert observatory.time_until_dark() == 0
+
+    # Astronomical twilight at the test site is around 06:00 UTC.
+    os.environ["POCSTIME"] = "2016-08-13 22:00:00"
+    seconds = observatory.time_until_dark()
+    assert 6 * 3600 < seconds < 10 * 3600
+    assert observatory.time_until_dark(horizon="flat") < seconds
+    assert observatory.is_dark(at_time=Time("2016-08-13 22:00:00") + seconds * u.second + 1 * u.minute)
+
+
+def test_field_ephemeris(observatory, monkeypatch):
+    os.environ["POCSTIME"] = "2016-08-13 22:00:00"
+    start_time = Time("2016-08-13 22:00:00")
+
+    observatory.scheduler.fields_file = None
+    observatory.scheduler.fields_list = [
+        {
+            "field": {"name": "HAT-P-20", "position": "07h27m39.89s +24d20m14.7s"},
+            "observation": {"priority": "100"},
+        }
+    ]
+
+    # The header values of the selected observation are computed when it is selected.
+    observation = observatory.get_observation()
+    ephemeris = observatory._field_ephemeris
+    assert ephemeris.matches(observation.field.name, observation.field.coord)
+    assert ephemeris.covers(start_time + observation.minimum_duration)
+
+    # And interpolated for each exposure.
+    monkeypatch.setattr(observatory.observer, "altaz", lambda *args, **kwargs: pytest.fail("not cached"))
+    os.environ["POCSTIME"] = "2016-08-13 22:05:00"
+    headers = observatory.get_standard_headers()
+    assert observatory.get_field_ephemeris() is ephemeris
+    assert headers["airmass"] == pytest.approx(ephemeris.airmass(start_time + 5 * u.minute))
+    monkeypatch.undo()
+
+    # Computed again once the observation runs past the end.
+    os.environ["POCSTIME"] = "2016-08-14 02:00:00"
+    assert observatory.get_field_ephemeris() is not ephemeris
+
+
 def test_standard_headers(observatory):
     os.environ["POCSTIME"] = "2016-08-13 22:00:00"
 
@@ -299,12 +377,97 @@ def test_get_observation(observatory, caplog):
 
     assert observatory.current_observation == observation
 
+    # The scheduler estimates slew times with the model of the mount.
+    assert observatory.scheduler.slew_model is observatory.mount.slew_model
+    assert observatory.scheduler.mount_coords == observatory.mount.pointing_coordinates
+
+
+def test_check_targets_of_opportunity(observatory):
+    assert observatory.check_targets_of_opportunity() is False
+
+    # Requested by another process through the config server.
+    too_config = {
+        "field": {"name": "AT 2016abc", "position": "21h00m00s +20d00m00s"},
+        "observation": {"exptime": 30, "min_nexp": 4, "exp_set_size": 2},
+    }
+    set_config(TOO_CONFIG_KEY, too_config)
+    assert observatory.check_targets_of_opportunity() is True
+    assert get_config(TOO_CONFIG_KEY) is None
+    assert observatory.scheduler.observations["AT 2016abc"].priority == observatory.scheduler.too_priority
+
+    os.environ["POCSTIME"] = "2016-08-13 10:00:00"
+    assert observatory.get_observation().name == "AT 2016abc"
+    assert observatory.check_targets_of_opportunity() is False
+
+    # Bad requests are dropped.
+    set_config(TOO_CONFIG_KEY, {"name": "No field"})
+    assert observatory.check_targets_of_opportunity() is False
+    assert get_config(TOO_CONFIG_KEY) is None
+
 
 def test_get_observation_no_scheduler(observatory):
     observatory.scheduler = None
     assert observatory.get_observation() is None
 
 
+@pytest.mark.parametrize("blocking", [True, False])
+def test_process_observation(observatory, tmp_path, blocking):
+    observation = Observation(Field("TestField", "20h00m43.7135s +22d42m39.0645s"), exptime=1)
+    observatory.current_observation = observation
+
+    for cam_name in observatory.cameras.keys():
+        fits_path = tmp_path / f"{cam_name}.fits"
+        fits_path.touch()
+        metadata = dict(
+            image_id=f"PAN000_{cam_name}_20160813T150000",
+            sequence_id=f"PAN000_{cam_name}_20160813T150000",
+            exptime=1,
+            filepath=fits_path.as_posix(),
+        )
+        observation.add_to_exposure_list(cam_name, Exposure(metadata["image_id"], fits_path, metadata))
+
+    observatory.process_observation(
+        compress_fits=False,
+        make_pretty_images=False,
+        plate_solve=False,
+        upload_image=False,
+        record_observations=True,
+        blocking=blocking,
+    )
+    assert observatory.wait_for_processing(timeout=30)
+    assert observatory.processing_queue_depth == 0
+    assert observatory.status["processing_queue"] == 0
+    if not blocking:
+        assert observatory.status["processing"]["record"]["processed"] == len(observatory.cameras)
+
+    for cam_name, exposures in observation.exposure_list.items():
+        assert exposures[-1].metadata["status"] == "complete"
+        assert exposures[-1].path == tmp_path / f"{cam_name}.fits"
+
+    observatory.power_down()
+    assert observatory._processing_pipeline is None
+
+
+def test_wait_for_cameras(observatory):
+    cam_names = list(observatory.cameras.keys())
+    assert observatory.wait_for_cameras(timeout=0) == []
+
+    futures = dict()
+    for cam_name in cam_names:
+        futures[cam_name] = Future()
+        observatory.cameras[cam_name]._observation_future = futures[cam_name]
+
+    assert observatory.wait_for_cameras(timeout=0.1) == cam_names
+
+    futures[cam_names[0]].set_result(dict())
+    assert observatory.wait_for_cameras(timeout=0.1) == cam_names[1:]
+    assert observatory.wait_for_cameras(cam_names=cam_names[:1], timeout=0.1) == []
+
+    for cam_name in cam_names[1:]:
+        futures[cam_name].set_exception(error.PanError("Broken camera"))
+    assert observatory.wait_for_cameras(timeout=0.1) == []
+
+
 @pytest.mark.with_camera
 def test_observe(observatory):
     assert observatory.current_observation is None
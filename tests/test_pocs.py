@@ -17,6 +17,7 @@ from panoptes.pocs.dome import create_dome_simulator
 from panoptes.pocs.mount import create_mount_simulator
 from panoptes.pocs.observatory import Observatory
 from panoptes.pocs.scheduler import create_scheduler_from_config
+from panoptes.pocs.scheduler.scheduler import TOO_CONFIG_KEY
 from panoptes.pocs.utils.location import create_location_from_config
 
 
@@ -214,6 +215,8 @@ def test_no_ac_power(pocs):
     # Remove 'power' from simulator
     pocs.set_config("simulator", hardware.get_all_names(without=["power"]))
 
+    # Check the database on every call, not the latest monitor readings.
+    pocs.set_config("safety.monitor", False)
     pocs.initialize()
 
     # With simulator removed the power should fail
@@ -456,6 +459,8 @@ def test_unsafe_park(observatory, valid_observation, pocstime_night):
         pass
     pocs.logger.info("Inserting bad weather record.")
     observatory.db.insert_current("weather", {"safe": False})
+    # Don't wait for the next weather check of the monitor.
+    pocs.safety_monitor.check(["good_weather"])
 
     # No longer safe, so should transition to parking then sleep.
     pocs.logger.info("Waiting for shutdown.")
@@ -542,6 +547,134 @@ def test_free_space(pocs, caplog):
     assert caplog.records[-1].levelname == "ERROR"
 
 
+def test_safety_monitor(pocs, pocstime_night, monkeypatch):
+    os.environ["POCSTIME"] = pocstime_night
+    pocs.set_config("simulator", hardware.get_all_names(without=["weather"]))
+    pocs.db.insert_current("weather", {"safe": True})
+
+    changes = list()
+    monitor = pocs.start_safety_monitor()
+    monitor.subscribe(lambda name, value: changes.append((name, value)))
+    assert monitor.is_running
+    assert pocs.start_safety_monitor() is monitor
+    assert pocs.is_safe() is True
+    assert monitor.snapshot["is_dark_observe"] is True
+
+    # The darkness comes from the monitor too and the status isn't rebuilt.
+    dark_threads = list()
+    is_dark = pocs.is_dark
+
+    def _is_dark(*args, **kwargs):
+        dark_threads.append(threading.current_thread())
+        return is_dark(*args, **kwargs)
+
+    monkeypatch.setattr(pocs, "is_dark", _is_dark)
+    monkeypatch.setattr(pocs, "update_status", lambda *args, **kwargs: pytest.fail("status updated"))
+    assert pocs.is_safe() is True
+    assert threading.current_thread() not in dark_threads
+    monkeypatch.undo()
+
+    # The cached reading is used until the weather is checked again.
+    pocs.db.insert_current("weather", {"safe": False})
+    assert pocs.is_safe(park_if_not_safe=False) is True
+    monitor.check(["good_weather"])
+    assert changes == [("good_weather", False)]
+    assert pocs.is_safe(park_if_not_safe=False) is False
+
+    pocs.stop_safety_monitor()
+    assert pocs.safety_monitor is None
+    assert monitor.is_running is False
+
+
+def test_status_record(pocs):
+    pocs.set_config("status_check_interval", 3600)
+    # Refresh every section on every read.
+    pocs.observatory._status_cache.ttls = dict()
+
+    records = list()
+    insert_current = pocs.db.insert_current
+
+    def _insert_current(collection, *args, **kwargs):
+        if collection == "status":
+            records.append(args[0])
+        return insert_current(collection, *args, **kwargs)
+
+    pocs.db.insert_current = _insert_current
+
+    status0 = pocs.get_status()
+    assert len(records) == 1
+
+    # Only the clock moved on, so nothing is written.
+    os.environ["POCSTIME"] = "2020-01-01 08:00:30"
+    status1 = pocs.get_status()
+    assert status1["observatory"]["observer"]["utctime"] != status0["observatory"]["observer"]["utctime"]
+    assert len(records) == 1
+
+    # A change is written.
+    pocs.next_state = "parking"
+    pocs.get_status()
+    assert len(records) == 2
+
+    # A forced read is always written.
+    pocs.get_status(force=True)
+    assert len(records) == 3
+
+
+def test_wait_wakes_up(pocs, valid_observation):
+    pocs.set_config("wait_poll_interval", 0.1)
+
+    # Full delay.
+    assert pocs.wait(delay=0.2) is True
+
+    # Woken up from another thread.
+    timer = threading.Timer(0.2, pocs.wake, args=["test"])
+    timer.start()
+    start = time.monotonic()
+    assert pocs.wait(delay=30) is False
+    assert time.monotonic() - start < 5
+
+    # Woken up by a safety check changing.
+    pocs._on_safety_change("good_weather", False)
+    assert pocs.wait(delay=30) is False
+
+    # A wake up before the wait isn't lost, and is only used once.
+    pocs.wake("early")
+    start = time.monotonic()
+    assert pocs.wait(delay=30) is False
+    assert time.monotonic() - start < 1
+    assert pocs.wait(delay=0.2) is True
+
+    # Woken up by a target of opportunity.
+    timer = threading.Timer(
+        0.2, pocs.observatory.add_target_of_opportunity, args=[{"field": valid_observation["field"]}]
+    )
+    timer.start()
+    start = time.monotonic()
+    assert pocs.wait(delay=30) is False
+    assert time.monotonic() - start < 5
+    assert pocs.observatory.scheduler.preempt_requested
+
+    # Woken up by a target of opportunity from another process.
+    pocs.observatory.scheduler.clear_preemption()
+    timer = threading.Timer(0.2, set_config, args=[TOO_CONFIG_KEY, {"field": valid_observation["field"]}])
+    timer.start()
+    start = time.monotonic()
+    assert pocs.wait(delay=30) is False
+    assert time.monotonic() - start < 5
+    assert pocs.observatory.scheduler.preempt_requested
+    assert pocs.get_config(TOO_CONFIG_KEY) is None
+
+    # A request that is already waiting doesn't wake up again.
+    assert pocs.wait(delay=0.3) is True
+
+    # Interrupted.
+    timer = threading.Timer(0.2, setattr, args=[pocs, "interrupted", True])
+    timer.start()
+    start = time.monotonic()
+    assert pocs.wait(delay=30) is False
+    assert time.monotonic() - start < 5
+
+
 def test_run_complete(pocs, valid_observation):
     os.environ["POCSTIME"] = "2020-01-01 08:00:00"
     pocs.set_config("simulator", "all")
@@ -555,3 +688,32 @@ def test_run_complete(pocs, valid_observation):
     pocs.run(exit_when_done=True, run_once=True)
     assert pocs.state == "sleeping"
     pocs.power_down()
+
+
+def test_observe_target_preempted(pocs, valid_observation, monkeypatch):
+    observatory = pocs.observatory
+    monkeypatch.setattr(pocs, "is_safe", lambda *args, **kwargs: True)
+    monkeypatch.setattr(type(observatory.mount), "is_tracking", property(lambda self: True))
+
+    exposures = list()
+    monkeypatch.setattr(observatory, "take_observation", lambda *args, **kwargs: exposures.append(1))
+    monkeypatch.setattr(observatory, "process_observation", lambda *args, **kwargs: None)
+
+    observation = observatory.scheduler.observations[list(observatory.scheduler.observations)[0]]
+
+    # Without a target of opportunity the observation is taken.
+    assert observatory.check_targets_of_opportunity() is False
+    pocs.observe_target(observation=observation)
+    assert len(exposures) == observation.min_nexp * len(observation.exptimes)
+
+    # The target of opportunity stops the loop before the next exposure.
+    exposures.clear()
+    too = observatory.add_target_of_opportunity({"field": valid_observation["field"]})
+    assert too.priority == observatory.scheduler.too_priority
+    pocs.observe_target(observation=observation)
+    assert len(exposures) == 0
+
+    # The next scheduling pass clears the request and can select the target.
+    os.environ["POCSTIME"] = "2020-01-01 08:00:00"
+    assert observatory.get_observation().name == too.name
+    assert observatory.check_targets_of_opportunity() is False
@@ -0,0 +1,136 @@
+import threading
+
+import pytest
+
+from panoptes.utils import error
+
+from panoptes.pocs.utils import processing
+from panoptes.pocs.utils.processing import ProcessingPipeline, process_exposure
+
+
+def make_metadata(image_id, tmp_path=None):
+    filepath = f"/tmp/{image_id}.fits" if tmp_path is None else (tmp_path / f"{image_id}.fits").as_posix()
+    return dict(image_id=image_id, sequence_id=f"PAN000_{image_id}", exptime=1, filepath=filepath)
+
+
+@pytest.fixture
+def solve_gate(monkeypatch):
+    """Make the solve stage wait for the event of each image."""
+    gates = dict()
+
+    def _solve(job):
+        gates.setdefault(job.image_id, threading.Event()).wait(10)
+        job.metadata["solved"] = True
+
+    monkeypatch.setitem(processing.STAGES, "solve", (_solve, "plate_solve"))
+    return gates
+
+
+def test_bad_stage():
+    with pytest.raises(error.InvalidConfig):
+        ProcessingPipeline(stages={"foobar": {"workers": 2}})
+
+
+def test_stage_config():
+    pipeline = ProcessingPipeline(stages={"solve": {"workers": 3}}, workers=2, max_queue_size=4)
+    assert pipeline.stages["solve"].workers == 3
+    assert pipeline.stages["upload"].workers == 2
+    assert pipeline.stages["upload"].max_queue_size == 4
+    assert pipeline.is_running is False
+    pipeline.shutdown()
+
+
+def test_back_pressure(solve_gate):
+    pipeline = ProcessingPipeline(workers=1, max_queue_size=1)
+    options = dict(plate_solve=True)
+
+    assert pipeline.queue_depth == 0
+    assert pipeline.submit(make_metadata("img0"), "img0.fits", options)
+    assert pipeline.submit(make_metadata("img1"), "img1.fits", options)
+    assert pipeline.queue_depth == 2
+
+    # One image is being solved and one is waiting, so the queue is full.
+    with pytest.raises(error.Timeout):
+        pipeline.submit(make_metadata("img2"), "img2.fits", options, timeout=0.1)
+    assert pipeline.queue_depth == 2
+
+    # The same image isn't queued twice.
+    assert pipeline.submit(make_metadata("img1"), "img1.fits", options) is False
+
+    for image_id in ["img0", "img1"]:
+        solve_gate.setdefault(image_id, threading.Event()).set()
+
+    assert pipeline.join(timeout=10)
+    assert pipeline.queue_depth == 0
+    pipeline.shutdown()
+
+
+def test_stages_overlap(solve_gate, monkeypatch):
+    compressing = threading.Event()
+    finish_compress = threading.Event()
+
+    def _compress(job):
+        compressing.set()
+        finish_compress.wait(10)
+        job.metadata["compressed"] = True
+
+    monkeypatch.setitem(processing.STAGES, "compress", (_compress, "compress_fits"))
+
+    results = dict()
+    pipeline = ProcessingPipeline()
+    options = dict(plate_solve=True, compress_fits=True)
+    for image_id in ["img0", "img1"]:
+        pipeline.submit(
+            make_metadata(image_id),
+            f"{image_id}.fits",
+            options,
+            callback=lambda r: results.update({r["image_id"]: r}),
+        )
+
+    # The first image is compressed while the second one is solved.
+    solve_gate.setdefault("img0", threading.Event()).set()
+    assert compressing.wait(10)
+    solve_gate.setdefault("img1", threading.Event()).set()
+    assert pipeline.join(timeout=0.5) is False
+    assert pipeline.stats["solve"]["processed"] == 2
+    assert pipeline.stats["compress"]["processed"] == 0
+
+    finish_compress.set()
+    assert pipeline.join(timeout=10)
+
+    assert set(results) == {"img0", "img1"}
+    assert all(result["solved"] and result["compressed"] for result in results.values())
+
+    stats = pipeline.stats
+    assert stats["compress"]["processed"] == 2
+    assert stats["compress"]["max_latency"] > 0
+    assert stats["record"]["processed"] == 2
+    assert stats["pretty"]["processed"] == 0
+    assert stats["pretty"]["mean_latency"] is None
+    pipeline.shutdown()
+    assert pipeline.is_running is False
+
+
+def test_failed_stage(monkeypatch):
+    def _upload(job):
+        raise ValueError("no network")
+
+    monkeypatch.setitem(processing.STAGES, "upload", (_upload, "upload_image"))
+
+    results = list()
+    pipeline = ProcessingPipeline()
+    pipeline.submit(make_metadata("img0"), "img0.fits", dict(upload_image=True), callback=results.append)
+    assert pipeline.join(timeout=10)
+    assert len(results) == 1
+    pipeline.shutdown()
+
+
+def test_process_exposure_no_steps(tmp_path):
+    metadata = make_metadata("PAN000_cam00_20200101T000000", tmp_path)
+    fits_path = metadata["filepath"]
+
+    processed = process_exposure(metadata, fits_path)
+    assert processed["image_path"] == fits_path
+    assert processed["filepath"] == fits_path
+    assert "status" not in processed
+    assert "image_path" not in metadata
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from panoptes.utils import error
+
+from panoptes.pocs.utils.safety import SafetyMonitor
+
+
+def test_bad_interval():
+    with pytest.raises(error.InvalidConfig):
+        SafetyMonitor(checks={"weather": (lambda: True, 0)})
+
+
+def test_check():
+    readings = {"weather": True, "power": True}
+    monitor = SafetyMonitor(
+        checks={
+            "weather": (lambda: readings["weather"], 100),
+            "power": (lambda: readings["power"], 100),
+        }
+    )
+    assert monitor.snapshot == {"weather": None, "power": None}
+    assert monitor.is_stale
+    assert monitor.is_safe() is False
+
+    changes = list()
+    monitor.subscribe(lambda name, value: changes.append((name, value)))
+    assert monitor.check() == {"weather": True, "power": True}
+    assert changes == [("weather", True), ("power", True)]
+    assert monitor.is_stale is False
+    assert monitor.is_safe()
+
+    # Only changes are notified.
+    readings["weather"] = False
+    monitor.check()
+    assert changes[2:] == [("weather", False)]
+    assert monitor.is_safe() is False
+    assert monitor.is_safe(ignore=["weather"])
+
+
+def test_failed_check():
+    def _check():
+        raise ValueError("no weather station")
+
+    monitor = SafetyMonitor(checks={"weather": (_check, 100)})
+    assert monitor.check() == {"weather": False}
+
+
+def test_monitor_thread():
+    readings = {"weather": True}
+    calls = {"weather": 0, "disk": 0}
+    unsafe = threading.Event()
+
+    def _weather():
+        calls["weather"] += 1
+        return readings["weather"]
+
+    def _disk():
+        calls["disk"] += 1
+        return True
+
+    monitor = SafetyMonitor(checks={"weather": (_weather, 0.05), "disk": (_disk, 100)})
+    monitor.subscribe(lambda name, value: value is False and unsafe.set())
+    monitor.start()
+    assert monitor.is_running
+    assert monitor.is_safe()
+
+    readings["weather"] = False
+    assert unsafe.wait(5)
+    assert monitor.is_safe() is False
+
+    # Each check runs at its own interval.
+    time.sleep(0.2)
+    assert calls["weather"] > 2
+    assert calls["disk"] == 1
+
+    monitor.stop(timeout=5)
+    assert monitor.is_running is False
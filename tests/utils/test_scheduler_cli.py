@@ -0,0 +1,117 @@
+"""Tests for the scheduler CLI."""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from panoptes.utils.config.client import get_config, set_config
+
+from panoptes.pocs.scheduler.cache import get_cache_path, read_fields_cache
+from panoptes.pocs.scheduler.scheduler import TOO_CONFIG_KEY
+from panoptes.pocs.utils.cli.main import app
+
+
+@pytest.fixture
+def cli_runner():
+    """Provide a CLI runner for testing."""
+    return CliRunner()
+
+
+@pytest.fixture
+def fields_file(tmp_path):
+    fields_file = tmp_path / "fields.yaml"
+    fields_file.write_text(
+        """
+    - field:
+        name: HD 189733
+        position: 20h00m43.7135s +22d42m39.0645s
+    """
+    )
+    return fields_file
+
+
+def test_build_cache(cli_runner, fields_file):
+    result = cli_runner.invoke(
+        app, ["scheduler", "build-cache", str(fields_file), "--default-exptime", "120"]
+    )
+    assert result.exit_code == 0
+    assert get_cache_path(fields_file).exists()
+    assert read_fields_cache(fields_file, default_exptime=120) is not None
+
+    result = cli_runner.invoke(
+        app, ["scheduler", "build-cache", str(fields_file), "--default-exptime", "120"]
+    )
+    assert result.exit_code == 0
+    # Long paths are wrapped in the output.
+    assert "up to date" in " ".join(result.output.split())
+
+
+def test_build_cache_missing_file(cli_runner, tmp_path):
+    result = cli_runner.invoke(app, ["scheduler", "build-cache", str(tmp_path / "missing.yaml")])
+    assert result.exit_code == 1
+    assert "not exist" in result.output
+
+
+def test_benchmark(cli_runner, tmp_path):
+    output = tmp_path / "benchmark.json"
+    result = cli_runner.invoke(
+        app,
+        ["scheduler", "benchmark", "-n", "10", "-l", "random", "--repeat", "1", "--output", str(output)],
+    )
+    assert result.exit_code == 0
+    assert output.exists()
+    assert "get_observation" in result.output
+
+
+def test_benchmark_bad_layout(cli_runner, tmp_path):
+    result = cli_runner.invoke(app, ["scheduler", "benchmark", "-l", "spiral"])
+    assert result.exit_code == 1
+    assert "Unknown layout" in result.output
+
+
+def test_simulate(cli_runner, fields_file, tmp_path):
+    output = tmp_path / "timeline.json"
+    result = cli_runner.invoke(
+        app,
+        [
+            "scheduler",
+            "simulate",
+            "--time",
+            "2016-08-13 05:00:00",
+            "--fields-file",
+            str(fields_file),
+            "--output",
+            str(output),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    timeline = json.loads(output.read_text())
+    assert any(entry["name"] == "HD 189733" for entry in timeline)
+
+
+def test_simulate_missing_file(cli_runner, tmp_path):
+    result = cli_runner.invoke(
+        app, ["scheduler", "simulate", "--fields-file", str(tmp_path / "missing.yaml")]
+    )
+    assert result.exit_code == 1
+    assert "does not exist" in " ".join(result.output.split())
+
+
+def test_target_of_opportunity(cli_runner):
+    result = cli_runner.invoke(
+        app,
+        ["scheduler", "too", "AT 2016abc", "21h00m00s +20d00m00s", "--exptime", "30", "--min-nexp", "10"],
+    )
+    assert result.exit_code == 0, result.output
+    assert get_config(TOO_CONFIG_KEY) == {
+        "field": {"name": "AT 2016abc", "position": "21h00m00s +20d00m00s"},
+        "observation": {"exptime": 30.0, "min_nexp": 10},
+    }
+    set_config(TOO_CONFIG_KEY, None)
+
+
+def test_target_of_opportunity_invalid(cli_runner):
+    result = cli_runner.invoke(app, ["scheduler", "too", "Nowhere", "not a position"])
+    assert result.exit_code == 1
+    assert "Invalid target of opportunity" in " ".join(result.output.split())
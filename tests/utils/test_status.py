@@ -0,0 +1,57 @@
+from panoptes.pocs.utils.status import StatusCache, is_equal, without_clock_fields
+
+
+def test_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("panoptes.pocs.utils.status.time.monotonic", lambda: now[0])
+
+    calls = list()
+
+    def _mount():
+        calls.append(now[0])
+        return {"ra": len(calls)}
+
+    cache = StatusCache(ttls={"mount": 10})
+    assert cache.get_ttl("mount") == 10
+    assert cache.get_ttl("dome") == 0
+
+    assert cache.get("mount", _mount) == {"ra": 1}
+    now[0] += 5
+    assert cache.get("mount", _mount) == {"ra": 1}
+    assert len(calls) == 1
+
+    # Expired.
+    now[0] += 5
+    assert cache.get("mount", _mount) == {"ra": 2}
+
+    # Forced.
+    assert cache.get("mount", _mount, force=True) == {"ra": 3}
+
+    # Key changed.
+    assert cache.get("mount", _mount, key="parked") == {"ra": 4}
+    assert cache.get("mount", _mount, key="parked") == {"ra": 4}
+
+
+def test_is_equal():
+    class Incomparable:
+        def __eq__(self, other):
+            raise ValueError
+
+    assert is_equal({"a": 1}, {"a": 1})
+    assert is_equal(1, 2) is False
+    assert is_equal(Incomparable(), 1) is False
+
+
+def test_without_clock_fields():
+    status = {
+        "can_observe": True,
+        "mount": {"current_ra": 10.0, "current_ha": 1.5},
+        "observer": {"utctime": "2020-01-01 08:00:00", "local_sun_set_time": "19:00"},
+    }
+    assert without_clock_fields(status) == {
+        "can_observe": True,
+        "mount": {"current_ra": 10.0},
+        "observer": {"local_sun_set_time": "19:00"},
+    }
+    # The status itself isn't changed.
+    assert "current_ha" in status["mount"]
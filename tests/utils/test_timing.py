@@ -0,0 +1,123 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from panoptes.pocs.utils import timing
+from panoptes.pocs.utils.timing import TimingStore, summarize_night
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimingStore(tmp_path / "timings", timezone="US/Hawaii")
+    timing.set_timing_store(store)
+    yield store
+    timing.set_timing_store(None)
+
+
+def test_night(store):
+    # 2024-01-02 05:00 UTC is the evening of 2024-01-01 in Hawaii and 16:00 UTC the next morning.
+    assert store.get_night(1704171600) == date(2024, 1, 1)
+    assert store.get_night(1704211200) == date(2024, 1, 1)
+    assert store.get_night(1704254400) == date(2024, 1, 2)
+
+
+def test_record_and_read(store):
+    store.record("slew", 1704171600, 12.5, camera=None)
+    store.record("exposure", 1704171620, 120, camera="cam00", image_id="PAN000_cam00_1")
+
+    assert store.nights() == [date(2024, 1, 1)]
+    records = store.read(date(2024, 1, 1))
+    assert records == [
+        {"phase": "slew", "start": 1704171600, "duration": 12.5},
+        {
+            "phase": "exposure",
+            "start": 1704171620,
+            "duration": 120,
+            "camera": "cam00",
+            "image_id": "PAN000_cam00_1",
+        },
+    ]
+    assert store.read(date(2024, 1, 2)) == []
+
+    # Bad lines are skipped.
+    with store.get_path(date(2024, 1, 1)).open("a") as f:
+        f.write("not json\n")
+    assert len(store.read(date(2024, 1, 1))) == 2
+
+
+def test_timed(store):
+    with timing.timed("readout", camera="cam00"):
+        time.sleep(0.01)
+
+    records = store.read(store.get_night(time.time()))
+    assert len(records) == 1
+    assert records[0]["phase"] == "readout"
+    assert records[0]["duration"] >= 0.01
+    assert records[0]["camera"] == "cam00"
+
+
+def test_record_when_set(store):
+    event = threading.Event()
+    timing.record_when_set(event, "filter_move", timeout=10, filter="g")
+    time.sleep(0.01)
+    event.set()
+
+    for _ in range(100):
+        records = store.read(store.get_night(time.time()))
+        if records:
+            break
+        time.sleep(0.01)
+
+    assert records[0]["phase"] == "filter_move"
+    assert records[0]["duration"] >= 0.01
+
+
+def test_not_enabled(tmp_path):
+    assert timing.create_timing_store_from_config({"enabled": False}) is None
+    store = timing.create_timing_store_from_config({"enabled": True, "directory": str(tmp_path)})
+    assert store.directory == tmp_path
+
+    timing.set_timing_store(None)
+    timing.record_timing("slew", time.time(), 1.0)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_summarize_night():
+    records = [
+        {"phase": "state", "start": 0, "duration": 1000, "name": "observing"},
+        {"phase": "slew", "start": 0, "duration": 30},
+        {"phase": "exposure", "start": 30, "duration": 500, "camera": "cam00"},
+        {"phase": "exposure", "start": 30, "duration": 400, "camera": "cam01"},
+        {"phase": "readout", "start": 530, "duration": 10, "camera": "cam00"},
+        {"phase": "readout", "start": 530, "duration": 12, "camera": "cam01"},
+        {"phase": "fits_write", "start": 531, "duration": 2, "camera": "cam00"},
+        {"phase": "observation", "start": 30, "duration": 515},
+    ]
+
+    summary = summarize_night(records, top=2)
+    assert summary["span"] == 1000
+    assert summary["efficiency"] == {"cam00": 0.5, "cam01": 0.4}
+    assert summary["dead_time"] == [("slew", 30, 1), ("readout", 20, 2)]
+    assert summary["states"] == {"observing": 1000}
+
+    assert summarize_night([])["dead_time"] == []
+
+
+def test_summarize_night_nested():
+    records = [
+        {"phase": "readout", "start": 100, "duration": 10, "camera": "cam00"},
+        {"phase": "readout", "start": 100, "duration": 12, "camera": "cam01"},
+        # Written during the readout of cam00.
+        {"phase": "fits_write", "start": 105, "duration": 4, "camera": "cam00"},
+        # Written during the readout of cam01, with the start and duration rounded.
+        {"phase": "fits_write", "start": 108.001, "duration": 4.0, "camera": "cam01"},
+        # Not inside a readout.
+        {"phase": "fits_write", "start": 200, "duration": 1, "camera": "cam00"},
+    ]
+
+    dead_time = {phase: (total, count) for phase, total, count in summarize_night(records)["dead_time"]}
+    # Summed over the cameras, without the nested FITS writes.
+    assert dead_time["readout"] == pytest.approx((14, 2))
+    assert dead_time["fits_write"] == pytest.approx((9, 3))
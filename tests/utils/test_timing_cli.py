@@ -0,0 +1,55 @@
+"""Tests for the timing CLI."""
+
+import pytest
+from typer.testing import CliRunner
+
+from panoptes.pocs.utils.cli.main import app
+from panoptes.pocs.utils.timing import TimingStore
+
+
+@pytest.fixture
+def cli_runner():
+    """Provide a CLI runner for testing."""
+    return CliRunner()
+
+
+@pytest.fixture
+def timings_dir(tmp_path):
+    store = TimingStore(tmp_path, timezone="US/Hawaii")
+    store.record("state", 1704171600, 3600, name="observing")
+    store.record("slew", 1704171600, 60)
+    store.record("exposure", 1704171660, 1800, camera="cam00")
+    store.record("readout", 1704173460, 30, camera="cam00")
+    return tmp_path
+
+
+def test_report(cli_runner, timings_dir):
+    result = cli_runner.invoke(app, ["timing", "report", "--directory", str(timings_dir)])
+    assert result.exit_code == 0
+    output = " ".join(result.output.split())
+    assert "Night of 2024-01-01" in output
+    assert "50.0%" in output
+    assert "slew" in output
+    assert "observing" in output
+
+
+def test_report_night(cli_runner, timings_dir):
+    result = cli_runner.invoke(
+        app, ["timing", "report", "--directory", str(timings_dir), "--night", "2024-01-01"]
+    )
+    assert result.exit_code == 0
+
+    result = cli_runner.invoke(
+        app, ["timing", "report", "--directory", str(timings_dir), "--night", "2024-01-02"]
+    )
+    assert result.exit_code == 1
+    assert "No timing records" in result.output
+
+    result = cli_runner.invoke(app, ["timing", "report", "--directory", str(timings_dir), "--night", "foo"])
+    assert result.exit_code == 1
+
+
+def test_report_no_records(cli_runner, tmp_path):
+    result = cli_runner.invoke(app, ["timing", "report", "--directory", str(tmp_path)])
+    assert result.exit_code == 1
+    assert "No timing records" in result.output